@@ -2,10 +2,12 @@
 Admin panel for managing the food knowledge base.
 """
 import streamlit as st
-import json
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Dict, Any, List, Optional
 from langchain.schema import Document
+from rag_system.knowledge_changes import UPSERT, DELETE, append_change, new_document_id
+from rag_system.knowledge_file import KNOWLEDGE_FILE
+from admin_panel.document_store import DOCUMENT_STORE_FILE, DocumentStore, open_store
 
 # Set page config
 st.set_page_config(
@@ -16,37 +18,46 @@ st.set_page_config(
 
 # Constants
 PROJECT_ROOT = Path(__file__).parent.parent
-FOOD_KNOWLEDGE_FILE = PROJECT_ROOT / "data" / "food_knowledge.json"
+FOOD_KNOWLEDGE_FILE = KNOWLEDGE_FILE
+PAGE_SIZES = [10, 20, 50, 100]
 
-def load_documents() -> List[Document]:
-    """Load documents from the JSON file."""
-    if not FOOD_KNOWLEDGE_FILE.exists():
-        st.error(f"File not found: {FOOD_KNOWLEDGE_FILE}")
-        return []
+@st.cache_resource
+def get_store() -> DocumentStore:
+    """Open the document store once per server, importing the knowledge file on first use."""
+    return open_store(DOCUMENT_STORE_FILE, FOOD_KNOWLEDGE_FILE)
+
+# Query results are reused across reruns; a new store revision invalidates them
+@st.cache_data(max_entries=256, show_spinner=False)
+def count_recipes(revision: str, source: str, search: Optional[str]) -> int:
+    """Count the recipes of a source matching the search text."""
+    return get_store().count(source=source, search=search)
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def load_page(revision: str, source: str, search: Optional[str], offset: int, limit: int) -> List[Document]:
+    """
+    Fetch one page of recipes.
     
-    try:
-        with open(FOOD_KNOWLEDGE_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return [Document(**item) for item in data]
-    except Exception as e:
-        st.error(f"Error loading documents: {str(e)}")
-        return []
+    Args:
+        revision: DocumentStore.revision() when the page is requested
+        source: Recipe source to list
+        search: Search text
+        offset: Number of matching recipes to skip
+        limit: Page size
+        
+    Returns:
+        The recipes on the page
+    """
+    return get_store().list_documents(source=source, search=search, offset=offset, limit=limit)
 
-def save_documents(documents: List[Document]):
-    """Save documents to the JSON file."""
+def log_change(op: str, doc: Document):
+    """Record a change so the chat service can update its index incrementally."""
     try:
-        data = []
-        for doc in documents:
-            data.append({
-                "page_content": doc.page_content,
-                "metadata": doc.metadata
-            })
-            
-        with open(FOOD_KNOWLEDGE_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-            
+        if op == UPSERT:
+            append_change(op, doc.metadata["id"], {"page_content": doc.page_content, "metadata": doc.metadata})
+        else:
+            append_change(op, doc.metadata["id"])
     except Exception as e:
-        st.error(f"Error saving documents: {str(e)}")
+        st.error(f"Error logging change: {str(e)}")
 
 def create_document_form() -> Dict[str, Any]:
     """Create a form for adding/editing a document."""
@@ -97,6 +108,7 @@ def create_document_form() -> Dict[str, Any]:
             return {
                 "page_content": content,
                 "metadata": {
+                    "id": new_document_id(),
                     "source": source,
                     "category": category
                 }
@@ -113,38 +125,63 @@ def main():
         ["Persian Recipes", "International Recipes", "Add New Recipe"]
     )
     
-    # Load all documents
-    documents = load_documents()
+    store = get_store()
+    if not store.count() and not FOOD_KNOWLEDGE_FILE.exists():
+        st.warning(f"File not found: {FOOD_KNOWLEDGE_FILE}")
+    
+    # The chat service rebuilds from the knowledge file; edits reach it through the change log
+    if st.sidebar.button("Export knowledge file"):
+        try:
+            count = store.export(FOOD_KNOWLEDGE_FILE)
+            st.sidebar.success(f"Exported {count} recipes.")
+        except Exception as e:
+            st.sidebar.error(f"Error exporting recipes: {str(e)}")
     
     if page in ["Persian Recipes", "International Recipes"]:
         source = "Persian Recipes" if page == "Persian Recipes" else "International Recipes"
         st.header(page)
         
-        # Filter recipes by source
-        filtered_docs = [doc for doc in documents if doc.metadata.get("source") == source]
+        # Filter recipes by source and search text, one page at a time
+        search = st.text_input("Search")
+        page_size = st.sidebar.selectbox("Recipes per page", PAGE_SIZES, index=1)
+        revision = store.revision()
+        total = count_recipes(revision, source, search)
         
-        if not filtered_docs:
+        if not total:
             st.warning(f"No {page.lower()} found.")
         else:
-            for i, doc in enumerate(filtered_docs):
+            pages = (total + page_size - 1) // page_size
+            page_number = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1)
+            offset = (page_number - 1) * page_size
+            docs = load_page(revision, source, search, offset, page_size)
+            
+            for i, doc in enumerate(docs, offset):
+                doc_id = doc.metadata["id"]
                 title = doc.page_content.split('\n')[0]
                 with st.expander(f"Recipe {i+1}: {title}"):
-                    edited_content = st.text_area("Content", doc.page_content, key=f"recipe_{i}", height=400)
+                    edited_content = st.text_area("Content", doc.page_content, key=f"recipe_{doc_id}", height=400)
                     st.json(doc.metadata)
                     
                     col1, col2 = st.columns(2)
                     with col1:
-                        if st.button("Save Changes", key=f"save_{i}"):
-                            doc.page_content = edited_content
-                            save_documents(documents)
-                            st.success("Changes saved!")
+                        if st.button("Save Changes", key=f"save_{doc_id}"):
+                            try:
+                                doc.page_content = edited_content
+                                store.upsert(doc)
+                                log_change(UPSERT, doc)
+                                st.success("Changes saved!")
+                            except Exception as e:
+                                st.error(f"Error saving recipe: {str(e)}")
                             
                     with col2:
-                        if st.button("Delete", key=f"delete_{i}"):
-                            documents.remove(doc)
-                            save_documents(documents)
-                            st.success("Recipe deleted!")
-                            st.experimental_rerun()
+                        if st.button("Delete", key=f"delete_{doc_id}"):
+                            try:
+                                store.delete(doc_id)
+                                log_change(DELETE, doc)
+                                st.success("Recipe deleted!")
+                                st.experimental_rerun()
+                            except Exception as e:
+                                st.error(f"Error deleting recipe: {str(e)}")
     
     else:  # Add New Recipe
         st.header("Add New Recipe")
@@ -152,10 +189,14 @@ def main():
         # Create and handle the form
         new_doc = create_document_form()
         if new_doc:
-            documents.append(Document(**new_doc))
-            save_documents(documents)
-            st.success("Recipe added successfully!")
-            st.experimental_rerun()
+            doc = Document(**new_doc)
+            try:
+                store.upsert(doc)
+                log_change(UPSERT, doc)
+                st.success("Recipe added successfully!")
+                st.experimental_rerun()
+            except Exception as e:
+                st.error(f"Error adding recipe: {str(e)}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,302 @@
+"""
+SQLite document store behind the admin panel.
+
+Recipes are stored one row per recipe, keyed by recipe ID and indexed on
+source and category, so listing a page, searching and saving a single recipe
+never touch the rest of the knowledge base. The chat service still reads the
+knowledge file; export() regenerates it from the store.
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from pathlib import Path
+from langchain.schema import Document
+from rag_system.knowledge_changes import (
+    CHANGE_LOG_FILE, document_id, log_size, read_export_offset, write_export_offset
+)
+from rag_system.knowledge_file import KNOWLEDGE_FILE, iter_items, write_items
+from rag_system.text_normalization import normalize_question
+import argparse
+import json
+import os
+import sqlite3
+import threading
+
+# Store next to the knowledge file it is exported to
+DOCUMENT_STORE_FILE = Path(os.environ.get(
+    "ADMIN_DOCUMENT_STORE", KNOWLEDGE_FILE.with_name("food_knowledge.sqlite3")
+))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipes (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    source TEXT,
+    category TEXT,
+    page_content TEXT NOT NULL,
+    metadata TEXT NOT NULL,
+    search_text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_recipes_source_category ON recipes (source, category);
+CREATE INDEX IF NOT EXISTS idx_recipes_category ON recipes (category);
+"""
+
+UPSERT_SQL = """
+INSERT INTO recipes (id, title, source, category, page_content, metadata, search_text)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    title = excluded.title,
+    source = excluded.source,
+    category = excluded.category,
+    page_content = excluded.page_content,
+    metadata = excluded.metadata,
+    search_text = excluded.search_text
+"""
+
+def _row(item: Dict[str, Any]) -> tuple:
+    """Turn a knowledge item into a recipes row."""
+    metadata = {**item.get("metadata", {}), "id": document_id(item)}
+    content = item["page_content"]
+    return (
+        metadata["id"],
+        content.strip().split("\n")[0].strip(),
+        metadata.get("source"),
+        metadata.get("category"),
+        content,
+        json.dumps(metadata, ensure_ascii=False),
+        normalize_question(content),
+    )
+
+def _document(page_content: str, metadata: str) -> Document:
+    return Document(page_content=page_content, metadata=json.loads(metadata))
+
+class DocumentStore:
+    """
+    Recipes of the knowledge base in a SQLite table, in insertion order.
+    """
+
+    def __init__(self, db_path: Path = DOCUMENT_STORE_FILE):
+        """
+        Open (and create if needed) the store.
+
+        Args:
+            db_path: Path of the SQLite database
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Writes through this store; PRAGMA data_version only counts other connections
+        self._writes = 0
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.executescript(SCHEMA)
+
+    def revision(self) -> str:
+        """
+        Return a token that changes whenever the stored recipes change.
+
+        Covers writes through this store and commits by other connections (a
+        second admin process or the import CLI), so it can key caches of query
+        results.
+        """
+        with self._lock:
+            (data_version,) = self._connection.execute("PRAGMA data_version").fetchone()
+            return f"{self._writes}:{data_version}"
+
+    def _where(self, source: Optional[str], category: Optional[str], search: Optional[str]):
+        clauses, params = [], []
+        if source:
+            clauses.append("source = ?")
+            params.append(source)
+        if category:
+            clauses.append("category = ?")
+            params.append(category)
+        if search and search.strip():
+            clauses.append("search_text LIKE ? ESCAPE '\\'")
+            escaped = normalize_question(search).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(f"%{escaped}%")
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def count(self, source: Optional[str] = None, category: Optional[str] = None,
+              search: Optional[str] = None) -> int:
+        """Count the recipes matching the filters (see list_documents)."""
+        where, params = self._where(source, category, search)
+        with self._lock:
+            (count,) = self._connection.execute(f"SELECT COUNT(*) FROM recipes{where}", params).fetchone()
+        return count
+
+    def list_documents(self, source: Optional[str] = None, category: Optional[str] = None,
+                       search: Optional[str] = None, offset: int = 0, limit: int = 20) -> List[Document]:
+        """
+        Return one page of recipes.
+
+        Args:
+            source: Only recipes from this source
+            category: Only recipes in this category
+            search: Only recipes containing this text (normalized like the RAG index)
+            offset: Number of matching recipes to skip
+            limit: Page size
+
+        Returns:
+            The recipes, in insertion order
+        """
+        where, params = self._where(source, category, search)
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT page_content, metadata FROM recipes{where} ORDER BY rowid LIMIT ? OFFSET ?",
+                [*params, limit, offset]
+            ).fetchall()
+        return [_document(*row) for row in rows]
+
+    def get(self, doc_id: str) -> Optional[Document]:
+        """Return a recipe by ID, or None."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT page_content, metadata FROM recipes WHERE id = ?", (doc_id,)
+            ).fetchone()
+        return _document(*row) if row else None
+
+    def upsert(self, doc: Document) -> None:
+        """Insert or update one recipe; its position in the listing is kept."""
+        row = _row({"page_content": doc.page_content, "metadata": doc.metadata})
+        with self._lock:
+            self._connection.execute(UPSERT_SQL, row)
+            self._writes += 1
+
+    def delete(self, doc_id: str) -> bool:
+        """Delete a recipe by ID; returns False if it did not exist."""
+        with self._lock:
+            cursor = self._connection.execute("DELETE FROM recipes WHERE id = ?", (doc_id,))
+            self._writes += 1
+        return cursor.rowcount > 0
+
+    def import_items(self, items: Iterable[Dict[str, Any]], batch_size: int = 1000) -> int:
+        """
+        Insert or update knowledge items in batched transactions.
+
+        Args:
+            items: Dictionaries with "page_content" and "metadata"
+            batch_size: Rows per transaction
+
+        Returns:
+            Number of imported items
+        """
+        imported = 0
+        batch = []
+        for item in items:
+            batch.append(_row(item))
+            if len(batch) >= batch_size:
+                imported += self._write_batch(batch)
+                batch = []
+        if batch:
+            imported += self._write_batch(batch)
+        return imported
+
+    def _write_batch(self, rows: List[tuple]) -> int:
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._connection.executemany(UPSERT_SQL, rows)
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+            self._writes += 1
+        return len(rows)
+
+    def iter_items(self, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Yield every recipe as a knowledge item, in insertion order."""
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._connection.execute(
+                    "SELECT rowid, page_content, metadata FROM recipes WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for last_rowid, page_content, metadata in rows:
+                yield {"page_content": page_content, "metadata": json.loads(metadata)}
+
+    def export(self, path: Path = KNOWLEDGE_FILE, log_path: Path = CHANGE_LOG_FILE) -> int:
+        """
+        Write the knowledge file the chat service builds its index from.
+
+        Args:
+            path: Knowledge file (JSON array or JSON Lines, by extension)
+            log_path: Change log the admin panel appends to
+
+        Returns:
+            Number of exported recipes
+        """
+        # Recipes are stored before their change is logged, so every change
+        # logged up to this offset is part of the export
+        offset = log_size(log_path)
+        count = write_items(path, self.iter_items())
+        write_export_offset(path, offset)
+        return count
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+def import_knowledge(store: DocumentStore, knowledge_path: Path = KNOWLEDGE_FILE,
+                     log_path: Path = CHANGE_LOG_FILE) -> int:
+    """
+    Import a knowledge file and record which logged changes it already contains.
+
+    Edits made in the store after the import are only logged, so a chat
+    service that rebuilds its index from the knowledge file must replay the
+    log from the import on. Without the offset it would skip every edit made
+    before the next export.
+
+    Args:
+        store: Document store to import into
+        knowledge_path: Knowledge file to import
+        log_path: Change log the admin panel appends to
+
+    Returns:
+        Number of imported recipes
+    """
+    # A file written by an export already records how far it is up to date
+    offset = log_size(log_path)
+    count = store.import_items(iter_items(knowledge_path))
+    if read_export_offset(knowledge_path) is None:
+        write_export_offset(knowledge_path, offset)
+    return count
+
+def open_store(db_path: Path = DOCUMENT_STORE_FILE, knowledge_path: Path = KNOWLEDGE_FILE,
+               log_path: Path = CHANGE_LOG_FILE) -> DocumentStore:
+    """
+    Open the store, importing the knowledge file the first time.
+
+    Args:
+        db_path: Path of the SQLite database
+        knowledge_path: Knowledge file to import into an empty store
+        log_path: Change log the admin panel appends to
+
+    Returns:
+        The document store
+    """
+    store = DocumentStore(db_path)
+    if store.count() == 0 and Path(knowledge_path).exists():
+        import_knowledge(store, knowledge_path, log_path)
+    return store
+
+def main():
+    parser = argparse.ArgumentParser(description='Import or export the admin document store.')
+    parser.add_argument('command', choices=['import', 'export'])
+    parser.add_argument('--knowledge', default=str(KNOWLEDGE_FILE), help='Knowledge file (.json or .jsonl)')
+    parser.add_argument('--db', default=str(DOCUMENT_STORE_FILE), help='Document store path')
+    args = parser.parse_args()
+
+    store = DocumentStore(args.db)
+    if args.command == 'import':
+        count = import_knowledge(store, Path(args.knowledge))
+        print(f"Imported {count} recipes into {args.db}.")
+    else:
+        count = store.export(Path(args.knowledge))
+        print(f"Exported {count} recipes to {args.knowledge}.")
+    store.close()
+
+if __name__ == '__main__':
+    main()
@@ -2,15 +2,57 @@
 Chat interface for the food knowledge RAG system.
 """
 import chainlit as cl
-from rag_system.rag import FoodRAGSystem, load_knowledge
+from chainlit.server import app
+from contextlib import aclosing
+from fastapi.responses import PlainTextResponse
+import logging
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Initialize RAG system
-rag_system = FoodRAGSystem()
+# Startup timings and query traces are logged at INFO (LOG_LEVEL overrides it)
+logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logger = logging.getLogger("chat_interface")
+for name in ("chat_interface", "rag_system"):
+    logging.getLogger(name).setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+
+def create_engine():
+    """Import and create the shared engine, logging how long it took."""
+    start = time.perf_counter()
+    from rag_system.rag import get_rag_system
+    imported = time.perf_counter()
+    engine = get_rag_system()
+    logger.info(
+        "Imported the RAG engine in %.2fs and created it in %.2fs",
+        imported - start, time.perf_counter() - imported
+    )
+    return engine
+
+# Shared engine, configured from RAG_* environment variables
+rag_system = create_engine()
+
+# Open the index, load the model and warm the retriever in the background so
+# the server starts at once; questions that arrive earlier wait for the index
+if os.environ.get("RAG_WARM_UP", "1") != "0":
+    threading.Thread(target=rag_system.warm_up, name="rag-warm-up", daemon=True).start()
+
+async def metrics():
+    """Per-stage query latencies and counters in the Prometheus text format."""
+    return PlainTextResponse(
+        rag_system.metrics.render_prometheus(),
+        media_type="text/plain; version=0.0.4"
+    )
+
+@app.middleware("http")
+async def serve_metrics(request, call_next):
+    """Answer /metrics before routing, where Chainlit's catch-all would serve the UI."""
+    if request.method == "GET" and request.url.path == "/metrics":
+        return await metrics()
+    return await call_next(request)
 
 @cl.on_chat_start
 async def start():
@@ -26,25 +68,13 @@ async def start():
         author="Chef Kamyar"
     ).send()
 
-    # Initialize knowledge base
-    await cl.Message(
-        content="Preparing recipes...",
-        author="Chef Kamyar"
-    ).send()
-
-    try:
-        documents = load_knowledge()
-        rag_system.create_vector_store(documents)
-        rag_system.create_qa_chain()
-        await cl.Message(
-            content="✅ Recipes are ready! What would you like to know?",
-            author="Chef Kamyar"
-        ).send()
-    except Exception as e:
-        await cl.Message(
-            content=f"❌ Sorry, there was an error preparing the recipes: {str(e)}",
-            author="Chef Kamyar"
-        ).send()
+def format_sources(sources) -> str:
+    """Format source previews to append below an answer."""
+    text = "\n\n**Sources:**"
+    for i, source in enumerate(sources, 1):
+        preview = source.page_content[:200] + "..." if len(source.page_content) > 200 else source.page_content
+        text += f"\n\n{i}. {source.metadata.get('source', 'Unknown')}:\n{preview}"
+    return text
 
 @cl.on_message
 async def main(message: cl.Message):
@@ -54,20 +84,26 @@ async def main(message: cl.Message):
     await thinking_msg.send()
 
     try:
-        # Get response from RAG system
-        answer, sources = rag_system.query(message.content)
+        # Pick up recipes the admin panel changed since the last message
+        await cl.make_async(rag_system.sync_changes)()
         
-        # Create response message
-        response = cl.Message(content=answer, author="Chef Kamyar")
+        # Sources arrive first, then the answer is streamed into the thinking message;
+        # closing the stream frees its generation slot if the client goes away
+        async with aclosing(rag_system.astream(message.content)) as stream:
+            sources = await stream.__anext__()
+            
+            answer_started = False
+            async for token in stream:
+                if not answer_started:
+                    thinking_msg.content = ""
+                    answer_started = True
+                await thinking_msg.stream_token(token)
         
         # Add source previews if available
         if sources:
-            response.content += "\n\n**Sources:**"
-            for i, source in enumerate(sources, 1):
-                preview = source.page_content[:200] + "..." if len(source.page_content) > 200 else source.page_content
-                response.content += f"\n\n{i}. {source.metadata.get('source', 'Unknown')}:\n{preview}"
+            await thinking_msg.stream_token(format_sources(sources))
         
-        await response.send()
+        await thinking_msg.update()
     except Exception as e:
         await cl.Message(
             content=f"❌ Sorry, there was an error answering your question: {str(e)}",
@@ -0,0 +1,127 @@
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from food_search_index import FoodSearchIndex, weighted_distance
+
+
+FOOD_WORDS = ['Pizza', 'Margherita', 'Pepperoni', 'Sushi', 'Roll', 'Burger', 'Pasta', 'Carbonara',
+              'Kabab', 'Koobideh', 'Ghormeh', 'Sabzi', 'Zereshk', 'Polo', 'Chicken', 'Salad',
+              'Soup', 'Steak', 'Falafel', 'Noodles', 'Curry', 'Taco', 'Ramen', 'Dolma']
+RESTAURANT_WORDS = ['Pizza', 'Place', 'Sushi', 'Bar', 'Burger', 'Joint', 'Italian', 'Restaurant',
+                    'Tehran', 'Grill', 'House', 'Kitchen', 'Garden', 'Corner', 'Cafe', 'Bistro']
+CATEGORIES = ['Italian', 'Japanese', 'American', 'Persian', 'Mexican', 'Indian']
+QUERIES = [
+    {'food_name': 'Pizza'},
+    {'food_name': 'Ghormeh Sabzi'},
+    {'food_name': 'Kabab Kobideh', 'max_distance': 2},
+    {'restaurant_name': 'Tehran Gril'},
+    {'food_name': 'Pasta', 'restaurant_name': 'Italian Restaurant'},
+]
+
+
+def linear_food_search(connection, food_name=None, restaurant_name=None, max_distance=1):
+    """
+    Reference full-scan implementation: one weighted distance per field per row.
+    :return: List of matching foods
+    """
+    rows = connection.execute("SELECT id, food_name, food_category, restaurant_name, price FROM foods").fetchall()
+    matches = []
+    for food_id, db_food_name, food_category, db_restaurant_name, db_price in rows:
+        food_name_distance = float('inf')
+        restaurant_name_distance = float('inf')
+        if food_name:
+            food_name_distance = weighted_distance(food_name.lower(), db_food_name.lower())
+        if restaurant_name:
+            restaurant_name_distance = weighted_distance(restaurant_name.lower(), db_restaurant_name.lower())
+
+        if food_name and restaurant_name:
+            ok = food_name_distance <= max_distance and restaurant_name_distance <= max_distance
+            distance = min(food_name_distance, restaurant_name_distance)
+        elif food_name:
+            ok, distance = food_name_distance <= max_distance, food_name_distance
+        else:
+            ok, distance = restaurant_name_distance <= max_distance, restaurant_name_distance
+        if ok:
+            matches.append({
+                'id': food_id,
+                'food_name': db_food_name,
+                'food_category': food_category,
+                'restaurant_name': db_restaurant_name,
+                'price': db_price,
+                'edit_distance': distance
+            })
+    matches.sort(key=lambda x: x['edit_distance'])
+    return matches
+
+
+def create_menu(db_path, items, restaurants, seed=0):
+    """
+    Create a foods table with synthetic menu items.
+    :param db_path: Path of the SQLite database to create
+    :param items: Number of menu items
+    :param restaurants: Number of distinct restaurants
+    """
+    rng = random.Random(seed)
+    restaurant_names = [' '.join(rng.sample(RESTAURANT_WORDS, 2)) + f' {i}' for i in range(restaurants)]
+    connection = sqlite3.connect(db_path)
+    connection.execute('''
+    CREATE TABLE foods (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        food_name TEXT NOT NULL,
+        food_category TEXT,
+        restaurant_name TEXT NOT NULL,
+        price REAL NOT NULL
+    )
+    ''')
+    connection.executemany(
+        'INSERT INTO foods (food_name, food_category, restaurant_name, price) VALUES (?, ?, ?, ?)',
+        ((' '.join(rng.sample(FOOD_WORDS, rng.randint(1, 3))), rng.choice(CATEGORIES),
+          rng.choice(restaurant_names), round(rng.uniform(3, 40), 2)) for _ in range(items))
+    )
+    connection.commit()
+    connection.close()
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare indexed and full-scan food search.')
+    parser.add_argument('--items', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--restaurants', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'items':>8} {'query':<50} {'scan ms':>10} {'index ms':>10} {'speedup':>8} {'matches':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for items in args.items:
+            db_path = os.path.join(tmp, f'menu_{items}.db')
+            create_menu(db_path, items, args.restaurants)
+
+            connection = sqlite3.connect(db_path)
+            index = FoodSearchIndex(db_path)
+            build_time, _ = timed(lambda: index.search(food_name='warmup'), 1)
+            print(f"{items:>8} {'(index build)':<50} {'':>10} {build_time * 1000:>10.1f}")
+
+            for query in QUERIES:
+                scan_time, expected = timed(lambda: linear_food_search(connection, **query), args.repeat)
+                index_time, found = timed(lambda: index.search(**query), args.repeat)
+                if found != expected:
+                    raise AssertionError(f'Indexed search differs from full scan for {query}')
+                label = ', '.join(f'{k}={v}' for k, v in query.items())
+                print(f"{items:>8} {label:<50} {scan_time * 1000:>10.1f} {index_time * 1000:>10.1f} "
+                      f"{scan_time / index_time:>7.1f}x {len(found):>8}")
+
+            index.close()
+            connection.close()
+
+
+if __name__ == '__main__':
+    main()
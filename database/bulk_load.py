@@ -0,0 +1,79 @@
+import argparse
+import csv
+import json
+from itertools import islice
+from connection import ConnectionManager, DB_PATH
+from migrations import migrate
+
+
+# Columns accepted for each table, in insert order
+TABLE_COLUMNS = {
+    'foods': ('food_name', 'food_category', 'restaurant_name', 'price'),
+    'food_orders': ('person_name', 'person_phone_number', 'status', 'comment'),
+}
+
+
+def read_records(path):
+    """
+    Lazily read records from a CSV file (with a header row) or a JSON Lines file.
+    :param path: Path of the .csv or .jsonl file
+    :return: Iterator of dicts
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.endswith('.csv'):
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def bulk_insert(connection, table, records, batch_size=5000):
+    """
+    Insert records with executemany, one transaction per batch.
+    A failing batch is rolled back without losing the batches before it.
+    :param connection: SQLite connection in autocommit mode
+    :param table: 'foods' or 'food_orders'
+    :param records: Iterable of dicts keyed by column name
+    :param batch_size: Rows per transaction
+    :return: Number of inserted rows
+    """
+    if table not in TABLE_COLUMNS:
+        raise ValueError(f"Unknown table: {table}")
+    columns = TABLE_COLUMNS[table]
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    defaults = {'status': 'preparation'}
+
+    rows = (tuple(record.get(column, defaults.get(column)) for column in columns) for record in records)
+    inserted = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return inserted
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.executemany(sql, batch)
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        inserted += len(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk load menus or orders into food_orders.db.')
+    parser.add_argument('table', choices=sorted(TABLE_COLUMNS))
+    parser.add_argument('path', help='CSV file with a header row, or a JSON Lines file')
+    parser.add_argument('--db', default=DB_PATH, help='SQLite database path')
+    parser.add_argument('--batch-size', type=int, default=5000, help='Rows per transaction')
+    args = parser.parse_args()
+
+    connection = ConnectionManager(args.db).connect()
+    migrate(connection)
+    inserted = bulk_insert(connection, args.table, read_records(args.path), args.batch_size)
+    connection.close()
+    print(f"Inserted {inserted} rows into {args.table}.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+# Database used when no path is configured explicitly
+DB_PATH = os.environ.get('FOOD_ORDERS_DB', 'food_orders.db')
+
+
+class ConnectionManager:
+    """
+    Hands out one long-lived SQLite connection per thread.
+
+    Connections are opened in WAL mode with a busy timeout, so readers never
+    block the writer and concurrent writers wait instead of failing with
+    "database is locked". Keeping connections open lets sqlite3 reuse its
+    per-connection cache of prepared statements across calls.
+    """
+
+    def __init__(self, db_path=DB_PATH, timeout=30.0, cached_statements=256):
+        """
+        :param db_path: Path of the SQLite database
+        :param timeout: Seconds to wait for a lock held by another connection
+        :param cached_statements: Number of prepared statements cached per connection
+        """
+        self.db_path = db_path
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def connect(self):
+        """
+        Open a new connection with the shared settings.
+        The caller owns it; prefer connection() for pooled access.
+        :return: SQLite connection in autocommit mode
+        """
+        connection = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            cached_statements=self.cached_statements,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        connection.execute('PRAGMA journal_mode = WAL')
+        connection.execute('PRAGMA synchronous = NORMAL')
+        connection.execute(f'PRAGMA busy_timeout = {int(self.timeout * 1000)}')
+        return connection
+
+    def connection(self):
+        """
+        Return the calling thread's connection, opening it on first use.
+        :return: SQLite connection in autocommit mode
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self.connect()
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    @contextmanager
+    def transaction(self, immediate=True):
+        """
+        Run a block of statements in one transaction on the thread's connection.
+        Commits on success and rolls back on error.
+        :param immediate: Take the write lock up front instead of on the first write
+        """
+        connection = self.connection()
+        connection.execute('BEGIN IMMEDIATE' if immediate else 'BEGIN')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        else:
+            connection.execute('COMMIT')
+
+    def close_all(self):
+        """Close every connection handed out by this manager."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            try:
+                connection.close()
+            except sqlite3.ProgrammingError:
+                pass
+        self._local = threading.local()
@@ -1,147 +1,149 @@
-import sqlite3
-import Levenshtein
 import atexit
+from connection import ConnectionManager, DB_PATH
+from food_search_index import FoodSearchIndex
 
 
-# atexit.register(lambda: connection.close())
+# Shared per-thread connections (WAL mode, busy timeout, statement cache)
+db = ConnectionManager(DB_PATH)
+atexit.register(lambda: db.close_all())
 
+# Fuzzy search index over the foods table, rebuilt when the table changes
+food_index = FoodSearchIndex(DB_PATH, connect=db.connect)
+atexit.register(lambda: food_index.close())
+
+
+def configure_database(db_path):
+    """
+    Point every order operation at another database file.
+    :param db_path: Path of the SQLite database
+    """
+    global db, food_index
+    db.close_all()
+    food_index.close()
+    db = ConnectionManager(db_path)
+    food_index = FoodSearchIndex(db_path, connect=db.connect)
 
 
 def food_search(food_name=None, restaurant_name=None, max_distance=1):
     """
     Search for foods based on food_name, restaurant_name, or both using edit distance.
-    :param connection: SQLite database connection
     :param food_name: Food name to search for (optional)
     :param restaurant_name: Restaurant name to search for (optional)
     :param max_distance: Maximum allowed edit distance for a match
     :return: List of matching foods
     """
-    connection = sqlite3.connect('food_orders.db')
-
-    cursor = connection.cursor()
-    cursor.execute("SELECT id, food_name, food_category, restaurant_name, price FROM foods")
-    results = cursor.fetchall()
-
-    matches = []
-    for food_id, db_food_name, food_category, db_restaurant_name, db_price in results:
-        food_name_distance = float('inf')
-        restaurant_name_distance = float('inf')
-
-        if food_name:
-            food_name_distance_1 = Levenshtein.distance(food_name.lower(), db_food_name.lower(), weights=(0, 1, 1))
-            food_name_distance_2 = Levenshtein.distance(food_name.lower(), db_food_name.lower(), weights=(1, 0, 1))
-            food_name_distance_3 = Levenshtein.distance(food_name.lower(), db_food_name.lower(), weights=(1, 1, 1))
-            food_name_distance = min(food_name_distance_1, food_name_distance_2, food_name_distance_3)
-            
-
-        if restaurant_name:
-            restaurant_name_distance_1 = Levenshtein.distance(restaurant_name.lower(), db_restaurant_name.lower(), weights=(0, 1, 1))
-            restaurant_name_distance_2 = Levenshtein.distance(restaurant_name.lower(), db_restaurant_name.lower(), weights=(1, 0, 1))
-            restaurant_name_distance_3 = Levenshtein.distance(restaurant_name.lower(), db_restaurant_name.lower(), weights=(1, 1, 1))
-            
-            restaurant_name_distance = min(restaurant_name_distance_1, restaurant_name_distance_2, restaurant_name_distance_3)
-            
-        if food_name and restaurant_name:
-            if food_name_distance <= max_distance and restaurant_name_distance <= max_distance:
-                matches.append({
-                    'id': food_id,
-                    'food_name': db_food_name,
-                    'food_category': food_category,
-                    'restaurant_name': db_restaurant_name,
-                    'price': db_price,
-                    'edit_distance': min(food_name_distance, restaurant_name_distance)
-                })
-        elif food_name:
-            if food_name_distance <= max_distance:
-                matches.append({
-                    'id': food_id,
-                    'food_name': db_food_name,
-                    'food_category': food_category,
-                    'restaurant_name': db_restaurant_name,
-                    'price': db_price,
-                    'edit_distance': food_name_distance
-                })
-        elif restaurant_name:
-            if restaurant_name_distance <= max_distance:
-                matches.append({
-                    'id': food_id,
-                    'food_name': db_food_name,
-                    'food_category': food_category,
-                    'restaurant_name': db_restaurant_name,
-                    'price': db_price,
-                    'edit_distance': restaurant_name_distance
-                })
-
-    matches.sort(key=lambda x: x['edit_distance'])
-    connection.close()
-    return matches
+    return food_index.search(food_name=food_name, restaurant_name=restaurant_name, max_distance=max_distance)
+
+
+# Conditional updates: the WHERE clause re-checks the order state, so the
+# check and the change happen in one atomic statement
+CANCEL_ORDER_SQL = """
+    UPDATE food_orders SET status = 'canceled'
+    WHERE id = ? AND person_phone_number = ? AND status = 'preparation'
+    RETURNING status
+"""
+COMMENT_ORDER_SQL = "UPDATE food_orders SET comment = ? WHERE id = ? RETURNING id"
+
+
+def _cancel(connection, order_id, phone_number):
+    """
+    Cancel one order with a single conditional update.
+    :return: Result dictionary
+    """
+    if connection.execute(CANCEL_ORDER_SQL, (order_id, phone_number)).fetchone() is not None:
+        return {
+            'order_id': order_id,
+            'success': True,
+            'status': 'canceled',
+            'message': f"Order ID {order_id} from {phone_number} has been successfully canceled."
+        }
+
+    # Only failures pay for a second lookup, to explain why nothing changed
+    result = connection.execute(
+        "SELECT status FROM food_orders WHERE id = ? AND person_phone_number = ?", (order_id, phone_number)
+    ).fetchone()
+    if result is None:
+        return {
+            'order_id': order_id,
+            'success': False,
+            'status': None,
+            'message': f"Order ID {order_id} from {phone_number} does not exist."
+        }
+    return {
+        'order_id': order_id,
+        'success': False,
+        'status': result[0],
+        'message': f"Order ID {order_id} from {phone_number} cannot be canceled as it is in '{result[0]}' status."
+    }
+
+
+def _comment(connection, order_id, person_name, comment):
+    """
+    Set the comment of one order with a single update.
+    :return: Result dictionary
+    """
+    if connection.execute(COMMENT_ORDER_SQL, (comment, order_id)).fetchone() is None:
+        return {
+            'order_id': order_id,
+            'success': False,
+            'message': f"Order ID {order_id} does not exist."
+        }
+    return {
+        'order_id': order_id,
+        'success': True,
+        'message': f"Comment for Order ID {order_id} from {person_name} has been updated."
+    }
 
 
 def cancel_order(order_id, phone_number):
     """
     Cancel an order if its status is 'preparation'.
-    :param connection: SQLite database connection
     :param order_id: ID of the order to cancel
-    :return: Result message
-    """
-    connection = sqlite3.connect('food_orders.db')
-    cursor = connection.cursor()
-    
-    cursor.execute("SELECT status FROM food_orders WHERE id = ? AND person_phone_number = ?", (order_id,phone_number))
-    result = cursor.fetchone()
-    
-    if result is None:
-        return f"Order ID {order_id} from {phone_number} does not exist."
-    
-    current_status = result[0]
-    
-    if current_status == "preparation":
-        cursor.execute("UPDATE food_orders SET status = 'canceled' WHERE id = ?", (order_id,))
-        connection.commit()
-        connection.close()
-        return f"Order ID {order_id} from {phone_number} has been successfully canceled."
-    else:
-        connection.close()
-        return f"Order ID {order_id} from {phone_number} cannot be canceled as it is in '{current_status}' status."
-
-
-def comment_order(order_id, person_name ,comment):
+    :param phone_number: Phone number the order was placed with
+    :return: Dict with order_id, success, status (None if the order does not exist) and message
+    """
+    return _cancel(db.connection(), order_id, phone_number)
+
+
+def cancel_orders(orders):
+    """
+    Cancel many orders in one transaction.
+    :param orders: Iterable of (order_id, phone_number) pairs
+    :return: List of result dicts, as returned by cancel_order, in input order
+    """
+    with db.transaction() as connection:
+        return [_cancel(connection, order_id, phone_number) for order_id, phone_number in orders]
+
+
+def comment_order(order_id, person_name, comment):
     """
     Add or overwrite a comment for an order.
-    :param connection: SQLite database connection
     :param order_id: ID of the order to comment on
+    :param person_name: Name of the person commenting
     :param comment: The comment to add or overwrite
-    :return: Result message
-    """
-    connection = sqlite3.connect('food_orders.db')
-    cursor = connection.cursor()
-    
-    cursor.execute("SELECT id FROM food_orders WHERE id = ?", (order_id,))
-    result = cursor.fetchone()
-    
-    if result is None:
-        return f"Order ID {order_id} does not exist."
-    
-    cursor.execute("UPDATE food_orders SET comment = ? WHERE id = ?", (comment, order_id))
-    connection.commit()
-    connection.close()
-    return f"Comment for Order ID {order_id} from {person_name} has been updated."
+    :return: Dict with order_id, success and message
+    """
+    return _comment(db.connection(), order_id, person_name, comment)
+
+
+def comment_orders(comments):
+    """
+    Add or overwrite comments for many orders in one transaction.
+    :param comments: Iterable of (order_id, person_name, comment) tuples
+    :return: List of result dicts, as returned by comment_order, in input order
+    """
+    with db.transaction() as connection:
+        return [_comment(connection, order_id, person_name, comment) for order_id, person_name, comment in comments]
 
 
 def check_order_status(order_id):
     """
     Check the status of an order.
-    :param connection: SQLite database connection
     :param order_id: ID of the order to check
     :return: Order status or an error message
     """
-    connection = sqlite3.connect('food_orders.db')
-    cursor = connection.cursor()
-    
-    cursor.execute("SELECT status FROM food_orders WHERE id = ?", (order_id,))
-    result = cursor.fetchone()
-    connection.close()
+    result = db.connection().execute("SELECT status FROM food_orders WHERE id = ?", (order_id,)).fetchone()
     if result is None:
         return f"Order ID {order_id} does not exist."
-    
+
     return f"Order ID {order_id} from is currently in '{result[0]}' status."
\ No newline at end of file
@@ -1,5 +1,5 @@
 # Import the functions from db_manager.py
-from db_manager import food_search, cancel_order, comment_order, check_order_status
+from db_manager import food_search, cancel_order, cancel_orders, comment_order, check_order_status
 
 
 # Example Search by food name
@@ -23,12 +23,18 @@ for food in matching_foods:
 # Example Cancel Order
 order_id, phone_number = 1, "123-456-7890"
 cancel_result = cancel_order(order_id, phone_number)
-print(f"\nCancel Order Result: {cancel_result}")
+print(f"\nCancel Order Result: {cancel_result['message']}")
 
 # Example Comment on Order
 order_id, person_name = 1, "Alice"
 comment_result = comment_order(order_id, person_name, "New comment for this order.")
-print(f"\nComment Order Result: {comment_result}")
+print(f"\nComment Order Result: {comment_result['message']}")
+
+# Example Cancel Several Orders in One Transaction
+batch_results = cancel_orders([(1, "123-456-7890"), (2, "098-765-4321")])
+print("\nBatch Cancel Results:")
+for result in batch_results:
+    print(result)
 
 # Example Check Order Status
 order_id = 10
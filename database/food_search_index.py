@@ -0,0 +1,177 @@
+import sqlite3
+import threading
+import Levenshtein
+import numpy as np
+
+
+# Characters are counted into this many buckets for the candidate filter
+CHAR_BUCKETS = 64
+
+
+def weighted_distance(query, name):
+    """
+    The edit distance used by food_search: the minimum of three weighted
+    Levenshtein distances (free insertions, free deletions, plain).
+    :param query: Lowercased search string
+    :param name: Lowercased name from the database
+    :return: Edit distance
+    """
+    return min(
+        Levenshtein.distance(query, name, weights=(0, 1, 1)),
+        Levenshtein.distance(query, name, weights=(1, 0, 1)),
+        Levenshtein.distance(query, name, weights=(1, 1, 1)),
+    )
+
+
+def char_counts(text):
+    """
+    Count the characters of a string into CHAR_BUCKETS buckets.
+    :param text: String to count
+    :return: Array of bucket counts
+    """
+    counts = np.zeros(CHAR_BUCKETS, dtype=np.uint16)
+    for char in text:
+        counts[ord(char) % CHAR_BUCKETS] += 1
+    return counts
+
+
+class NameIndex:
+    """
+    Candidate index over the distinct values of one name column.
+
+    With free insertions (or free deletions) substitutions never beat a
+    deletion plus a free insertion, so weighted_distance(q, s) equals
+    min(len(q), len(s)) - LCS(q, s). The longest common subsequence can not
+    exceed the number of characters the two strings share, which gives a lower
+    bound computed for every name at once with numpy. Only names whose bound
+    is within max_distance are scored with Levenshtein.
+    """
+
+    def __init__(self, names):
+        """
+        :param names: Lowercased name of every row, in row order
+        """
+        positions = {}
+        for row, name in enumerate(names):
+            positions.setdefault(name, []).append(row)
+
+        self.names = list(positions)
+        self.rows = [positions[name] for name in self.names]
+        self.lengths = np.array([len(name) for name in self.names], dtype=np.int64)
+        self.counts = np.array([char_counts(name) for name in self.names], dtype=np.uint16).reshape(-1, CHAR_BUCKETS)
+
+    def search(self, query, max_distance):
+        """
+        Find rows whose name is within max_distance of the query.
+        :param query: Lowercased search string
+        :param max_distance: Maximum allowed edit distance
+        :return: Dict mapping row position to edit distance
+        """
+        if not self.names:
+            return {}
+
+        shared = np.minimum(self.counts, char_counts(query)).sum(axis=1, dtype=np.int64)
+        lower_bound = np.minimum(self.lengths, len(query)) - shared
+
+        matches = {}
+        for i in np.flatnonzero(lower_bound <= max_distance):
+            distance = weighted_distance(query, self.names[i])
+            if distance <= max_distance:
+                for row in self.rows[i]:
+                    matches[row] = distance
+        return matches
+
+
+class FoodSearchIndex:
+    """
+    In-memory fuzzy search index over the foods table.
+
+    The index is rebuilt lazily whenever another connection has committed a
+    change to the database since it was built.
+    """
+
+    def __init__(self, db_path='food_orders.db', connect=None):
+        """
+        :param db_path: Path of the SQLite database
+        :param connect: Optional factory returning a new connection to the database
+        """
+        self.db_path = db_path
+        self.connect = connect or (lambda: sqlite3.connect(self.db_path, check_same_thread=False))
+        self._connection = None
+        self._data_version = None
+        self._lock = threading.Lock()
+
+        self.rows = []
+        self.food_names = None
+        self.restaurant_names = None
+
+    def _refresh(self):
+        """Rebuild the index if the database changed since the last build."""
+        if self._connection is None:
+            # A dedicated connection: data_version only reflects commits by other connections
+            self._connection = self.connect()
+
+        (data_version,) = self._connection.execute("PRAGMA data_version").fetchone()
+        if data_version == self._data_version:
+            return
+
+        self.rows = self._connection.execute(
+            "SELECT id, food_name, food_category, restaurant_name, price FROM foods"
+        ).fetchall()
+        self.food_names = NameIndex([row[1].lower() for row in self.rows])
+        self.restaurant_names = NameIndex([row[3].lower() for row in self.rows])
+        self._data_version = data_version
+
+    def search(self, food_name=None, restaurant_name=None, max_distance=1):
+        """
+        Search for foods based on food_name, restaurant_name, or both using edit distance.
+        Returns the same matches, in the same order, as a full scan of the table.
+        :param food_name: Food name to search for (optional)
+        :param restaurant_name: Restaurant name to search for (optional)
+        :param max_distance: Maximum allowed edit distance for a match
+        :return: List of matching foods
+        """
+        with self._lock:
+            self._refresh()
+            rows = self.rows
+
+            if food_name:
+                food_matches = self.food_names.search(food_name.lower(), max_distance)
+            if restaurant_name:
+                restaurant_matches = self.restaurant_names.search(restaurant_name.lower(), max_distance)
+
+        if food_name and restaurant_name:
+            distances = {
+                row: min(distance, restaurant_matches[row])
+                for row, distance in food_matches.items()
+                if row in restaurant_matches
+            }
+        elif food_name:
+            distances = food_matches
+        elif restaurant_name:
+            distances = restaurant_matches
+        else:
+            distances = {}
+
+        matches = []
+        for row in sorted(distances):
+            food_id, db_food_name, food_category, db_restaurant_name, db_price = rows[row]
+            matches.append({
+                'id': food_id,
+                'food_name': db_food_name,
+                'food_category': food_category,
+                'restaurant_name': db_restaurant_name,
+                'price': db_price,
+                'edit_distance': distances[row]
+            })
+
+        matches.sort(key=lambda x: x['edit_distance'])
+        return matches
+
+    def close(self):
+        """Close the index connection."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+                self._data_version = None
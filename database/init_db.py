@@ -1,38 +1,14 @@
-import sqlite3
-import os
+from connection import ConnectionManager, DB_PATH
+from migrations import describe, migrate
 
-def init_db():
-    # Remove existing database if it exists
-    if os.path.exists('food_orders.db'):
-        os.remove('food_orders.db')
-
-    # Connect to SQLite database (creates it if it doesn't exist)
-    conn = sqlite3.connect('food_orders.db')
+def init_db(db_path=DB_PATH):
+    # Create or upgrade the schema without touching existing data
+    conn = ConnectionManager(db_path).connect()
+    applied = migrate(conn)
     cursor = conn.cursor()
+    cursor.execute('BEGIN')
 
-    # Create foods table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS foods (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        food_name TEXT NOT NULL,
-        food_category TEXT,
-        restaurant_name TEXT NOT NULL,
-        price REAL NOT NULL
-    )
-    ''')
-
-    # Create food_orders table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS food_orders (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        person_name TEXT NOT NULL,
-        person_phone_number TEXT NOT NULL,
-        status TEXT DEFAULT 'preparation',
-        comment TEXT
-    )
-    ''')
-
-    # Insert sample foods
+    # Insert sample foods into an empty database
     sample_foods = [
         ('Pizza Margherita', 'Italian', 'Pizza Place', 12.99),
         ('Pepperoni Pizza', 'Italian', 'Pizza Place', 14.99),
@@ -41,20 +17,24 @@ def init_db():
         ('Pasta Carbonara', 'Italian', 'Italian Restaurant', 15.99),
     ]
 
-    cursor.executemany('INSERT OR IGNORE INTO foods (food_name, food_category, restaurant_name, price) VALUES (?, ?, ?, ?)', sample_foods)
+    if cursor.execute('SELECT COUNT(*) FROM foods').fetchone()[0] == 0:
+        cursor.executemany('INSERT OR IGNORE INTO foods (food_name, food_category, restaurant_name, price) VALUES (?, ?, ?, ?)', sample_foods)
 
-    # Insert sample orders
+    # Insert sample orders into an empty database
     sample_orders = [
         ('John Doe', '123-456-7890', 'preparation', None),
         ('Jane Smith', '098-765-4321', 'delivered', 'Great service!'),
     ]
 
-    cursor.executemany('INSERT OR IGNORE INTO food_orders (person_name, person_phone_number, status, comment) VALUES (?, ?, ?, ?)', sample_orders)
+    if cursor.execute('SELECT COUNT(*) FROM food_orders').fetchone()[0] == 0:
+        cursor.executemany('INSERT OR IGNORE INTO food_orders (person_name, person_phone_number, status, comment) VALUES (?, ?, ?, ?)', sample_orders)
 
     # Commit changes and close connection
-    conn.commit()
+    cursor.execute('COMMIT')
     conn.close()
+    return applied
 
 if __name__ == '__main__':
-    init_db()
-    print("Database initialized successfully!") 
\ No newline at end of file
+    for line in describe(init_db()):
+        print(line)
+    print("Database initialized successfully!")
@@ -0,0 +1,90 @@
+from connection import ConnectionManager, DB_PATH
+
+
+# Ordered schema migrations: (version, description, statements).
+# Never edit an applied migration; append a new one instead.
+MIGRATIONS = [
+    (1, 'create foods and food_orders tables', [
+        '''
+        CREATE TABLE IF NOT EXISTS foods (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            food_name TEXT NOT NULL,
+            food_category TEXT,
+            restaurant_name TEXT NOT NULL,
+            price REAL NOT NULL
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS food_orders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            person_name TEXT NOT NULL,
+            person_phone_number TEXT NOT NULL,
+            status TEXT DEFAULT 'preparation',
+            comment TEXT
+        )
+        ''',
+    ]),
+    (2, 'add lookup indexes for order operations and reports', [
+        # cancel_order filters on id, phone number and status together
+        'CREATE INDEX IF NOT EXISTS idx_food_orders_id_phone ON food_orders (id, person_phone_number, status)',
+        'CREATE INDEX IF NOT EXISTS idx_food_orders_phone ON food_orders (person_phone_number)',
+        'CREATE INDEX IF NOT EXISTS idx_food_orders_status ON food_orders (status)',
+        # view_db.py orders foods by restaurant and price and groups them by category
+        'CREATE INDEX IF NOT EXISTS idx_foods_restaurant_price ON foods (restaurant_name, price)',
+        'CREATE INDEX IF NOT EXISTS idx_foods_category ON foods (food_category)',
+    ]),
+]
+
+
+def current_version(connection):
+    """
+    Return the schema version stored in the database.
+    :param connection: SQLite connection
+    :return: Version of the last applied migration (0 for a new database)
+    """
+    return connection.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(connection, target=None):
+    """
+    Apply pending migrations, each in its own transaction. Existing data is kept.
+    :param connection: SQLite connection in autocommit mode
+    :param target: Version to migrate to (default: latest)
+    :return: List of applied migration versions
+    """
+    applied = []
+    version = current_version(connection)
+    for number, description, statements in MIGRATIONS:
+        if number <= version or (target is not None and number > target):
+            continue
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            for statement in statements:
+                connection.execute(statement)
+            connection.execute(f'PRAGMA user_version = {number}')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        applied.append(number)
+    return applied
+
+
+def describe(versions):
+    """
+    Describe applied migrations for command-line output.
+    :param versions: Migration versions returned by migrate()
+    :return: One line per migration
+    """
+    descriptions = {number: description for number, description, _ in MIGRATIONS}
+    return [f"Applied migration {number}: {descriptions[number]}" for number in versions]
+
+
+if __name__ == '__main__':
+    connection = ConnectionManager(DB_PATH).connect()
+    applied = migrate(connection)
+    for line in describe(applied):
+        print(line)
+    if not applied:
+        print(f"Database is up to date (version {current_version(connection)}).")
+    connection.close()
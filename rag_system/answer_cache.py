@@ -0,0 +1,171 @@
+"""
+Answer cache for repeated questions.
+
+Answers are reused when the normalized question matches exactly, or, when a
+similarity threshold is configured, when the question embedding is close
+enough to a cached one. Entries expire after a TTL, the least recently used
+ones are evicted beyond a size limit, and the whole cache is cleared whenever
+the knowledge base changes.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from langchain_core.embeddings import Embeddings
+import re
+import threading
+import time
+import numpy as np
+
+def cache_key(question: str) -> str:
+    """Collapse whitespace and trailing punctuation so trivial variants share a key."""
+    question = re.sub(r"\s+", " ", question.strip().lower())
+    return question.rstrip("?!.؟ ")
+
+class AnswerCache:
+    """
+    Two-tier (exact + semantic) LRU cache of answers and their sources.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 3600,
+        embeddings: Optional[Embeddings] = None,
+        similarity_threshold: Optional[float] = None
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached answers
+            ttl_seconds: Seconds an answer stays valid
+            embeddings: Embeddings used for the semantic tier
+            similarity_threshold: Minimum cosine similarity for a semantic hit;
+                None disables the semantic tier
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+        # Bumped by clear() so answers computed before an invalidation are not stored
+        self.generation = 0
+
+        # key -> (expires_at, answer, sources, unit-length question vector or None)
+        self._entries: "OrderedDict[str, Tuple[float, str, List[Any], Optional[np.ndarray]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def semantic(self) -> bool:
+        """Whether the semantic tier is enabled."""
+        return self.embeddings is not None and self.similarity_threshold is not None
+
+    @staticmethod
+    def _unit(vector: List[float]) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _expire(self, now: float) -> None:
+        expired = [key for key, entry in self._entries.items() if entry[0] <= now]
+        for key in expired:
+            del self._entries[key]
+
+    def _lookup(self, key: str, vector: Optional[np.ndarray]) -> Optional[Tuple[str, List[Any]]]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return entry[1], entry[2]
+
+            if vector is not None:
+                self._expire(now)
+                keys = [k for k, e in self._entries.items() if e[3] is not None]
+                if keys:
+                    matrix = np.stack([self._entries[k][3] for k in keys])
+                    scores = matrix @ vector
+                    best = int(np.argmax(scores))
+                    if scores[best] >= self.similarity_threshold:
+                        self._entries.move_to_end(keys[best])
+                        self.semantic_hits += 1
+                        entry = self._entries[keys[best]]
+                        return entry[1], entry[2]
+
+            self.misses += 1
+            return None
+
+    def _store(self, key: str, answer: str, sources: List[Any], vector: Optional[np.ndarray],
+               generation: Optional[int]) -> None:
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (time.time() + self.ttl_seconds, answer, sources, vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, question: str) -> Optional[Tuple[str, List[Any]]]:
+        """
+        Look up a cached answer.
+
+        Args:
+            question: The normalized question
+
+        Returns:
+            Tuple of answer and sources, or None on a miss
+        """
+        key = cache_key(question)
+        vector = None
+        if self.semantic and key not in self._entries:
+            vector = self._unit(self.embeddings.embed_query(key))
+        return self._lookup(key, vector)
+
+    async def aget(self, question: str) -> Optional[Tuple[str, List[Any]]]:
+        """Async version of ``get``; the question is embedded off the event loop."""
+        key = cache_key(question)
+        vector = None
+        if self.semantic and key not in self._entries:
+            vector = self._unit(await self.embeddings.aembed_query(key))
+        return self._lookup(key, vector)
+
+    def put(self, question: str, answer: str, sources: List[Any], generation: Optional[int] = None) -> None:
+        """
+        Cache an answer.
+
+        Args:
+            question: The normalized question
+            answer: The generated answer
+            sources: The source documents the answer was based on
+            generation: Value of ``generation`` when answering started; the answer
+                is dropped if the cache was cleared in the meantime
+        """
+        key = cache_key(question)
+        vector = self._unit(self.embeddings.embed_query(key)) if self.semantic else None
+        self._store(key, answer, sources, vector, generation)
+
+    async def aput(self, question: str, answer: str, sources: List[Any], generation: Optional[int] = None) -> None:
+        """Async version of ``put``."""
+        key = cache_key(question)
+        vector = self._unit(await self.embeddings.aembed_query(key)) if self.semantic else None
+        self._store(key, answer, sources, vector, generation)
+
+    def clear(self) -> None:
+        """Drop every cached answer, e.g. after the knowledge base changed."""
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the number of cached answers."""
+        with self._lock:
+            return {
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+            }
@@ -0,0 +1,80 @@
+"""
+Compare embedding backends on the knowledge base: time to embed every chunk
+and per-query embedding latency. Only the embedding is timed; writing the
+vectors to Chroma is the same for every backend and is measured by
+rag_system.benchmark_rag.
+
+Run from the repository root, e.g.:
+    python -m rag_system.benchmark_embeddings --backends ollama onnx
+"""
+from rag_system.embedding_backends import EMBEDDING_BACKENDS, create_embeddings
+from rag_system.food_knowledge import FOOD_KNOWLEDGE
+from rag_system.rag import KNOWLEDGE_FILE, load_knowledge
+from rag_system.recipe_splitter import RecipeTextSplitter
+from rag_system.text_normalization import normalize_question, normalize_text
+from langchain.schema import Document
+from pathlib import Path
+import argparse
+import statistics
+import time
+
+QUESTIONS = [
+    "طرز تهیه قورمه سبزی",
+    "مواد لازم کباب کوبیده",
+    "how to cook zereshk polo",
+    "کالری ته چین مرغ",
+    "what are good vegetarian persian dishes",
+]
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+def load_chunks(json_path):
+    """Normalize and split the knowledge base like the RAG system does."""
+    # The bundled recipes stand in until the admin panel has saved a knowledge file
+    source = load_knowledge(json_path) if Path(json_path).exists() else FOOD_KNOWLEDGE
+    splitter = RecipeTextSplitter()
+    documents = [
+        Document(page_content=normalize_text(doc.page_content), metadata=doc.metadata)
+        for doc in source
+    ]
+    return [chunk.page_content for chunk in splitter.split_documents(documents)]
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare embedding backends on the knowledge base.')
+    parser.add_argument('--backends', nargs='+', choices=EMBEDDING_BACKENDS, default=list(EMBEDDING_BACKENDS))
+    parser.add_argument('--knowledge', default=str(KNOWLEDGE_FILE))
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    chunks = load_chunks(args.knowledge)
+    questions = [normalize_question(q) for q in QUESTIONS]
+    print(f"{len(chunks)} chunks, {len(questions)} questions")
+    print(f"{'backend':<45} {'load s':>8} {'embed s':>8} {'chunks/s':>9} {'query p50 ms':>13} {'query max ms':>13}")
+
+    for backend in args.backends:
+        try:
+            load_time, (embeddings, name) = timed(
+                lambda: create_embeddings(backend, batch_size=args.batch_size, workers=args.workers), 1
+            )
+            # Warm up (model download, connection, lazy kernels) outside the measurements
+            embeddings.embed_query(questions[0])
+            embed_time, _ = timed(lambda: embeddings.embed_documents(chunks), args.repeat)
+            query_times = [
+                timed(lambda: embeddings.embed_query(question), args.repeat)[0]
+                for question in questions
+            ]
+        except Exception as e:
+            print(f"{backend:<45} unavailable: {e}")
+            continue
+
+        print(f"{name:<45} {load_time:>8.2f} {embed_time:>8.2f} {len(chunks) / embed_time:>9.1f} "
+              f"{statistics.median(query_times) * 1000:>13.1f} {max(query_times) * 1000:>13.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+"""
+Offline end-to-end benchmark of the RAG system.
+
+Runs the real engine (chunking, embedding cache, Chroma, BM25, retrieval and
+generation through langchain-ollama) against a stand-in Ollama server with
+deterministic embeddings and latency, over a synthetic Persian/English corpus.
+Reports index build time, retrieval latency and end-to-end p50/p95/p99 and
+throughput at each concurrency level, as JSON for regression tracking.
+Failed questions are counted but left out of the latencies, and make the
+benchmark exit with status 1.
+
+Run from the repository root, e.g.:
+    python -m rag_system.benchmark_rag --recipes 10000 --concurrency 1 4 16 --output bench.json
+"""
+from typing import Any, Dict, List, Sequence
+from pathlib import Path
+from rag_system.config import CHUNKING_MODES, RETRIEVER_MODES, RAGConfig
+from rag_system.fake_ollama import FakeOllamaServer, FakeOllamaSettings
+from rag_system.metrics import QueryMetrics, percentile
+from rag_system.synthetic_corpus import synthetic_recipes, write_corpus
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+QUESTION_TEMPLATES = [
+    "طرز تهیه {title}",
+    "کالری {title}",
+    "مواد لازم {title}",
+    "how to cook {title}",
+    "ingredients for {title}",
+    "{title}",
+]
+
+def latency_summary(samples: Sequence[float]) -> Dict[str, float]:
+    """Summarize latencies (seconds) as count, mean and percentiles in milliseconds."""
+    return {
+        "count": len(samples),
+        "mean_ms": sum(samples) / len(samples) * 1000 if samples else float("nan"),
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "max_ms": max(samples) * 1000 if samples else float("nan"),
+    }
+
+def benchmark_questions(recipes: int, count: int, seed: int = 0) -> List[str]:
+    """Ask about random recipes of the synthetic corpus, in Persian and English."""
+    titles = [item["page_content"].split("\n", 1)[0] for item in synthetic_recipes(recipes, seed)]
+    rng = random.Random(seed + 1)
+    return [rng.choice(QUESTION_TEMPLATES).format(title=rng.choice(titles)) for _ in range(count)]
+
+async def run_load(rag, questions: List[str], concurrency: int) -> Dict[str, Any]:
+    """
+    Answer every question with at most ``concurrency`` in flight.
+
+    Returns:
+        Latency summary of the answered questions, throughput and error count
+        of the run
+    """
+    gate = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def ask(question: str) -> None:
+        nonlocal errors
+        async with gate:
+            start = time.perf_counter()
+            answer, _ = await rag.aquery(question)
+            # Failures return at once and would flatter the percentiles
+            if answer.startswith("Sorry"):
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(ask(question) for question in questions))
+    seconds = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "seconds": seconds,
+        "throughput_qps": len(questions) / seconds,
+        "errors": errors,
+        "latency": latency_summary(latencies),
+    }
+
+async def run_levels(rag, questions: List[str], levels: Sequence[int]) -> List[Dict[str, Any]]:
+    """
+    Run the load at every concurrency level in turn.
+
+    All levels share one event loop: the engine's async Ollama client and
+    its connections stay bound to the loop they were first used in.
+
+    Returns:
+        The result of each level, with its per-stage latencies
+    """
+    runs = []
+    for concurrency in levels:
+        print(f"Answering {len(questions)} questions, concurrency {concurrency}...", file=sys.stderr)
+        rag.metrics = QueryMetrics(log_traces=False)
+        run = await run_load(rag, questions, concurrency)
+        run["stages"] = rag.metrics.summary()["stages"]
+        runs.append(run)
+    return runs
+
+def run_benchmark(args: argparse.Namespace, workdir: Path) -> Dict[str, Any]:
+    """Build the index and measure retrieval and end-to-end latency."""
+    from rag_system.rag import FoodRAGSystem
+
+    results: Dict[str, Any] = {
+        "settings": {key: value for key, value in vars(args).items() if key not in ("output", "workdir")},
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+    }
+
+    knowledge_file = workdir / "knowledge.jsonl"
+    start = time.perf_counter()
+    write_corpus(knowledge_file, args.recipes, args.seed)
+    results["corpus"] = {
+        "recipes": args.recipes,
+        "bytes": knowledge_file.stat().st_size,
+        "seconds": time.perf_counter() - start,
+    }
+
+    settings = FakeOllamaSettings(
+        embedding_size=args.embedding_size,
+        embed_request_ms=args.embed_request_ms,
+        embed_text_ms=args.embed_text_ms,
+        first_token_ms=args.first_token_ms,
+        token_ms=args.token_ms,
+        answer_tokens=args.answer_tokens
+    )
+    with FakeOllamaServer(settings) as server:
+        # langchain-ollama clients pick the host up from the environment
+        os.environ["OLLAMA_HOST"] = server.base_url
+        config = RAGConfig(
+            model_name="fake",
+            knowledge_file=knowledge_file,
+            persist_directory=str(workdir / "index"),
+            embedding_cache_path=str(workdir / "embedding_cache.sqlite3"),
+            chunking=args.chunking,
+            retriever_mode=args.retriever_mode,
+            k=args.k,
+            answer_cache_size=0,
+            # Lookups of the synthetic recipes would skip retrieval and
+            # generation, hiding the latencies this benchmark tracks
+            fast_path=False,
+            recipe_filters=False,
+            max_concurrent_queries=max(args.concurrency),
+            max_queued_queries=args.queries
+        )
+        rag = FoodRAGSystem(config)
+        rag.change_log_path = workdir / "changes.jsonl"
+
+        print(f"Indexing {args.recipes} recipes...", file=sys.stderr)
+        build = rag.build_vector_store(batch_size=args.batch_size, workers=args.workers, resume=False)
+        build["chunks_per_second"] = build["chunks"] / build["seconds"] if build["seconds"] else None
+        results["index"] = build
+
+        start = time.perf_counter()
+        rag.ensure_ready()
+        results["open_seconds"] = time.perf_counter() - start
+
+        questions = benchmark_questions(args.recipes, args.queries, args.seed)
+        retrieval = []
+        for question in questions:
+            start = time.perf_counter()
+            rag.retriever.invoke(rag._prepare_question(question))
+            retrieval.append(time.perf_counter() - start)
+        results["retrieval"] = latency_summary(retrieval)
+
+        results["end_to_end"] = asyncio.run(run_levels(rag, questions, args.concurrency))
+    return results
+
+def main():
+    defaults = FakeOllamaSettings()
+    parser = argparse.ArgumentParser(description='Benchmark the RAG system offline against a fake Ollama server.')
+    parser.add_argument('--recipes', type=int, default=10000, help='Synthetic recipes to index')
+    parser.add_argument('--queries', type=int, default=200, help='Questions per concurrency level')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunking', choices=CHUNKING_MODES, default=RAGConfig.chunking)
+    parser.add_argument('--retriever-mode', choices=RETRIEVER_MODES, default=RAGConfig.retriever_mode)
+    parser.add_argument('--k', type=int, default=RAGConfig.k)
+    parser.add_argument('--batch-size', type=int, default=64, help='Chunks per embedding request')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent embedding requests')
+    parser.add_argument('--embedding-size', type=int, default=defaults.embedding_size)
+    parser.add_argument('--embed-request-ms', type=float, default=defaults.embed_request_ms)
+    parser.add_argument('--embed-text-ms', type=float, default=defaults.embed_text_ms)
+    parser.add_argument('--first-token-ms', type=float, default=defaults.first_token_ms)
+    parser.add_argument('--token-ms', type=float, default=defaults.token_ms)
+    parser.add_argument('--answer-tokens', type=int, default=defaults.answer_tokens)
+    parser.add_argument('--workdir', help='Directory for the corpus and index (default: a temporary one)')
+    parser.add_argument('--output', help='Write the JSON results here instead of stdout')
+    args = parser.parse_args()
+
+    if args.workdir:
+        Path(args.workdir).mkdir(parents=True, exist_ok=True)
+        results = run_benchmark(args, Path(args.workdir))
+    else:
+        with tempfile.TemporaryDirectory(prefix="rag-benchmark-") as workdir:
+            results = run_benchmark(args, Path(workdir))
+
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+        for run in results["end_to_end"]:
+            latency = run["latency"]
+            print(f"concurrency {run['concurrency']:>3}: {run['throughput_qps']:.1f} q/s, "
+                  f"p50 {latency['p50_ms']:.0f} ms, p95 {latency['p95_ms']:.0f} ms, "
+                  f"p99 {latency['p99_ms']:.0f} ms", file=sys.stderr)
+    else:
+        print(text)
+
+    errors = sum(run["errors"] for run in results["end_to_end"])
+    if errors:
+        print(f"{errors} questions failed; their latencies are left out", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
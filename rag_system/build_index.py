@@ -0,0 +1,57 @@
+"""
+Build the persisted vector index ahead of time, for large knowledge bases.
+
+Chunks are embedded in batches by a bounded thread pool and inserted into
+Chroma batch by batch. Run the same command again to resume an interrupted
+build; the chat service reuses the finished index on startup.
+
+Run from the repository root, e.g.:
+    python -m rag_system.build_index --workers 4 --batch-size 64
+"""
+from rag_system.config import CHUNKING_MODES, RAGConfig
+from rag_system.embedding_backends import EMBEDDING_BACKENDS
+from rag_system.rag import FoodRAGSystem
+import argparse
+import sys
+
+def print_progress(stats):
+    rate = stats["embedded"] / stats["seconds"] if stats["seconds"] else 0.0
+    print(f"\r{stats['embedded']} chunks embedded, {stats['skipped']} already indexed "
+          f"({rate:.1f} chunks/s)", end="", file=sys.stderr, flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the vector index of the knowledge base.')
+    # Unset options keep the RAG_* environment / default settings the chat service uses
+    parser.add_argument('--knowledge-file', help='Knowledge file (.json or .jsonl)')
+    parser.add_argument('--persist-directory')
+    parser.add_argument('--model-name', help='Ollama model')
+    parser.add_argument('--embedding-backend', choices=EMBEDDING_BACKENDS)
+    parser.add_argument('--embedding-model')
+    parser.add_argument('--chunking', choices=CHUNKING_MODES)
+    parser.add_argument('--chunk-size', type=int)
+    parser.add_argument('--chunk-overlap', type=int)
+    parser.add_argument('--batch-size', type=int, default=64, help='Chunks per embedding request')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent embedding requests')
+    parser.add_argument('--restart', action='store_true', help='Discard an interrupted build')
+    args = parser.parse_args()
+
+    settings = {
+        name: getattr(args, name)
+        for name in ('knowledge_file', 'persist_directory', 'model_name',
+                     'embedding_backend', 'embedding_model', 'chunking',
+                     'chunk_size', 'chunk_overlap')
+        if getattr(args, name) is not None
+    }
+    rag = FoodRAGSystem(RAGConfig.from_env(**settings), answer_cache_size=0)
+    stats = rag.build_vector_store(
+        batch_size=args.batch_size,
+        workers=args.workers,
+        resume=not args.restart,
+        progress=print_progress
+    )
+    print(file=sys.stderr)
+    print(f"Indexed {stats['chunks']} chunks in {stats['seconds']:.1f}s "
+          f"({stats['embedded']} embedded, {stats['skipped']} resumed).")
+
+if __name__ == '__main__':
+    main()
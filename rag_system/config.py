@@ -0,0 +1,132 @@
+"""
+Configuration of the food knowledge RAG engine.
+
+Every entry point (chat service, legacy chat app, command-line tools) builds
+the engine from one RAGConfig, so they share the same models, index location
+and retrieval settings. RAGConfig.from_env() reads overrides from RAG_*
+environment variables.
+"""
+from typing import Any, Callable, Dict, Optional
+from dataclasses import dataclass, fields
+from pathlib import Path
+from rag_system.embedding_backends import EMBEDDING_BACKENDS
+from rag_system.embedding_cache import EMBEDDING_CACHE_FILE
+from rag_system.knowledge_file import KNOWLEDGE_FILE
+import os
+
+RETRIEVER_MODES = ("hybrid", "dense")
+CHUNKING_MODES = ("recipe", "character")
+
+def _optional_float(value: str) -> Optional[float]:
+    return float(value) if value else None
+
+def _optional_int(value: str) -> Optional[int]:
+    return int(value) if value else None
+
+def _flag(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+@dataclass
+class RAGConfig:
+    """
+    Settings of a FoodRAGSystem.
+
+    Attributes:
+        model_name: Ollama model answering the questions
+        embedding_backend: "ollama", "sentence-transformers" or "onnx"
+            (see rag_system.embedding_backends)
+        embedding_model: Embedding model; defaults to model_name for Ollama
+            and a small multilingual sentence-transformer otherwise
+        embedding_cache_path: SQLite file caching chunk embeddings across rebuilds
+        persist_directory: Directory of the persisted Chroma index
+        knowledge_file: Knowledge base the index is built from
+        chunking: "recipe" (one chunk per recipe section) or "character"
+            (fixed-size chunks with overlap)
+        chunk_size: Maximum characters per chunk
+        chunk_overlap: Characters shared by consecutive chunks of an oversized
+            section; defaults to 100 for recipe and 200 for character chunking
+        expand_parents: Replace retrieved sections by the full recipe when the
+            question asks for a whole recipe (recipe chunking only)
+        retriever_mode: "hybrid" (BM25 fused with vector search) or "dense"
+        k: Number of chunks put into the prompt
+        dense_k: Vector search results fused with BM25 results in hybrid mode
+        max_concurrent_queries: Async queries allowed to run against Ollama at once
+        max_queued_queries: Async queries allowed to wait for a free slot before
+            new ones are turned away
+        answer_cache_size: Maximum number of cached answers (0 disables the cache)
+        answer_cache_ttl: Seconds a cached answer stays valid
+        semantic_cache_threshold: Cosine similarity above which a differently
+            worded question reuses a cached answer; None keeps exact matches only
+        fast_path: Answer ingredient, instruction and nutrition lookups of a
+            named recipe straight from its sections, without the LLM (recipe
+            chunking only)
+        recipe_filters: Restrict retrieval to the recipes meeting a question's
+            category, ingredient and nutrition constraints ("main dishes under
+            300 kcal with chicken"; recipe chunking, either retriever mode)
+    """
+
+    model_name: str = "llama3.2"
+    embedding_backend: str = "ollama"
+    embedding_model: Optional[str] = None
+    embedding_cache_path: str = EMBEDDING_CACHE_FILE
+    persist_directory: str = "./food_knowledge_db"
+    knowledge_file: Path = KNOWLEDGE_FILE
+    chunking: str = "recipe"
+    chunk_size: int = 1000
+    chunk_overlap: Optional[int] = None
+    expand_parents: bool = True
+    retriever_mode: str = "hybrid"
+    k: int = 3
+    dense_k: int = 2
+    max_concurrent_queries: int = 4
+    max_queued_queries: int = 32
+    answer_cache_size: int = 1000
+    answer_cache_ttl: float = 3600
+    semantic_cache_threshold: Optional[float] = None
+    fast_path: bool = True
+    recipe_filters: bool = True
+
+    def __post_init__(self):
+        if self.retriever_mode not in RETRIEVER_MODES:
+            raise ValueError(f"Unknown retriever mode: {self.retriever_mode}")
+        if self.chunking not in CHUNKING_MODES:
+            raise ValueError(f"Unknown chunking: {self.chunking}")
+        if self.chunk_overlap is not None and not 0 <= self.chunk_overlap < self.chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+        if self.embedding_backend not in EMBEDDING_BACKENDS:
+            raise ValueError(f"Unknown embedding backend: {self.embedding_backend}")
+        self.knowledge_file = Path(self.knowledge_file)
+
+    @classmethod
+    def from_env(cls, **overrides: Any) -> "RAGConfig":
+        """
+        Build a config from RAG_<SETTING> environment variables (e.g. RAG_K=5).
+
+        Args:
+            overrides: Settings that take precedence over the environment
+
+        Returns:
+            The config
+        """
+        parsers: Dict[str, Callable[[str], Any]] = {
+            "knowledge_file": Path,
+            "chunk_size": int,
+            "chunk_overlap": _optional_int,
+            "expand_parents": _flag,
+            "k": int,
+            "dense_k": int,
+            "max_concurrent_queries": int,
+            "max_queued_queries": int,
+            "answer_cache_size": int,
+            "answer_cache_ttl": float,
+            "semantic_cache_threshold": _optional_float,
+            "fast_path": _flag,
+            "recipe_filters": _flag,
+        }
+        settings = {}
+        for field in fields(cls):
+            value = os.environ.get(f"RAG_{field.name.upper()}")
+            if value is not None:
+                settings[field.name] = parsers.get(field.name, str)(value)
+        settings.update(overrides)
+        return cls(**settings)
@@ -0,0 +1,140 @@
+"""
+Pluggable embedding backends for the RAG system.
+
+"ollama" embeds through the Ollama server, the others run a small
+sentence-transformer in process: "sentence-transformers" (PyTorch) or "onnx"
+(onnxruntime with a Hugging Face tokenizer). In-process models embed in
+batches spread over a thread pool; both runtimes release the GIL while
+computing.
+"""
+from typing import Callable, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.embeddings import Embeddings
+import os
+
+EMBEDDING_BACKENDS = ("ollama", "sentence-transformers", "onnx")
+
+# Small multilingual model; the recipes are mostly Persian
+DEFAULT_LOCAL_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+
+class BatchedEmbeddings(Embeddings):
+    """
+    Embed documents in fixed-size batches run concurrently on a thread pool.
+    """
+
+    def __init__(self, encode: Callable[[List[str]], List[List[float]]], batch_size: int = 32, workers: int = 2):
+        """
+        Initialize the wrapper.
+
+        Args:
+            encode: Function embedding one batch of texts
+            batch_size: Texts per batch
+            workers: Batches embedded at once
+        """
+        self.encode = encode
+        self.batch_size = batch_size
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embed")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(batches) <= 1:
+            return self.encode(texts) if texts else []
+        vectors = []
+        for batch in self._executor.map(self.encode, batches):
+            vectors.extend(batch)
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.encode([text])[0]
+
+def _sentence_transformer_encoder(model_name: str) -> Callable[[List[str]], List[List[float]]]:
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError as e:
+        raise ImportError(
+            "The sentence-transformers backend needs the sentence-transformers package "
+            "(pip install -r rag_system/requirements-embeddings.txt)"
+        ) from e
+    model = SentenceTransformer(model_name, device="cpu")
+
+    def encode(texts: List[str]) -> List[List[float]]:
+        return model.encode(texts, batch_size=len(texts), normalize_embeddings=True).tolist()
+    return encode
+
+def _onnx_encoder(model_name: str, max_length: int = 256) -> Callable[[List[str]], List[List[float]]]:
+    try:
+        import numpy as np
+        import onnxruntime
+        from huggingface_hub import hf_hub_download
+        from tokenizers import Tokenizer
+    except ImportError as e:
+        raise ImportError(
+            "The onnx backend needs the onnxruntime, tokenizers and huggingface_hub packages "
+            "(pip install -r rag_system/requirements-embeddings.txt)"
+        ) from e
+
+    # A local export directory, or a Hugging Face repository with an onnx/ export
+    if os.path.isdir(model_name):
+        model_path = os.path.join(model_name, "model.onnx")
+        tokenizer_path = os.path.join(model_name, "tokenizer.json")
+    else:
+        model_path = hf_hub_download(model_name, "onnx/model.onnx")
+        tokenizer_path = hf_hub_download(model_name, "tokenizer.json")
+
+    tokenizer = Tokenizer.from_file(tokenizer_path)
+    tokenizer.enable_truncation(max_length=max_length)
+    tokenizer.enable_padding()
+    options = onnxruntime.SessionOptions()
+    # Parallelism comes from the batch thread pool
+    options.intra_op_num_threads = 1
+    session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+    input_names = {model_input.name for model_input in session.get_inputs()}
+
+    def encode(texts: List[str]) -> List[List[float]]:
+        encodings = tokenizer.encode_batch(texts)
+        inputs = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        (tokens, *_) = session.run(None, {name: value for name, value in inputs.items() if name in input_names})
+        # Mean pooling over real tokens, then L2 normalization as in sentence-transformers
+        mask = inputs["attention_mask"][:, :, None].astype(np.float32)
+        vectors = (tokens * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return vectors.tolist()
+    return encode
+
+def create_embeddings(
+    backend: str = "ollama",
+    model_name: Optional[str] = None,
+    batch_size: int = 32,
+    workers: int = 2
+) -> Tuple[Embeddings, str]:
+    """
+    Create the embeddings model for a backend.
+
+    Args:
+        backend: One of EMBEDDING_BACKENDS
+        model_name: Model to load; defaults to llama3.2 for Ollama and a small
+            multilingual sentence-transformer otherwise
+        batch_size: Texts per batch for in-process backends
+        workers: Batches embedded concurrently by in-process backends
+
+    Returns:
+        Tuple of the embeddings and an ID ("<backend>:<model>") for cache keys
+    """
+    if backend == "ollama":
+        from langchain_ollama import OllamaEmbeddings
+        model_name = model_name or "llama3.2"
+        return OllamaEmbeddings(model=model_name), f"ollama:{model_name}"
+
+    model_name = model_name or DEFAULT_LOCAL_MODEL
+    if backend == "sentence-transformers":
+        encode = _sentence_transformer_encoder(model_name)
+    elif backend == "onnx":
+        encode = _onnx_encoder(model_name)
+    else:
+        raise ValueError(f"Unknown embedding backend: {backend}")
+    return BatchedEmbeddings(encode, batch_size=batch_size, workers=workers), f"{backend}:{model_name}"
@@ -0,0 +1,208 @@
+"""
+Persistent, size-bounded embedding cache for the RAG system.
+
+Embeddings are stored on disk keyed by (embedding model, hash of the text), so
+rebuilding the vector store only pays for chunks that actually changed.
+"""
+from typing import Dict, List, Optional
+from array import array
+from langchain_core.embeddings import Embeddings
+from rag_system.metrics import timed
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Default location and size of the cache
+EMBEDDING_CACHE_FILE = "./embedding_cache.sqlite3"
+DEFAULT_MAX_ENTRIES = 20000
+
+# SQLite limits the number of bound parameters per statement
+_LOOKUP_BATCH = 500
+
+# Share of max_entries evicted at once, so a full cache does not evict on every insert
+_EVICTION_BATCH = 0.1
+
+def text_hash(text: str) -> str:
+    """Return the cache key for a piece of text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wrap an embeddings model with an on-disk LRU cache.
+
+    Only texts missing from the cache are sent to the underlying model, in a
+    single batch per call. The least recently used entries are evicted in
+    batches once the cache grows past ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model_name: str,
+        cache_path: str = EMBEDDING_CACHE_FILE,
+        max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            embeddings: The embeddings model to wrap
+            model_name: Identifies the model in cache keys, e.g. "ollama:llama3.2"
+            cache_path: Path of the SQLite cache file
+            max_entries: Maximum number of vectors kept on disk
+        """
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+
+        # Hit/miss counters since creation (or the last reset_stats call)
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(cache_path, check_same_thread=False)
+        # Every embedded question commits; in WAL mode a commit does not wait for a sync
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+        """)
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)"
+        )
+        self._connection.commit()
+        # Running row count, so inserts need not count the table
+        self._entries = self._count()
+
+    def _count(self) -> int:
+        (count,) = self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        return count
+
+    def _lookup(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Fetch cached vectors for the given keys and mark them as recently used."""
+        found = {}
+        now = time.time()
+        for start in range(0, len(keys), _LOOKUP_BATCH):
+            batch = keys[start:start + _LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._connection.execute(
+                f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                [self.model_name, *batch]
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = array("f", blob).tolist()
+        if found:
+            self._connection.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                [(now, self.model_name, key) for key in found]
+            )
+        return found
+
+    def _store(self, vectors: Dict[str, List[float]]) -> None:
+        """Insert new vectors and evict the least recently used overflow."""
+        now = time.time()
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+            [(self.model_name, key, array("f", vector).tobytes(), now) for key, vector in vectors.items()]
+        )
+        # Vectors are only stored after a cache miss, so they are new rows
+        # unless another process stored them meanwhile; recounting after an
+        # eviction corrects the estimate
+        self._entries += len(vectors)
+        if self._entries > self.max_entries:
+            self._entries = self._count()
+        if self._entries > self.max_entries:
+            excess = self._entries - int(self.max_entries * (1 - _EVICTION_BATCH))
+            logger.debug("Evicting %d embeddings from %s", excess, self.cache_path)
+            self._connection.execute(
+                "DELETE FROM embeddings WHERE rowid IN "
+                "(SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+            self._entries = self._count()
+
+    def _embed(self, texts: List[str], kind: str) -> List[List[float]]:
+        """Embed texts through the cache; ``kind`` separates query and document vectors."""
+        keys = [text_hash(f"{kind}\0{text}") for text in texts]
+
+        with self._lock:
+            cached = self._lookup(list(set(keys)))
+            self._connection.commit()
+
+            # Embed each missing text once, even if it appears several times
+            missing = {}
+            for key, text in zip(keys, texts):
+                if key not in cached and key not in missing:
+                    missing[key] = text
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            if kind == "query":
+                computed = [self.embeddings.embed_query(text) for text in missing.values()]
+            else:
+                computed = self.embeddings.embed_documents(list(missing.values()))
+            new_vectors = dict(zip(missing.keys(), computed))
+            with self._lock:
+                self._store(new_vectors)
+                self._connection.commit()
+            cached.update(new_vectors)
+
+        return [cached[key] for key in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents, reusing cached vectors for unchanged texts."""
+        return self._embed(texts, "document")
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query, reusing the cached vector for repeated questions."""
+        with timed("embedding"):
+            return self._embed([text], "query")[0]
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Report cache effectiveness.
+
+        Returns:
+            Dictionary with hits, misses, hit_rate and the number of stored entries
+        """
+        with self._lock:
+            entries = self._count()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+        }
+
+    def reset_stats(self) -> None:
+        """Reset the hit/miss counters."""
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self, model_name: Optional[str] = None) -> None:
+        """
+        Remove cached vectors.
+
+        Args:
+            model_name: Only remove vectors of this model (default: all models)
+        """
+        with self._lock:
+            if model_name is None:
+                self._connection.execute("DELETE FROM embeddings")
+            else:
+                self._connection.execute("DELETE FROM embeddings WHERE model = ?", (model_name,))
+            self._connection.commit()
+            self._entries = self._count()
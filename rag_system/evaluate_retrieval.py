@@ -0,0 +1,225 @@
+"""
+Retrieval quality and cost evaluation of FoodRAGSystem configurations.
+
+Asks a labeled set of questions, each about one known recipe, against every
+combination of chunking, chunk size, retriever mode and k, and reports
+recall@k, mean reciprocal rank, the context size the retrieved chunks add to
+the prompt and the retrieval latency. The cheapest configuration (fewest
+context tokens) whose recall is within --max-recall-drop of the best one is
+recommended.
+
+By default the questions are generated from the titles of the bundled recipes
+(rag_system.persian_recipes and rag_system.food_knowledge); --knowledge
+evaluates another knowledge file and --questions a hand-labeled JSON Lines
+file of {"question": ..., "recipe_id": ...}. Run from the repository root, e.g.:
+    python -m rag_system.evaluate_retrieval --chunk-sizes 400 1000 --k 1 3 5 --offline
+"""
+from typing import Any, Dict, Iterable, List, Optional
+from pathlib import Path
+from rag_system.benchmark_rag import latency_summary
+from rag_system.config import CHUNKING_MODES, RETRIEVER_MODES, RAGConfig
+from rag_system.fake_ollama import FakeOllamaServer
+from rag_system.knowledge_changes import document_id
+from rag_system.knowledge_file import iter_items, seed_knowledge_file
+from rag_system.recipe_splitter import RecipeTextSplitter
+from rag_system.text_normalization import normalize_text
+import argparse
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+# Question templates per recipe section; texts without sections are asked about by title
+QUESTION_TEMPLATES = {
+    "instructions": ["طرز تهیه {title}", "How do I make {title}?"],
+    "ingredients": ["مواد لازم {title} چیست؟"],
+    "nutrition": ["کالری {title} چقدر است؟"],
+    None: ["درباره {title} توضیح بده"],
+}
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+def approximate_tokens(text: str) -> int:
+    """Count words and punctuation marks, a tokenizer-free proxy for LLM tokens."""
+    return len(_TOKEN.findall(text))
+
+def labeled_questions(items: Iterable[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """
+    Generate questions about each knowledge item, labeled with its recipe ID.
+
+    Args:
+        items: Knowledge items with "page_content" and "metadata"
+
+    Returns:
+        List of {"question", "recipe_id"} dictionaries
+    """
+    splitter = RecipeTextSplitter()
+    questions = []
+    for item in items:
+        title, sections = splitter.split_sections(normalize_text(item["page_content"]))
+        names = {name for name, _ in sections} & QUESTION_TEMPLATES.keys() or {None}
+        for name in sorted(names, key=str):
+            for template in QUESTION_TEMPLATES[name]:
+                questions.append({"question": template.format(title=title), "recipe_id": document_id(item)})
+    return questions
+
+def read_questions(path: Path) -> List[Dict[str, str]]:
+    """Read a labeled question set, one {"question", "recipe_id"} object per line."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def evaluate(rag, questions: List[Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Ask every question through the retriever of ``rag`` and score the results.
+
+    The questions are asked once untimed first, so the latencies compare the
+    retrieval settings with the question embeddings already cached.
+
+    Returns:
+        recall_at_k, mrr, average context tokens and characters, and latency
+    """
+    found, reciprocal_ranks, tokens, chars, latencies = 0, 0.0, 0, 0, []
+    for labeled in questions:
+        rag.retriever.invoke(rag._prepare_question(labeled["question"]))
+    for labeled in questions:
+        # Questions go through the same preparation as in FoodRAGSystem.query
+        query = rag._prepare_question(labeled["question"])
+        start = time.perf_counter()
+        documents = rag.retriever.invoke(query)
+        latencies.append(time.perf_counter() - start)
+
+        ids = [doc.metadata.get("id") for doc in documents]
+        if labeled["recipe_id"] in ids:
+            found += 1
+            reciprocal_ranks += 1 / (ids.index(labeled["recipe_id"]) + 1)
+        context = "\n\n".join(doc.page_content for doc in documents)
+        tokens += approximate_tokens(context)
+        chars += len(context)
+
+    n = len(questions)
+    return {
+        "recall_at_k": found / n,
+        "mrr": reciprocal_ranks / n,
+        "avg_context_tokens": tokens / n,
+        "avg_context_chars": chars / n,
+        "latency": latency_summary(latencies),
+    }
+
+def configurations(args: argparse.Namespace) -> Iterable[Dict[str, Any]]:
+    """Every retriever setting to evaluate on one index, dense_k only varying in hybrid mode."""
+    for mode, k in itertools.product(args.retriever_modes, args.k):
+        for dense_k in (args.dense_k if mode == "hybrid" else [None]):
+            yield {"retriever_mode": mode, "k": k, "dense_k": dense_k}
+
+def run_evaluation(args: argparse.Namespace, workdir: Path) -> Dict[str, Any]:
+    """Build one index per chunking setting and evaluate every retriever setting on it."""
+    from rag_system.rag import FoodRAGSystem
+
+    knowledge_file = Path(args.knowledge) if args.knowledge else workdir / "knowledge.json"
+    if not args.knowledge:
+        seed_knowledge_file(knowledge_file)
+    if args.questions:
+        questions = read_questions(args.questions)
+    else:
+        questions = labeled_questions(iter_items(knowledge_file))
+    if args.max_questions and len(questions) > args.max_questions:
+        questions = random.Random(args.seed).sample(questions, args.max_questions)
+    print(f"{len(questions)} labeled questions", file=sys.stderr)
+
+    results = []
+    for chunking, chunk_size in itertools.product(args.chunkings, args.chunk_sizes):
+        config = RAGConfig.from_env(
+            knowledge_file=knowledge_file,
+            persist_directory=str(workdir / f"index-{chunking}-{chunk_size}"),
+            chunking=chunking,
+            chunk_size=chunk_size,
+            chunk_overlap=min(chunk_size // 5, 100 if chunking == "recipe" else 200),
+            expand_parents=not args.no_expand_parents,
+            answer_cache_size=0,
+            **({"embedding_cache_path": str(workdir / "embedding_cache.sqlite3")} if args.offline else {})
+        )
+        rag = FoodRAGSystem(config)
+        rag.change_log_path = workdir / "changes.jsonl"
+        print(f"Indexing with {chunking} chunks of {chunk_size} characters...", file=sys.stderr)
+        rag.load_or_create_vector_store()
+        chunks = len(rag.sparse_index)
+
+        for settings in configurations(args):
+            rag.retriever_mode, rag.k = settings["retriever_mode"], settings["k"]
+            rag.dense_k = settings["dense_k"] or config.dense_k
+            rag.create_retriever()
+            results.append({
+                "chunking": chunking,
+                "chunk_size": chunk_size,
+                **settings,
+                "chunks": chunks,
+                **evaluate(rag, questions),
+            })
+    return {"questions": len(questions), "results": results}
+
+def recommend(results: List[Dict[str, Any]], max_recall_drop: float) -> Optional[Dict[str, Any]]:
+    """Cheapest configuration (context tokens, then latency) keeping recall near the best."""
+    if not results:
+        return None
+    best = max(result["recall_at_k"] for result in results)
+    candidates = [result for result in results if result["recall_at_k"] >= best - max_recall_drop]
+    return min(candidates, key=lambda result: (result["avg_context_tokens"], result["latency"]["p50_ms"]))
+
+def print_table(results: List[Dict[str, Any]]) -> None:
+    print(f"{'chunking':<10} {'size':>5} {'mode':<7} {'k':>3} {'dense_k':>7} {'chunks':>7} "
+          f"{'recall@k':>9} {'MRR':>6} {'ctx tokens':>11} {'p50 ms':>7} {'p95 ms':>7}")
+    for r in results:
+        print(f"{r['chunking']:<10} {r['chunk_size']:>5} {r['retriever_mode']:<7} {r['k']:>3} "
+              f"{r['dense_k'] if r['dense_k'] is not None else '-':>7} {r['chunks']:>7} "
+              f"{r['recall_at_k']:>9.3f} {r['mrr']:>6.3f} {r['avg_context_tokens']:>11.1f} "
+              f"{r['latency']['p50_ms']:>7.1f} {r['latency']['p95_ms']:>7.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Evaluate retrieval quality and cost of RAG configurations.')
+    parser.add_argument('--knowledge', help='Knowledge file to evaluate (default: the bundled recipes)')
+    parser.add_argument('--questions', help='Labeled questions, JSON Lines of {"question", "recipe_id"}')
+    parser.add_argument('--max-questions', type=int, help='Evaluate a random sample of the questions')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunkings', nargs='+', choices=CHUNKING_MODES, default=list(CHUNKING_MODES))
+    parser.add_argument('--chunk-sizes', type=int, nargs='+', default=[RAGConfig.chunk_size])
+    parser.add_argument('--retriever-modes', nargs='+', choices=RETRIEVER_MODES, default=list(RETRIEVER_MODES))
+    parser.add_argument('--k', type=int, nargs='+', default=[1, 3, 5])
+    parser.add_argument('--dense-k', type=int, nargs='+', default=[RAGConfig.dense_k])
+    parser.add_argument('--no-expand-parents', action='store_true',
+                        help='Keep retrieved sections instead of expanding them to the full recipe')
+    parser.add_argument('--max-recall-drop', type=float, default=0.0,
+                        help='Recall the recommended configuration may lose against the best one')
+    parser.add_argument('--offline', action='store_true', help='Embed with the fake Ollama server')
+    parser.add_argument('--workdir', help='Directory for the indexes; reused across runs (default: temporary)')
+    parser.add_argument('--output', help='Also write the results as JSON')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="rag-evaluation-") as tmp:
+        workdir = Path(args.workdir or tmp)
+        workdir.mkdir(parents=True, exist_ok=True)
+        if args.offline:
+            with FakeOllamaServer() as server:
+                # langchain-ollama clients pick the host up from the environment
+                os.environ["OLLAMA_HOST"] = server.base_url
+                evaluation = run_evaluation(args, workdir)
+        else:
+            evaluation = run_evaluation(args, workdir)
+
+    print_table(evaluation["results"])
+    best = recommend(evaluation["results"], args.max_recall_drop)
+    if best:
+        dense_k = f", dense_k={best['dense_k']}" if best["dense_k"] is not None else ""
+        print(f"\nCheapest configuration within {args.max_recall_drop:.2f} of the best recall: "
+              f"chunking={best['chunking']}, chunk_size={best['chunk_size']}, "
+              f"retriever_mode={best['retriever_mode']}, k={best['k']}{dense_k} "
+              f"(recall@k {best['recall_at_k']:.3f}, {best['avg_context_tokens']:.0f} context tokens)")
+    evaluation["recommended"] = best
+    if args.output:
+        Path(args.output).write_text(json.dumps(evaluation, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+"""
+Stand-in Ollama HTTP server with deterministic embeddings and latency.
+
+Implements the parts of the Ollama API the RAG system uses (/api/generate,
+/api/embed and the older /api/embeddings), so benchmarks and smoke tests run
+without a GPU or a downloaded model. Embeddings are hashed bags of words: the
+same text always gets the same vector and texts sharing terms are close, so
+retrieval behaves sensibly. Answers are fixed filler text streamed token by
+token at a configurable pace.
+
+Run it in place of Ollama with:
+    python -m rag_system.fake_ollama --port 11434
+"""
+from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from rag_system.hybrid_retrieval import tokenize
+from rag_system.text_normalization import normalize_characters
+import argparse
+import hashlib
+import json
+import math
+import threading
+import time
+
+@dataclass
+class FakeOllamaSettings:
+    """Latency and output shape of the fake server."""
+    embedding_size: int = 256
+    embed_request_ms: float = 2.0
+    embed_text_ms: float = 0.5
+    first_token_ms: float = 50.0
+    token_ms: float = 5.0
+    answer_tokens: int = 40
+
+def hashed_embedding(text: str, size: int = 256) -> List[float]:
+    """
+    Embed text as an L2-normalized hashed bag of words.
+
+    Args:
+        text: Text to embed
+        size: Number of dimensions
+
+    Returns:
+        Deterministic vector; texts sharing terms have a positive dot product
+    """
+    vector = [0.0] * size
+    for term in tokenize(normalize_characters(text)):
+        digest = hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest()
+        bucket = int.from_bytes(digest[:4], "little") % size
+        vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+def _timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def settings(self) -> FakeOllamaSettings:
+        return self.server.settings
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _send_json(self, payload: Dict[str, Any], status: int = 200) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path in ("/", "/api/version"):
+            self._send_json({"version": "0.0.0-fake"})
+        elif self.path == "/api/tags":
+            self._send_json({"models": []})
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def do_POST(self) -> None:
+        request = self._read_json()
+        if self.path == "/api/embed":
+            texts = request.get("input", [])
+            texts = [texts] if isinstance(texts, str) else texts
+            self._send_json({"model": request.get("model"), "embeddings": self._embed(texts)})
+        elif self.path == "/api/embeddings":
+            self._send_json({"embedding": self._embed([request.get("prompt", "")])[0]})
+        elif self.path == "/api/generate":
+            self._generate(request)
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        settings = self.settings
+        time.sleep((settings.embed_request_ms + settings.embed_text_ms * len(texts)) / 1000)
+        return [hashed_embedding(text, settings.embedding_size) for text in texts]
+
+    def _generate(self, request: Dict[str, Any]) -> None:
+        settings = self.settings
+        options = request.get("options") or {}
+        tokens = settings.answer_tokens
+        if options.get("num_predict") is not None and options["num_predict"] >= 0:
+            tokens = min(tokens, options["num_predict"])
+        prompt_tokens = len(request.get("prompt", "").split())
+        words = [f"word{i} " for i in range(tokens)]
+
+        if not request.get("stream", True):
+            time.sleep((settings.first_token_ms + settings.token_ms * tokens) / 1000)
+            self._send_json(self._final_chunk(request, "".join(words), prompt_tokens, tokens))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        time.sleep(settings.first_token_ms / 1000)
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(settings.token_ms / 1000)
+            self._write_chunk({
+                "model": request.get("model"), "created_at": _timestamp(),
+                "response": word, "done": False
+            })
+        self._write_chunk(self._final_chunk(request, "", prompt_tokens, tokens))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _final_chunk(self, request: Dict[str, Any], text: str, prompt_tokens: int, tokens: int) -> Dict[str, Any]:
+        return {
+            "model": request.get("model"), "created_at": _timestamp(),
+            "response": text, "done": True, "done_reason": "stop",
+            "prompt_eval_count": prompt_tokens, "eval_count": tokens,
+        }
+
+    def _write_chunk(self, payload: Dict[str, Any]) -> None:
+        line = (json.dumps(payload) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+        self.wfile.flush()
+
+class FakeOllamaServer:
+    """
+    Fake Ollama server running on a background thread.
+
+    Use as a context manager; ``base_url`` is what OllamaLLM/OllamaEmbeddings
+    (or the OLLAMA_HOST environment variable) should point at.
+    """
+
+    def __init__(self, settings: Optional[FakeOllamaSettings] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize the server.
+
+        Args:
+            settings: Latency and output shape (default: FakeOllamaSettings())
+            host: Interface to listen on
+            port: Port to listen on; 0 picks a free port
+        """
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.settings = settings or FakeOllamaSettings()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self) -> None:
+        """Serve on the calling thread until interrupted."""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def start(self) -> "FakeOllamaServer":
+        """Serve on a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeOllamaServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+def main():
+    defaults = FakeOllamaSettings()
+    parser = argparse.ArgumentParser(description='Serve a deterministic stand-in for the Ollama API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11434)
+    parser.add_argument('--embedding-size', type=int, default=defaults.embedding_size)
+    parser.add_argument('--embed-request-ms', type=float, default=defaults.embed_request_ms)
+    parser.add_argument('--embed-text-ms', type=float, default=defaults.embed_text_ms)
+    parser.add_argument('--first-token-ms', type=float, default=defaults.first_token_ms)
+    parser.add_argument('--token-ms', type=float, default=defaults.token_ms)
+    parser.add_argument('--answer-tokens', type=int, default=defaults.answer_tokens)
+    args = parser.parse_args()
+
+    settings = FakeOllamaSettings(
+        embedding_size=args.embedding_size,
+        embed_request_ms=args.embed_request_ms,
+        embed_text_ms=args.embed_text_ms,
+        first_token_ms=args.first_token_ms,
+        token_ms=args.token_ms,
+        answer_tokens=args.answer_tokens
+    )
+    server = FakeOllamaServer(settings, args.host, args.port)
+    print(f"Fake Ollama listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+"""
+Hybrid sparse (BM25) + dense retrieval for the RAG system.
+
+Dish names such as "قورمه سبزی" are matched exactly by an in-process BM25
+index, while the vector store contributes semantic matches. The two rankings
+are merged with reciprocal rank fusion, so fewer dense results are needed.
+"""
+from typing import Any, Callable, Collection, Dict, Iterable, List, Optional, Set, Tuple
+from collections import Counter, defaultdict
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+)
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStore
+from pydantic import ConfigDict
+from rag_system.metrics import timed
+from rag_system.text_normalization import normalize_characters
+import asyncio
+import math
+import re
+import threading
+
+# ZWNJ joins a word and its suffix ("کباب\u200cها"); index both parts separately
+_TOKEN = re.compile(r"\w+")
+
+# Function words that name nothing; BM25 already weighs them down, while the
+# fast path and the recipe filters ignore them when comparing terms
+STOPWORDS = frozenset([
+    "a", "an", "the", "and", "or", "of", "with", "to", "in", "on", "for", "from",
+    "is", "are", "be", "it", "its", "i", "me", "my", "do", "does", "can", "some",
+    "و", "یا", "با", "از", "به", "در", "برای", "را", "که", "این", "آن", "یک", "هم", "تا",
+    "است", "هست", "ی", "ها", "های", "شده", "کرده", "می", "من",
+])
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split normalized text into lowercase terms.
+
+    Args:
+        text: Text in Persian, English or a mix of both
+
+    Returns:
+        List of terms
+    """
+    text = normalize_characters(text).lower()
+    return _TOKEN.findall(text.replace("\u200c", " "))
+
+class BM25Index:
+    """
+    Okapi BM25 index over document chunks, keyed by chunk ID.
+
+    Supports adding and removing chunks so it can follow incremental index
+    updates without being rebuilt.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize an empty index.
+
+        Args:
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self.documents: Dict[str, Document] = {}
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._lengths: Dict[str, int] = {}
+        self._total_length = 0
+        # Updates may run in a worker thread while queries read the index
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add(self, documents: Iterable[Document], ids: Iterable[str]) -> None:
+        """
+        Add (or replace) chunks.
+
+        Args:
+            documents: The chunks
+            ids: Their vector store IDs
+        """
+        with self._lock:
+            for chunk_id, doc in zip(ids, documents):
+                if chunk_id in self.documents:
+                    self.remove([chunk_id])
+                terms = Counter(tokenize(doc.page_content))
+                for term, count in terms.items():
+                    self._postings[term][chunk_id] = count
+                length = sum(terms.values())
+                self._lengths[chunk_id] = length
+                self._total_length += length
+                self.documents[chunk_id] = doc
+
+    def remove(self, ids: Iterable[str]) -> None:
+        """
+        Remove chunks by ID; unknown IDs are ignored.
+
+        Args:
+            ids: Vector store IDs of the chunks to remove
+        """
+        with self._lock:
+            for chunk_id in ids:
+                doc = self.documents.pop(chunk_id, None)
+                if doc is None:
+                    continue
+                for term in set(tokenize(doc.page_content)):
+                    postings = self._postings.get(term)
+                    if postings is not None:
+                        postings.pop(chunk_id, None)
+                        if not postings:
+                            del self._postings[term]
+                self._total_length -= self._lengths.pop(chunk_id)
+
+    def remove_where(self, key: str, values: Iterable[Any]) -> None:
+        """Remove every chunk whose metadata ``key`` is one of ``values``."""
+        values = set(values)
+        with self._lock:
+            self.remove([
+                chunk_id for chunk_id, doc in self.documents.items()
+                if doc.metadata.get(key) in values
+            ])
+
+    def search(self, query: str, k: int = 4, ids: Optional[Collection[str]] = None) -> List[Tuple[Document, float]]:
+        """
+        Rank chunks against a query.
+
+        Args:
+            query: The query text
+            k: Number of results
+            ids: Only rank chunks whose metadata "id" (recipe ID) is one of these
+
+        Returns:
+            Up to k (chunk, score) pairs, best first; chunks sharing no term are omitted
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            if not self.documents:
+                return []
+
+            n = len(self.documents)
+            average_length = self._total_length / n or 1
+            scores: Dict[str, float] = defaultdict(float)
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, tf in postings.items():
+                    if ids is not None and self.documents[chunk_id].metadata.get("id") not in ids:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[chunk_id] / average_length)
+                    scores[chunk_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+            best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+            return [(self.documents[chunk_id], score) for chunk_id, score in best]
+
+def _fusion_key(doc: Document) -> Tuple[Optional[str], str]:
+    return doc.metadata.get("id"), doc.page_content
+
+def reciprocal_rank_fusion(rankings: List[List[Document]], k: int = 60) -> List[Document]:
+    """
+    Merge ranked lists with reciprocal rank fusion.
+
+    Args:
+        rankings: Ranked document lists, best first
+        k: RRF constant; larger values flatten the influence of top ranks
+
+    Returns:
+        Documents ordered by fused score, duplicates merged
+    """
+    scores: Dict[Tuple[Optional[str], str], float] = defaultdict(float)
+    documents: Dict[Tuple[Optional[str], str], Document] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking):
+            key = _fusion_key(doc)
+            scores[key] += 1.0 / (k + rank + 1)
+            documents.setdefault(key, doc)
+    return [documents[key] for key in sorted(scores, key=scores.get, reverse=True)]
+
+class HybridRetriever(BaseRetriever):
+    """
+    Retriever fusing BM25 results with vector store results.
+
+    With ``sparse_k=0`` it is a plain vector search that still applies the
+    prefilter.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    vector_store: VectorStore
+    sparse_index: BM25Index
+    k: int = 3
+    dense_k: int = 2
+    sparse_k: int = 3
+    rrf_k: int = 60
+    # Returns the recipe IDs a query is restricted to, or None for no restriction
+    prefilter: Optional[Callable[[str], Optional[Set[str]]]] = None
+
+    def _allowed(self, query: str) -> Optional[Set[str]]:
+        # An empty selection would leave the LLM without any context, so a
+        # question no document qualifies for is answered from unfiltered results
+        return (self.prefilter(query) if self.prefilter else None) or None
+
+    def _dense_filter(self, allowed: Optional[Set[str]]) -> Dict[str, Any]:
+        return {} if allowed is None else {"filter": {"id": {"$in": sorted(allowed)}}}
+
+    def _fuse(self, dense: List[Document], sparse: List[Document]) -> List[Document]:
+        return reciprocal_rank_fusion([sparse, dense], k=self.rrf_k)[:self.k]
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        allowed = self._allowed(query)
+        with timed("sparse_search"):
+            sparse = [
+                doc for doc, _ in self.sparse_index.search(query, self.sparse_k, allowed)
+            ] if self.sparse_k else []
+        with timed("dense_search"):
+            dense = self.vector_store.similarity_search(
+                query, k=self.dense_k, **self._dense_filter(allowed)
+            ) if self.dense_k else []
+        return self._fuse(dense, sparse)
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        # The prefilter's first call parses the whole corpus; keep it off the loop
+        allowed = await asyncio.to_thread(self._allowed, query) if self.prefilter else None
+        with timed("sparse_search"):
+            sparse = [
+                doc for doc, _ in self.sparse_index.search(query, self.sparse_k, allowed)
+            ] if self.sparse_k else []
+        with timed("dense_search"):
+            dense = await self.vector_store.asimilarity_search(
+                query, k=self.dense_k, **self._dense_filter(allowed)
+            ) if self.dense_k else []
+        return self._fuse(dense, sparse)
@@ -0,0 +1,261 @@
+"""
+Fast path that answers recipe lookups without the LLM.
+
+Questions such as "مواد لازم کباب کوبیده" or "کالری پیتزا مارگاریتا چقدر
+است؟" only ask for one part of one recipe. The router classifies the
+intent of a question (ingredients, instructions, nutrition or the whole
+recipe), finds the recipe named in it by its title, and answers with that
+recipe's sections straight from the index. Anything open-ended, ambiguous,
+about an unknown dish or asking more than the lookup ("کباب کوبیده را چطور گرم
+کنم؟") returns None and goes to the LLM as before.
+
+Classifiers are pluggable: KeywordIntentClassifier is the default, and
+EmbeddingIntentClassifier matches questions against example questions.
+"""
+from typing import Callable, Dict, List, Mapping, Optional, Protocol, Sequence, Tuple
+from collections import defaultdict
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from rag_system.hybrid_retrieval import STOPWORDS, tokenize
+from rag_system.text_normalization import normalize_question
+import math
+import re
+import threading
+
+# Recipe sections each intent is answered with, in answer order
+INTENT_SECTIONS = {
+    "recipe": ("ingredients", "instructions"),
+    "ingredients": ("ingredients",),
+    "instructions": ("instructions",),
+    "nutrition": ("nutrition",),
+}
+INTENT_KEYWORDS = {
+    # Only explicit requests for the recipe; "چطور" alone also starts questions
+    # such as "چطور کباب کوبیده از هم نپاشد؟"
+    "recipe": [
+        "recipe", "how to make", "how to cook", "how do i make", "how can i make",
+        "طرز تهیه", "طرز پخت", "دستور پخت", "دستور تهیه",
+    ],
+    "ingredients": ["ingredient", "what do i need", "مواد لازم", "چه موادی", "مواد اولیه"],
+    "instructions": ["instructions", "steps", "مراحل"],
+    "nutrition": [
+        "nutrition", "calorie", "kcal", "protein", "fat", "carb",
+        "ارزش غذایی", "کالری", "پروتئین", "چربی", "کربوهیدرات",
+    ],
+}
+# Questions that need reasoning over the recipe rather than a lookup
+OPEN_ENDED_KEYWORDS = [
+    "why", "instead", "substitut", "replace", "without", "compare", "better", "health",
+    "vegetarian", "vegan", "diet", "should", " or ",
+    "چرا", "جایگزین", "به جای", "بجای", "بدون", "مقایسه", "بهتر", "سالم", "گیاهی", "رژیم", " یا ",
+]
+# Words a lookup may contain besides the title and the intent keywords; any
+# other word ("گرم", "فر", "4 نفر") asks for more than the stored sections
+LOOKUP_WORDS = [
+    "what", "whats", "much", "many", "tell", "give", "show", "list", "need", "has", "have",
+    "contain", "there", "please", "dish", "food", "step", "carbohydrate",
+    "چقدر", "چند", "چیست", "چیه", "چی", "چه", "کنم", "بگو", "بگویید", "بده", "بدهید",
+    "لطفا", "دارد", "داره", "خواهم", "میخوام", "نیاز", "هستند", "غذا", "غذای",
+]
+_LOOKUP_TERMS = STOPWORDS.union(
+    LOOKUP_WORDS, *(tokenize(" ".join(words)) for words in INTENT_KEYWORDS.values())
+)
+
+def _is_lookup_term(term: str) -> bool:
+    # English keywords also match their plurals ("ingredients", "calories")
+    return term in _LOOKUP_TERMS or term.endswith("s") and term[:-1] in _LOOKUP_TERMS
+
+# Share of a title's terms the question must contain to name that recipe
+MIN_TITLE_COVERAGE = 0.6
+
+def _keyword_pattern(keywords: Sequence[str]) -> "re.Pattern[str]":
+    # Keywords match at word starts, so "fat" matches "fats" but not "breakfast";
+    # keywords padded with spaces (" or ") must stand alone
+    return re.compile("|".join(
+        re.escape(k) if k != k.strip() else r"(?<!\w)" + re.escape(k) for k in keywords
+    ))
+
+class IntentClassifier(Protocol):
+    def classify(self, question: str) -> List[str]:
+        """Return the lookup intents of a normalized question; empty for open-ended ones."""
+
+class KeywordIntentClassifier:
+    """
+    Classify questions by Persian and English keywords.
+    """
+
+    def __init__(
+        self,
+        keywords: Mapping[str, Sequence[str]] = INTENT_KEYWORDS,
+        open_ended: Sequence[str] = OPEN_ENDED_KEYWORDS
+    ):
+        """
+        Initialize the classifier.
+
+        Args:
+            keywords: Keywords of each intent in INTENT_SECTIONS
+            open_ended: Keywords that send a question to the LLM whatever else it contains
+        """
+        self._intents = {intent: _keyword_pattern(words) for intent, words in keywords.items()}
+        self._open_ended = _keyword_pattern(open_ended)
+
+    def classify(self, question: str) -> List[str]:
+        if self._open_ended.search(f" {question} "):
+            return []
+        return [intent for intent, pattern in self._intents.items() if pattern.search(question)]
+
+class EmbeddingIntentClassifier:
+    """
+    Classify questions by their nearest example question.
+
+    Catches phrasings the keyword lists miss, at the cost of one question
+    embedding (served from the embedding cache for repeated questions).
+    """
+
+    def __init__(self, embeddings: Embeddings, examples: Mapping[Optional[str], Sequence[str]],
+                 threshold: float = 0.8):
+        """
+        Initialize the classifier.
+
+        Args:
+            embeddings: Embeddings used to compare questions
+            examples: Example questions per intent, without dish names; examples
+                under the None key are open-ended
+            threshold: Cosine similarity the nearest example must reach
+        """
+        self.embeddings = embeddings
+        self.examples = examples
+        self.threshold = threshold
+        self._vectors: Optional[List[Tuple[Optional[str], List[float]]]] = None
+
+    @staticmethod
+    def _unit(vector: List[float]) -> List[float]:
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    def classify(self, question: str) -> List[str]:
+        if self._vectors is None:
+            labeled = [(intent, text) for intent, texts in self.examples.items() for text in texts]
+            vectors = self.embeddings.embed_documents([normalize_question(text) for _, text in labeled])
+            self._vectors = [(intent, self._unit(vector)) for (intent, _), vector in zip(labeled, vectors)]
+
+        query = self._unit(self.embeddings.embed_query(question))
+        score, intent = max(
+            (sum(a * b for a, b in zip(query, vector)), intent) for intent, vector in self._vectors
+        )
+        return [intent] if intent is not None and score >= self.threshold else []
+
+class IntentRouter:
+    """
+    Answer recipe lookups from the indexed recipe sections.
+    """
+
+    def __init__(self, chunks: Callable[[], Mapping[str, Document]],
+                 classifier: Optional[IntentClassifier] = None):
+        """
+        Initialize the router.
+
+        Args:
+            chunks: Returns the indexed chunks by chunk ID ("<recipe id>:<n>"),
+                with "title" and "section" metadata from recipe chunking
+            classifier: Intent classifier (default: KeywordIntentClassifier())
+        """
+        self.chunks = chunks
+        self.classifier = classifier or KeywordIntentClassifier()
+        self._tables: Optional[_RecipeTables] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        """Forget the recipe tables after the index changed; they are rebuilt on next use."""
+        with self._lock:
+            self._tables = None
+
+    def _load_tables(self) -> "_RecipeTables":
+        with self._lock:
+            if self._tables is None:
+                self._tables = _RecipeTables(self.chunks())
+            return self._tables
+
+    def find_recipe(self, question: str) -> Optional[str]:
+        """
+        Find the one recipe a normalized question names by title.
+
+        Returns:
+            The recipe ID, or None if no title is covered well enough or two
+            recipes match equally well
+        """
+        return self._load_tables().find(question)
+
+    def route(self, question: str) -> Optional[Tuple[str, List[Document]]]:
+        """
+        Answer a question from the recipe sections if it is a lookup.
+
+        Args:
+            question: The user's question
+
+        Returns:
+            Tuple of the answer and its source sections, or None if the
+            question needs the LLM
+        """
+        question = normalize_question(question)
+        intents = self.classifier.classify(question)
+        if not intents:
+            return None
+        tables = self._load_tables()
+        recipe_id = tables.find(question)
+        if recipe_id is None:
+            return None
+        title, title_terms = tables.titles[recipe_id]
+        if any(term not in title_terms and not _is_lookup_term(term) for term in tokenize(question)):
+            return None
+
+        available = tables.sections[recipe_id]
+        wanted = dict.fromkeys(name for intent in intents for name in INTENT_SECTIONS[intent])
+        if any(name not in available for name in wanted):
+            return None
+        sources = [doc for name in wanted for doc in available[name]]
+
+        # Every chunk repeats the title; show it once above the sections
+        bodies = [doc.page_content[len(title):].strip() if doc.page_content.startswith(title)
+                  else doc.page_content for doc in sources]
+        return "\n\n".join([title] + bodies), sources
+
+class _RecipeTables:
+    """Titles, a title-term index and sections of every recipe, built from the indexed chunks."""
+
+    def __init__(self, chunks: Mapping[str, Document]):
+        self.titles: Dict[str, Tuple[str, frozenset]] = {}
+        self.by_term: Dict[str, List[str]] = defaultdict(list)
+        self.sections: Dict[str, Dict[str, List[Document]]] = defaultdict(lambda: defaultdict(list))
+
+        # Chunk numbers keep an oversized section's pieces in order
+        def chunk_number(item: Tuple[str, Document]) -> Tuple[str, int]:
+            recipe_id, _, number = item[0].rpartition(":")
+            return recipe_id, int(number) if number.isdigit() else 0
+
+        for _, doc in sorted(list(chunks.items()), key=chunk_number):
+            recipe_id, title, section = (doc.metadata.get(key) for key in ("id", "title", "section"))
+            if not recipe_id or not title or section not in ("ingredients", "instructions", "nutrition"):
+                continue
+            self.sections[recipe_id][section].append(doc)
+            if recipe_id not in self.titles:
+                terms = frozenset(tokenize(title))
+                self.titles[recipe_id] = (title, terms)
+                for term in terms:
+                    self.by_term[term].append(recipe_id)
+
+    def find(self, question: str) -> Optional[str]:
+        matched: Dict[str, int] = defaultdict(int)
+        for term in set(tokenize(question)):
+            for recipe_id in self.by_term.get(term, ()):
+                matched[recipe_id] += 1
+
+        ranked = sorted(
+            ((count / len(self.titles[recipe_id][1]), count, recipe_id) for recipe_id, count in matched.items()),
+            reverse=True
+        )
+        if not ranked or ranked[0][0] < MIN_TITLE_COVERAGE:
+            return None
+        if len(ranked) > 1 and ranked[1][:2] == ranked[0][:2]:
+            return None
+        return ranked[0][2]
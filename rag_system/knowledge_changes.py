@@ -0,0 +1,153 @@
+"""
+Change log shared by the admin panel and the chat service.
+
+The admin panel appends one JSON line per add/edit/delete; the chat service
+reads the log from its last known offset and applies the changes to the
+existing vector store instead of rebuilding it.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from pathlib import Path
+import hashlib
+import json
+import time
+import uuid
+
+# Append-only log of knowledge base changes, next to the knowledge file
+CHANGE_LOG_FILE = Path(__file__).parent.parent / "data" / "food_knowledge_changes.jsonl"
+
+# Supported operations
+UPSERT = "upsert"
+DELETE = "delete"
+
+def new_document_id() -> str:
+    """Return a new stable recipe ID."""
+    return uuid.uuid4().hex
+
+def document_id(item: Dict[str, Any]) -> str:
+    """
+    Return the stable ID of a knowledge item.
+
+    Items saved by the admin panel carry ``metadata["id"]``; older items fall
+    back to a hash of their content so they still get a deterministic ID.
+
+    Args:
+        item: Dictionary with "page_content" and "metadata"
+
+    Returns:
+        The recipe ID
+    """
+    metadata = item.get("metadata") or {}
+    if metadata.get("id"):
+        return metadata["id"]
+    return hashlib.sha256(item["page_content"].encode("utf-8")).hexdigest()[:32]
+
+def ensure_document_ids(items: List[Dict[str, Any]]) -> bool:
+    """
+    Store an ID on items that do not have one yet.
+
+    The stored ID is the same content-hash fallback the chat service already
+    uses for the item, so both sides keep referring to the same recipe.
+
+    Args:
+        items: Knowledge items, modified in place
+
+    Returns:
+        True if any item was given a new ID
+    """
+    changed = False
+    for item in items:
+        metadata = item.setdefault("metadata", {})
+        if not metadata.get("id"):
+            metadata["id"] = document_id(item)
+            changed = True
+    return changed
+
+def append_change(op: str, doc_id: str, item: Optional[Dict[str, Any]] = None,
+                  log_path: Path = CHANGE_LOG_FILE) -> None:
+    """
+    Record a change to the knowledge base.
+
+    Args:
+        op: UPSERT or DELETE
+        doc_id: ID of the changed recipe
+        item: The new recipe ("page_content" and "metadata") for upserts
+        log_path: Path of the change log
+    """
+    if op not in (UPSERT, DELETE):
+        raise ValueError(f"Unknown change operation: {op}")
+    if op == UPSERT and item is None:
+        raise ValueError("Upserts need the new document")
+
+    entry = {"op": op, "id": doc_id, "timestamp": time.time()}
+    if op == UPSERT:
+        entry["document"] = {"page_content": item["page_content"], "metadata": item["metadata"]}
+
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    # A single write of a complete line so readers never see half an entry
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+def log_size(log_path: Path = CHANGE_LOG_FILE) -> int:
+    """Return the current end offset of the change log."""
+    try:
+        return log_path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+def read_changes(offset: int = 0, log_path: Path = CHANGE_LOG_FILE) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Read the changes appended since ``offset``.
+
+    Args:
+        offset: Byte offset returned by the previous call
+        log_path: Path of the change log
+
+    Returns:
+        Tuple of the new changes (oldest first) and the offset to resume from
+    """
+    if log_size(log_path) <= offset:
+        return [], offset
+
+    changes = []
+    with open(log_path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            # Stop at a line that is still being written
+            if not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            if line.strip():
+                changes.append(json.loads(line))
+    return changes, offset
+
+def _export_offset_path(knowledge_path: Path) -> Path:
+    knowledge_path = Path(knowledge_path)
+    return knowledge_path.with_name(knowledge_path.name + ".offset")
+
+def write_export_offset(knowledge_path: Path, offset: int) -> None:
+    """
+    Record the change log offset a knowledge file export is up to date with.
+
+    Args:
+        knowledge_path: The exported knowledge file
+        offset: Change log size read before the export started
+    """
+    path = _export_offset_path(knowledge_path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(str(offset), encoding="utf-8")
+    tmp_path.replace(path)
+
+def read_export_offset(knowledge_path: Path) -> Optional[int]:
+    """
+    Return the change log offset recorded by the last export of a knowledge file.
+
+    Args:
+        knowledge_path: The exported knowledge file
+
+    Returns:
+        The offset, or None if the file was not written by an export
+    """
+    try:
+        return int(_export_offset_path(knowledge_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
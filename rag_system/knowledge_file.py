@@ -0,0 +1,176 @@
+"""
+Streaming reader and writer for the knowledge base file.
+
+The knowledge base is either a JSON array of items (the format the admin panel
+has always written) or JSON Lines, one item per line, chosen by the file
+extension. Items are read one at a time in both formats, so memory stays flat
+however large the file grows. Convert between the formats with:
+    python -m rag_system.knowledge_file data/food_knowledge.json data/food_knowledge.jsonl
+"""
+from typing import Any, Dict, Iterable, Iterator
+from pathlib import Path
+from langchain_core.documents import Document
+from rag_system.knowledge_changes import document_id
+import argparse
+import json
+import os
+import tempfile
+
+# Knowledge base shared by the admin panel and the chat service
+KNOWLEDGE_FILE = Path(os.environ.get(
+    "RAG_KNOWLEDGE_FILE", Path(__file__).parent.parent / "data" / "food_knowledge.json"
+))
+
+_READ_SIZE = 1 << 16
+_WHITESPACE = " \t\r\n"
+
+def is_jsonl(path: Path) -> bool:
+    """Whether a knowledge file uses the JSON Lines format."""
+    return Path(path).suffix.lower() in (".jsonl", ".ndjson")
+
+def _iter_json_array(f) -> Iterator[Dict[str, Any]]:
+    """Decode the items of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+    started = False
+
+    while True:
+        # Skip whitespace and separators up to the next value
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE + ("," if started else "["):
+            started = started or buffer[pos] == "["
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == "]" and started:
+            return
+
+        if pos < len(buffer) and started:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # A value ending at the buffer edge may continue in the next block
+                if end < len(buffer) or eof:
+                    yield item
+                    buffer, pos = buffer[end:], 0
+                    continue
+
+        if eof:
+            if not started:
+                raise ValueError("Knowledge file is not a JSON array")
+            raise ValueError("Knowledge file ends inside the JSON array")
+        block = f.read(_READ_SIZE)
+        eof = not block
+        buffer, pos = buffer[pos:] + block, 0
+
+def iter_items(path: Path = KNOWLEDGE_FILE) -> Iterator[Dict[str, Any]]:
+    """
+    Read knowledge items one at a time.
+
+    Args:
+        path: JSON array or JSON Lines knowledge file
+
+    Returns:
+        Iterator of dictionaries with "page_content" and "metadata"
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if is_jsonl(path):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from _iter_json_array(f)
+
+def iter_documents(path: Path = KNOWLEDGE_FILE) -> Iterator[Document]:
+    """
+    Read knowledge items lazily as Documents with a stable ``metadata["id"]``.
+
+    Args:
+        path: JSON array or JSON Lines knowledge file
+
+    Returns:
+        Iterator of Documents
+    """
+    for item in iter_items(path):
+        yield Document(
+            page_content=item["page_content"],
+            metadata={**item["metadata"], "id": document_id(item)}
+        )
+
+def write_items(path: Path, items: Iterable[Dict[str, Any]]) -> int:
+    """
+    Write knowledge items one at a time, replacing the file atomically.
+
+    Readers never see a half-written file: the items go to a temporary file
+    that is renamed over ``path`` once complete.
+
+    Args:
+        path: Destination; the extension selects JSON array or JSON Lines
+        items: Dictionaries with "page_content" and "metadata"
+
+    Returns:
+        Number of items written
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    count = 0
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            if is_jsonl(path):
+                for item in items:
+                    f.write(json.dumps(item, ensure_ascii=False) + "\n")
+                    count += 1
+            else:
+                f.write("[")
+                for item in items:
+                    text = json.dumps(item, indent=2, ensure_ascii=False)
+                    f.write(("," if count else "") + "\n  " + text.replace("\n", "\n  "))
+                    count += 1
+                f.write("\n]" if count else "]")
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return count
+
+def seed_knowledge_file(path: Path = KNOWLEDGE_FILE) -> int:
+    """
+    Write the bundled recipes (rag_system.food_knowledge) to a new knowledge file.
+
+    Args:
+        path: Knowledge file to create
+
+    Returns:
+        Number of recipes written
+    """
+    from rag_system.food_knowledge import FOOD_KNOWLEDGE
+    return write_items(path, (
+        {"page_content": doc.page_content, "metadata": doc.metadata}
+        for doc in FOOD_KNOWLEDGE
+    ))
+
+def convert(source: Path, destination: Path) -> int:
+    """
+    Convert a knowledge file between the JSON array and JSON Lines formats.
+
+    Args:
+        source: Existing knowledge file
+        destination: File to write; its extension selects the format
+
+    Returns:
+        Number of items converted
+    """
+    return write_items(destination, iter_items(source))
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert the knowledge base between JSON and JSON Lines.')
+    parser.add_argument('source', help='Knowledge file to read (.json or .jsonl)')
+    parser.add_argument('destination', help='Knowledge file to write (.json or .jsonl)')
+    args = parser.parse_args()
+
+    count = convert(args.source, args.destination)
+    print(f"Converted {count} items to {args.destination}.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+"""
+Per-stage latency metrics for the RAG query path.
+
+Every question gets a QueryTrace that collects how long each stage took
+(answer cache, embedding, sparse and dense search, prompt assembly,
+generation) together with counts such as retrieved chunks, prompt size and
+tokens. The trace is reachable from anywhere in the query path through a
+context variable, so the embeddings and the retriever record their own
+stages without the trace being passed around.
+
+Finished traces are logged as one JSON line each and aggregated by
+QueryMetrics, which keeps percentiles over the most recent queries and
+renders them in the Prometheus text format.
+"""
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+import json
+import logging
+import math
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Quantiles reported per stage, and how many recent samples they are computed over
+QUANTILES = (0.5, 0.9, 0.99)
+DEFAULT_WINDOW = 1024
+METRIC_PREFIX = "rag"
+
+_current_trace: ContextVar[Optional["QueryTrace"]] = ContextVar("rag_query_trace", default=None)
+
+class QueryTrace:
+    """
+    Stage timings and counters of a single question.
+    """
+
+    def __init__(self, question: str = ""):
+        self.question = question
+        self.stages: Dict[str, float] = defaultdict(float)
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.outcome = "answered"
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        """Add time spent in a stage; a stage entered several times accumulates."""
+        with self._lock:
+            self.stages[stage] += seconds
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Add to a counter such as retrieved_chunks or completion_tokens."""
+        with self._lock:
+            self.counts[name] += value
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def finish(self) -> None:
+        """Record the total time since the trace was created."""
+        self.stages["total"] = time.perf_counter() - self._start
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the trace as a JSON-serializable dictionary, times in milliseconds."""
+        return {
+            "outcome": self.outcome,
+            "question_chars": len(self.question),
+            "stages_ms": {stage: round(seconds * 1000, 3) for stage, seconds in self.stages.items()},
+            **self.counts,
+        }
+
+def current_trace() -> Optional[QueryTrace]:
+    """Return the trace of the question being answered, if any."""
+    return _current_trace.get()
+
+@contextmanager
+def activate(trace: QueryTrace) -> Iterator[QueryTrace]:
+    """
+    Make ``trace`` the current trace for the enclosed block.
+
+    Async generators must not yield inside the block, since the consumer may
+    resume them in another context.
+    """
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Time the enclosed block as ``stage`` of the current trace; a no-op outside a query."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    with trace.stage(stage):
+        yield
+
+def count(name: str, value: int = 1) -> None:
+    """Add to a counter of the current trace; a no-op outside a query."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.count(name, value)
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """
+    Nearest-rank percentile of a list of samples.
+
+    Args:
+        samples: Observed values
+        q: Quantile between 0 and 1
+
+    Returns:
+        The percentile, or NaN when there are no samples
+    """
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+class QueryMetrics:
+    """
+    In-process aggregation of query traces.
+
+    Stage latencies are kept as Prometheus-style summaries: quantiles over the
+    most recent ``window`` samples plus a cumulative sum and count. Counters
+    are cumulative since the process started.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW, log_traces: bool = True):
+        """
+        Initialize the metrics.
+
+        Args:
+            window: Number of recent samples per stage the quantiles cover
+            log_traces: Whether to log every finished trace as a JSON line
+        """
+        self.window = window
+        self.log_traces = log_traces
+        self._samples: Dict[str, deque] = {}
+        self._sums: Dict[str, float] = defaultdict(float)
+        self._counts: Dict[str, int] = defaultdict(int)
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._outcomes: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def trace(self, question: str = "") -> Iterator[QueryTrace]:
+        """
+        Trace one question: the yielded trace is current for the enclosed
+        block, and is recorded (and logged) when the block exits.
+        """
+        trace = QueryTrace(question)
+        try:
+            with activate(trace):
+                yield trace
+        except BaseException:
+            trace.outcome = "error"
+            raise
+        finally:
+            self.record(trace)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """Record one latency sample of a stage."""
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self._sums[stage] += seconds
+            self._counts[stage] += 1
+
+    def record(self, trace: QueryTrace) -> None:
+        """Finish a trace and aggregate it."""
+        trace.finish()
+        for stage, seconds in list(trace.stages.items()):
+            self.observe(stage, seconds)
+        with self._lock:
+            self._outcomes[trace.outcome] += 1
+            for name, value in list(trace.counts.items()):
+                self._counters[name] += value
+        if self.log_traces:
+            logger.info(json.dumps(trace.as_dict(), ensure_ascii=False))
+
+    def percentiles(self, stage: str, quantiles: Sequence[float] = QUANTILES) -> Dict[float, float]:
+        """
+        Latency percentiles of a stage over the recent window.
+
+        Args:
+            stage: Stage name, e.g. "generation" or "total"
+            quantiles: Quantiles between 0 and 1
+
+        Returns:
+            Seconds per quantile (NaN when the stage was never observed)
+        """
+        with self._lock:
+            samples = list(self._samples.get(stage, ()))
+        return {q: percentile(samples, q) for q in quantiles}
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Snapshot of every stage, counter and outcome.
+
+        Returns:
+            Dictionary with "stages" (count, mean and percentiles in ms),
+            "counters" and "outcomes"
+        """
+        with self._lock:
+            stages = {stage: list(samples) for stage, samples in self._samples.items()}
+            sums, counts = dict(self._sums), dict(self._counts)
+            counters, outcomes = dict(self._counters), dict(self._outcomes)
+        return {
+            "stages": {
+                stage: {
+                    "count": counts[stage],
+                    "mean_ms": sums[stage] / counts[stage] * 1000,
+                    **{f"p{round(q * 100)}_ms": percentile(samples, q) * 1000 for q in QUANTILES},
+                }
+                for stage, samples in stages.items()
+            },
+            "counters": counters,
+            "outcomes": outcomes,
+        }
+
+    def render_prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        with self._lock:
+            stages = {stage: list(samples) for stage, samples in self._samples.items()}
+            sums, counts = dict(self._sums), dict(self._counts)
+            counters, outcomes = dict(self._counters), dict(self._outcomes)
+
+        name = f"{METRIC_PREFIX}_stage_duration_seconds"
+        lines: List[str] = [
+            f"# HELP {name} Time spent in each stage of answering a question.",
+            f"# TYPE {name} summary",
+        ]
+        for stage in sorted(stages):
+            for q in QUANTILES:
+                value = percentile(stages[stage], q)
+                lines.append(f'{name}{{stage="{stage}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {sums[stage]:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {counts[stage]}')
+
+        name = f"{METRIC_PREFIX}_queries_total"
+        lines += [f"# HELP {name} Questions handled, by outcome.", f"# TYPE {name} counter"]
+        for outcome in sorted(outcomes):
+            lines.append(f'{name}{{outcome="{outcome}"}} {outcomes[outcome]}')
+
+        for counter in sorted(counters):
+            name = f"{METRIC_PREFIX}_{counter}_total"
+            lines += [f"# TYPE {name} counter", f"{name} {counters[counter]}"]
+        return "\n".join(lines) + "\n"
@@ -1,45 +1,175 @@
 """
 RAG (Retrieval-Augmented Generation) system for food knowledge using Ollama.
 """
-from typing import List, Dict, Any, Tuple
-from langchain_ollama import OllamaLLM, OllamaEmbeddings
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import Chroma
-from langchain.chains import RetrievalQA
-from langchain.prompts import PromptTemplate
-from langchain.schema import Document
+from typing import List, Dict, Any, AsyncIterator, Callable, Iterable, Iterator, Optional, Set, Tuple, Union
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langchain_core.prompts import PromptTemplate
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.outputs import LLMResult
+from rag_system.answer_cache import AnswerCache
+from rag_system.config import RAGConfig
+from rag_system.embedding_backends import DEFAULT_LOCAL_MODEL, create_embeddings
+from rag_system.embedding_cache import CachedEmbeddings
+from rag_system.hybrid_retrieval import BM25Index, HybridRetriever
+from rag_system.intent_router import IntentRouter
+from rag_system.recipe_index import RecipeIndex
+from rag_system.metrics import QueryMetrics, QueryTrace, activate
+from rag_system.knowledge_file import KNOWLEDGE_FILE, iter_documents, seed_knowledge_file
+from rag_system.recipe_splitter import SPLITTER_VERSION, ParentDocumentRetriever, RecipeTextSplitter, join_sections
+from rag_system.text_normalization import NORMALIZATION_VERSION, normalize_question, normalize_text
+from rag_system.knowledge_changes import (
+    CHANGE_LOG_FILE, UPSERT, document_id, log_size, read_changes, read_export_offset
+)
+import hashlib
 import json
+import logging
+import threading
+import time
+import weakref
 from pathlib import Path
+import asyncio
+
+logger = logging.getLogger(__name__)
+
+# Ollama, Chroma and the RetrievalQA chain are imported where they are first
+# used, so importing this module (and starting the chat service) stays fast
+
+# Canned answers that do not need the LLM
+IDENTITY_QUESTIONS = ["what's your name", "who are you", "what is your name", "who are you?", "what's your name?"]
+IDENTITY_ANSWER = "I am Chef Kamyar, your personal culinary expert! I'm passionate about cooking and love sharing my knowledge about food, recipes, and cooking techniques. How can I assist you with your culinary questions today?"
+# Question the warm-up runs through the embeddings and the retriever
+WARM_UP_QUESTION = "How do I make ghormeh sabzi?"
+BUSY_ANSWER = "Sorry, Chef Kamyar is answering too many questions right now. Please try again in a moment."
+
+# Persisted Chroma index and the fingerprint of the content it was built from
+PERSIST_DIRECTORY = RAGConfig.persist_directory
+FINGERPRINT_FILE = "index_fingerprint.json"
+# Written while a build runs, so an interrupted build can be resumed
+BUILD_STATE_FILE = "index_build.json"
+
+def knowledge_fingerprint(json_path: Path = KNOWLEDGE_FILE, **settings: Any) -> str:
+    """
+    Fingerprint the knowledge file together with the settings the index depends on.
+    
+    Args:
+        json_path: Path to the knowledge file (JSON or JSON Lines)
+        settings: Index settings (model, chunking) that change the embeddings
+        
+    Returns:
+        Hex digest identifying the content the index was built from
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+    with open(json_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
 class FoodRAGSystem:
     """
     A RAG system for answering food-related questions using local Ollama models.
     """
     
-    def __init__(self, model_name: str = "llama3.2"):
+    def __init__(self, config: Union[RAGConfig, str, None] = None, **settings: Any):
         """
         Initialize the RAG system.
         
+        Nothing is loaded here: the models are created on first use and the
+        index is opened (or built) by ensure_ready(), which the query methods
+        call on the first question.
+        
         Args:
-            model_name: Name of the Ollama model to use (default: llama3.2)
+            config: Engine settings (default: RAGConfig.from_env()); a string
+                is taken as the model name, as in FoodRAGSystem("llama3.2")
+            settings: RAGConfig fields overriding the config, e.g. k=5
         """
-        # Initialize Ollama for both LLM and embeddings
-        self.model_name = model_name
-        self.llm = OllamaLLM(model=model_name)
-        self.embeddings = OllamaEmbeddings(model=model_name)
+        if isinstance(config, str):
+            settings = {"model_name": config, **settings}
+            config = None
+        config = replace(config or RAGConfig.from_env(), **settings)
+        self.config = config
+        self.retriever_mode = config.retriever_mode
+        self.k = config.k
+        self.dense_k = config.dense_k
+        
+        # Ollama for the LLM and the configured embedding backend, created lazily
+        self.model_name = config.model_name
+        self.persist_directory = config.persist_directory
+        self.knowledge_file = config.knowledge_file
+        self.embedding_model = config.embedding_model
+        if config.embedding_backend == "ollama":
+            self.embedding_model = self.embedding_model or config.model_name
+        else:
+            self.embedding_model = self.embedding_model or DEFAULT_LOCAL_MODEL
+        # Identifies the embeddings in cache keys and the index fingerprint
+        self.embedding_id = f"{config.embedding_backend}:{self.embedding_model}"
+        self._llm = None
+        self._embeddings = None
         
         # Initialize text splitter for chunking documents
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            length_function=len,
-            separators=["\n\n", "\n", " ", ""]
-        )
+        self.chunking = config.chunking
+        self.expand_parents = config.expand_parents and config.chunking == "recipe"
+        if config.chunking == "recipe":
+            self.text_splitter = RecipeTextSplitter(
+                chunk_size=config.chunk_size,
+                chunk_overlap=100 if config.chunk_overlap is None else config.chunk_overlap
+            )
+        else:
+            self.text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=config.chunk_size,
+                chunk_overlap=200 if config.chunk_overlap is None else config.chunk_overlap,
+                length_function=len,
+                separators=["\n\n", "\n", " ", ""]
+            )
         
-        # Initialize storage
+        # Initialize storage; the BM25 index mirrors the vector store's chunks
         self.vector_store = None
+        self.sparse_index = BM25Index()
+        self.retriever = None
         self.qa_chain = None
         
+        # Serializes index (re)builds between concurrent callers
+        self._index_lock = threading.Lock()
+        self._ready_lock = threading.Lock()
+        
+        # Bounds concurrent generations; extra async queries wait in line. A
+        # semaphore only works in the loop that waits on it, so every event
+        # loop using the shared engine gets its own
+        self.max_concurrent_queries = config.max_concurrent_queries
+        self.max_queued_queries = config.max_queued_queries
+        self._loop_query_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+            weakref.WeakKeyDictionary()
+        self._queued_queries = 0
+        
+        # Answers to repeated questions, cleared whenever the index changes;
+        # the semantic tier gets the embeddings once they are created
+        self.answer_cache = AnswerCache(
+            max_entries=config.answer_cache_size,
+            ttl_seconds=config.answer_cache_ttl,
+            similarity_threshold=config.semantic_cache_threshold
+        ) if config.answer_cache_size > 0 else None
+        
+        # Answers recipe lookups from the indexed sections without the LLM
+        self.router = IntentRouter(lambda: self.sparse_index.documents) \
+            if config.fast_path and config.chunking == "recipe" else None
+        
+        # Parsed recipe fields restricting retrieval to the recipes a question asks for
+        self.recipe_index = RecipeIndex(lambda: self.sparse_index.documents) \
+            if config.recipe_filters and config.chunking == "recipe" else None
+        
+        # Per-stage latencies and counters of every question answered
+        self.metrics = QueryMetrics()
+        
+        # Position in the admin change log the vector store is up to date with,
+        # and the fingerprint of the knowledge file it was built from
+        self.change_log_path = CHANGE_LOG_FILE
+        self._change_log_offset = 0
+        self._index_fingerprint: Optional[str] = None
+        
         # Define the prompt template
         self.prompt_template = PromptTemplate(
             input_variables=["context", "question"],
@@ -55,42 +185,626 @@ class FoodRAGSystem:
             Answer:"""
         )
 
+    @property
+    def llm(self):
+        """The Ollama LLM, created on first use."""
+        if self._llm is None:
+            from langchain_ollama import OllamaLLM
+            self._llm = OllamaLLM(model=self.model_name)
+        return self._llm
+
+    @llm.setter
+    def llm(self, llm) -> None:
+        self._llm = llm
+        self.qa_chain = None
+
+    @property
+    def embeddings(self) -> Embeddings:
+        """The cached embeddings of the configured backend, created on first use."""
+        if self._embeddings is None:
+            embeddings, self.embedding_id = create_embeddings(
+                self.config.embedding_backend, self.embedding_model
+            )
+            self.embeddings = CachedEmbeddings(
+                embeddings,
+                model_name=self.embedding_id,
+                cache_path=self.config.embedding_cache_path
+            )
+        return self._embeddings
+
+    @embeddings.setter
+    def embeddings(self, embeddings: Embeddings) -> None:
+        self._embeddings = embeddings
+        if self.answer_cache is not None:
+            self.answer_cache.embeddings = embeddings
+
+    def ensure_ready(self) -> None:
+        """
+        Open (or build) the index and the QA chain once; later calls return at once.
+        
+        Safe to call from several threads; all callers share the result.
+        """
+        if self.qa_chain is not None:
+            return
+        with self._ready_lock:
+            if self.qa_chain is not None:
+                return
+            if not Path(self.knowledge_file).exists():
+                logger.info("Seeding %s with the bundled recipes", self.knowledge_file)
+                seed_knowledge_file(self.knowledge_file)
+            self.load_or_create_vector_store()
+            self.sync_changes()
+            self.create_qa_chain()
+
+    async def aensure_ready(self) -> None:
+        """ensure_ready() without blocking the event loop."""
+        if self.qa_chain is None:
+            await asyncio.get_running_loop().run_in_executor(None, self.ensure_ready)
+
+    def warm_up(self, canary: str = WARM_UP_QUESTION) -> Dict[str, float]:
+        """
+        Pay the cold-start costs before the first user question arrives.
+
+        Opens (or builds) the index, loads the model into Ollama with a
+        one-token generation, embeds a canary question, runs it through the
+        retriever and parses the recipes for the retrieval filters. A stage
+        that fails is logged and skipped, so a missing Ollama server does not
+        stop the service from starting.
+
+        Args:
+            canary: Question used to exercise the embeddings and the retriever
+
+        Returns:
+            Seconds spent in each stage that completed
+        """
+        def ping_llm() -> None:
+            llm = self.llm
+            if hasattr(llm, "num_predict"):
+                # Loads the model weights without generating a whole answer
+                llm = llm.model_copy(update={"num_predict": 1})
+            llm.invoke("Hi")
+
+        def embed_canary() -> None:
+            # Bypass the embedding cache so the backend itself is exercised
+            embeddings = self.embeddings
+            if isinstance(embeddings, CachedEmbeddings):
+                embeddings = embeddings.embeddings
+            embeddings.embed_query(normalize_question(canary))
+
+        timings = {}
+        stages = [
+            ("index", self.ensure_ready),
+            ("llm", ping_llm),
+            ("embedding", embed_canary),
+            ("retrieval", lambda: self.retriever.invoke(self._prepare_question(canary))),
+        ]
+        if self.recipe_index is not None:
+            stages.append(("recipe_index", lambda: self.recipe_index.table))
+        for stage, run in stages:
+            start = time.perf_counter()
+            try:
+                run()
+            except Exception as e:
+                logger.warning("Warm-up stage %s failed: %s", stage, e)
+                if stage == "index":
+                    break
+                continue
+            timings[stage] = time.perf_counter() - start
+        logger.info("Warm-up finished: %s", ", ".join(
+            f"{stage} {seconds:.2f}s" for stage, seconds in timings.items()
+        ))
+        return timings
+
+    def _index_settings(self) -> Dict[str, Any]:
+        """Settings that invalidate the persisted index when they change."""
+        return {
+            "model": self.embedding_id,
+            "chunking": self.chunking,
+            "chunk_size": self.text_splitter._chunk_size,
+            "chunk_overlap": self.text_splitter._chunk_overlap,
+            "normalization": NORMALIZATION_VERSION,
+            "splitter": SPLITTER_VERSION,
+        }
+
+    def _invalidate_answers(self) -> None:
+        """Forget cached answers after the knowledge base changed."""
+        if self.answer_cache is not None:
+            self.answer_cache.clear()
+        if self.router is not None:
+            self.router.invalidate()
+        if self.recipe_index is not None:
+            self.recipe_index.invalidate()
+
+    def _fingerprint_path(self) -> Path:
+        return Path(self.persist_directory) / FINGERPRINT_FILE
+
+    def _read_index_state(self) -> Dict[str, Any]:
+        """Read the fingerprint and change log offset the persisted index is at."""
+        try:
+            with open(self._fingerprint_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index_state(self, fingerprint: str, change_log_offset: int) -> None:
+        path = self._fingerprint_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        state = {
+            "fingerprint": fingerprint,
+            "change_log_offset": change_log_offset,
+            **self._index_settings()
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+
+    def _open_chroma(self):
+        """Open the persisted Chroma collection, importing Chroma on first use."""
+        from langchain_community.vectorstores import Chroma
+        return Chroma(
+            embedding_function=self.embeddings,
+            persist_directory=self.persist_directory
+        )
+
+    def _split_documents(
+        self, documents: Iterable[Document], seen: Optional[Set[str]] = None
+    ) -> Tuple[List[Document], List[str]]:
+        """
+        Normalize and split documents into chunks with IDs derived from their recipe ID.
+        
+        Args:
+            documents: Documents to split
+            seen: Recipe IDs already split in this build; documents with one of
+                them are skipped, and the new IDs are added
+        
+        Returns:
+            Tuple of chunks and their vector store IDs ("<recipe id>:<chunk number>")
+        """
+        seen = set() if seen is None else seen
+        chunks, ids = [], []
+        for doc in documents:
+            # Documents not read from the knowledge file (e.g. FOOD_KNOWLEDGE) get the same fallback ID
+            doc_id = document_id({"page_content": doc.page_content, "metadata": doc.metadata})
+            if doc_id in seen:
+                # Legacy recipes with identical text share a content-hash ID; their
+                # chunk IDs would collide, so only the first copy is indexed
+                logger.warning("Skipping duplicate recipe %s", doc_id)
+                continue
+            seen.add(doc_id)
+            doc = Document(page_content=normalize_text(doc.page_content), metadata={**doc.metadata, "id": doc_id})
+            for i, chunk in enumerate(self.text_splitter.split_documents([doc])):
+                chunks.append(chunk)
+                ids.append(f"{doc_id}:{i}")
+        return chunks, ids
+
     def create_vector_store(self, documents: List[Document]) -> None:
         """
-        Create a vector store from documents.
+        Create a vector store from documents, replacing any persisted index.
         
         Args:
             documents: List of Document objects containing food knowledge
         """
         # Split documents into chunks
-        texts = self.text_splitter.split_documents(documents)
+        texts, ids = self._split_documents(documents)
+        
+        # Drop the old collection so a rebuild does not append duplicates
+        self._open_chroma().delete_collection()
+        self._fingerprint_path().unlink(missing_ok=True)
+        self._index_fingerprint = None
+        
+        # Create and persist vector store; unchanged chunks come from the embedding cache
+        if isinstance(self.embeddings, CachedEmbeddings):
+            self.embeddings.reset_stats()
+        self.vector_store = self._open_chroma()
+        for start in range(0, len(texts), 1000):
+            self.vector_store.add_documents(texts[start:start + 1000], ids=ids[start:start + 1000])
+        self.sparse_index = BM25Index()
+        self.sparse_index.add(texts, ids)
+        self.retriever = None
+        self.qa_chain = None
+        self._invalidate_answers()
         
-        # Create and persist vector store
-        self.vector_store = Chroma.from_documents(
-            documents=texts,
-            embedding=self.embeddings,
-            persist_directory="./food_knowledge_db"
+        if isinstance(self.embeddings, CachedEmbeddings):
+            stats = self.embeddings.stats()
+            logger.info(
+                "Indexed %d chunks: %d embedding cache hits, %d misses",
+                len(texts), stats["hits"], stats["misses"]
+            )
+
+    def load_or_create_vector_store(self, json_path: Optional[Path] = None) -> bool:
+        """
+        Open the persisted index, rebuilding it only if the knowledge file changed.
+        
+        Safe to call from several sessions: the index is built at most once and
+        every caller shares the same vector store and retriever afterwards.
+        
+        Args:
+            json_path: Path to the knowledge file (default: the configured knowledge file)
+            
+        Returns:
+            True if the index was rebuilt, False if the persisted one was reused
+        """
+        json_path = json_path or self.knowledge_file
+        fingerprint = knowledge_fingerprint(json_path, **self._index_settings())
+        
+        with self._index_lock:
+            state = self._read_index_state()
+            if self.vector_store is not None and state.get("fingerprint") == fingerprint:
+                return False
+            
+            vector_store = self._open_chroma()
+            if state.get("fingerprint") == fingerprint and vector_store._collection.count() > 0:
+                self.vector_store = vector_store
+                self._load_sparse_index()
+                self.retriever = None
+                self.qa_chain = None
+                self._invalidate_answers()
+                # Changes logged after the index was saved are picked up by sync_changes
+                self._change_log_offset = state.get("change_log_offset", 0)
+                self._index_fingerprint = fingerprint
+                return False
+            
+            self._build_vector_store(json_path, fingerprint)
+            return True
+
+    def build_vector_store(
+        self,
+        json_path: Optional[Path] = None,
+        batch_size: int = 64,
+        workers: int = 4,
+        resume: bool = True,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the persisted index in batches, embedding several batches concurrently.
+        
+        Chunks are embedded by at most ``workers`` threads (the number of
+        concurrent requests to the embedding backend) and inserted into Chroma
+        one batch at a time. If a build of the same content was interrupted,
+        chunks it already stored are skipped.
+        
+        Args:
+            json_path: Path to the knowledge file (default: the configured knowledge file)
+            batch_size: Chunks per embedding request and per insert
+            workers: Batches embedded at once
+            resume: Continue an interrupted build instead of starting over
+            progress: Called with the build statistics after every inserted batch
+            
+        Returns:
+            Build statistics: chunks, embedded, skipped and seconds
+        """
+        json_path = json_path or self.knowledge_file
+        fingerprint = knowledge_fingerprint(json_path, **self._index_settings())
+        with self._index_lock:
+            return self._build_vector_store(json_path, fingerprint, batch_size, workers, resume, progress)
+
+    def _build_vector_store(
+        self,
+        json_path: Path,
+        fingerprint: str,
+        batch_size: int = 64,
+        workers: int = 4,
+        resume: bool = True,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        build_state_path = Path(self.persist_directory) / BUILD_STATE_FILE
+        try:
+            with open(build_state_path, "r", encoding="utf-8") as f:
+                build_state = json.load(f)
+        except (OSError, ValueError):
+            build_state = {}
+        
+        resuming = resume and build_state.get("fingerprint") == fingerprint
+        if resuming:
+            offset = build_state["change_log_offset"]
+        else:
+            # Every change logged up to this offset is already in the file read
+            # below; an export from the admin document store may lag further behind
+            offset = log_size(self.change_log_path)
+            exported_offset = read_export_offset(json_path)
+            if exported_offset is not None:
+                offset = min(offset, exported_offset)
+            # Drop the old collection so a rebuild does not append duplicates
+            self._open_chroma().delete_collection()
+            self._fingerprint_path().unlink(missing_ok=True)
+            build_state_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(build_state_path, "w", encoding="utf-8") as f:
+                json.dump({"fingerprint": fingerprint, "change_log_offset": offset}, f)
+        
+        vector_store = self._open_chroma()
+        collection = vector_store._collection
+        stats = {"chunks": 0, "embedded": 0, "skipped": 0, "seconds": 0.0}
+        start = time.perf_counter()
+        
+        def embed(batch: List[Tuple[Document, str]]) -> Tuple[List[Tuple[Document, str]], List[List[float]]]:
+            return batch, self.embeddings.embed_documents([chunk.page_content for chunk, _ in batch])
+        
+        def insert(batch: List[Tuple[Document, str]], vectors: List[List[float]]) -> None:
+            collection.upsert(
+                ids=[chunk_id for _, chunk_id in batch],
+                embeddings=vectors,
+                documents=[chunk.page_content for chunk, _ in batch],
+                metadatas=[chunk.metadata for chunk, _ in batch]
+            )
+            stats["embedded"] += len(batch)
+            stats["seconds"] = time.perf_counter() - start
+            if progress:
+                progress(dict(stats))
+        
+        if isinstance(self.embeddings, CachedEmbeddings):
+            self.embeddings.reset_stats()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="index-build") as pool:
+            # Bound the embedded batches waiting for their insert
+            pending = deque()
+            for batch in self._chunk_batches(iter_documents(json_path), batch_size):
+                stats["chunks"] += len(batch)
+                if resuming:
+                    stored = set(collection.get(ids=[chunk_id for _, chunk_id in batch], include=[])["ids"])
+                    stats["skipped"] += len(stored)
+                    batch = [(chunk, chunk_id) for chunk, chunk_id in batch if chunk_id not in stored]
+                if batch:
+                    pending.append(pool.submit(embed, batch))
+                while len(pending) >= 2 * workers or (pending and pending[0].done()):
+                    insert(*pending.popleft().result())
+            while pending:
+                insert(*pending.popleft().result())
+        stats["seconds"] = time.perf_counter() - start
+        
+        self.vector_store = vector_store
+        self._load_sparse_index()
+        self.retriever = None
+        self.qa_chain = None
+        self._invalidate_answers()
+        self._change_log_offset = offset
+        self._index_fingerprint = fingerprint
+        self._write_index_state(fingerprint, offset)
+        build_state_path.unlink(missing_ok=True)
+        
+        if isinstance(self.embeddings, CachedEmbeddings):
+            cache_stats = self.embeddings.stats()
+            logger.info(
+                "Indexed %d chunks (%d resumed): %d embedding cache hits, %d misses",
+                stats["chunks"], stats["skipped"], cache_stats["hits"], cache_stats["misses"]
+            )
+        return stats
+
+    def _chunk_batches(self, documents: Iterable[Document], batch_size: int) -> Iterator[List[Tuple[Document, str]]]:
+        """Split documents one at a time and group their chunks into batches."""
+        batch = []
+        seen: Set[str] = set()
+        for doc in documents:
+            chunks, ids = self._split_documents([doc], seen)
+            batch.extend(zip(chunks, ids))
+            while len(batch) >= batch_size:
+                yield batch[:batch_size]
+                batch = batch[batch_size:]
+        if batch:
+            yield batch
+
+    def _load_sparse_index(self) -> None:
+        """Rebuild the in-process BM25 index from the chunks stored in Chroma."""
+        stored = self.vector_store.get(include=["documents", "metadatas"])
+        self.sparse_index = BM25Index()
+        self.sparse_index.add(
+            [Document(page_content=text, metadata=metadata or {})
+             for text, metadata in zip(stored["documents"], stored["metadatas"])],
+            stored["ids"]
         )
-        self.vector_store.persist()
 
-    def create_qa_chain(self) -> None:
+    def load_recipe(self, doc_id: str) -> Optional[Document]:
         """
-        Create the question-answering chain.
+        Rebuild a full recipe from its indexed section chunks.
+        
+        Args:
+            doc_id: Recipe ID
+            
+        Returns:
+            The normalized recipe, or None if it is not indexed
+        """
+        stored = self.vector_store.get(where={"id": doc_id}, include=["documents", "metadatas"])
+        if not stored["ids"]:
+            return None
+        chunks = sorted(
+            zip(stored["ids"], stored["documents"], stored["metadatas"]),
+            key=lambda chunk: int(chunk[0].rsplit(":", 1)[1])
+        )
+        chunks = [Document(page_content=text, metadata=metadata or {}) for _, text, metadata in chunks]
+        return Document(
+            page_content=join_sections(chunks, self.text_splitter._chunk_overlap),
+            metadata={**chunks[0].metadata, "section": "recipe"}
+        )
+
+    def apply_changes(self, changes: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Apply admin changes to the existing vector store without rebuilding it.
+        
+        Args:
+            changes: Change log entries (see rag_system.knowledge_changes), oldest first
+            
+        Returns:
+            Dictionary with the number of upserted and deleted recipes
         """
         if not self.vector_store:
             raise ValueError("Vector store not initialized. Call create_vector_store first.")
+        
+        # Only the last change to each recipe matters
+        latest = {}
+        for change in changes:
+            latest[change["id"]] = change
+        if not latest:
+            return {"upserted": 0, "deleted": 0}
+        
+        upserts = []
+        for doc_id, change in latest.items():
+            if change["op"] == UPSERT:
+                item = change["document"]
+                metadata = {**item["metadata"], "id": doc_id}
+                upserts.append(Document(page_content=item["page_content"], metadata=metadata))
+        
+        # Remove every chunk of the touched recipes, then add the new versions
+        self.vector_store.delete(where={"id": {"$in": list(latest)}})
+        self.sparse_index.remove_where("id", latest)
+        if upserts:
+            texts, ids = self._split_documents(upserts)
+            self.vector_store.add_documents(texts, ids=ids)
+            self.sparse_index.add(texts, ids)
+        self._invalidate_answers()
+        
+        return {"upserted": len(upserts), "deleted": len(latest) - len(upserts)}
+
+    def sync_changes(self) -> Dict[str, int]:
+        """
+        Apply changes the admin panel logged since the last sync.
+        
+        Cheap when nothing changed (a single stat call), so it can run before
+        every query.
+        
+        Returns:
+            Dictionary with the number of upserted and deleted recipes
+        """
+        if self.vector_store is None or log_size(self.change_log_path) <= self._change_log_offset:
+            return {"upserted": 0, "deleted": 0}
+        
+        with self._index_lock:
+            changes, offset = read_changes(self._change_log_offset, self.change_log_path)
+            result = self.apply_changes(changes)
+            self._change_log_offset = offset
             
+            # Record the new offset so a restart does not replay these changes; the
+            # fingerprint stays that of the file the index was built from, since
+            # the file on disk may since have been exported, edited or replaced
+            if self._index_fingerprint is not None:
+                self._write_index_state(self._index_fingerprint, offset)
+        
+        logger.info("Applied %d upserts and %d deletes from the change log", result["upserted"], result["deleted"])
+        return result
+
+    def create_retriever(self) -> None:
+        """
+        Create the retriever from the current retrieval settings (mode, k, dense_k).
+        """
+        if not self.vector_store:
+            raise ValueError("Vector store not initialized. Call create_vector_store first.")
+        
+        # One read-only retriever shared by every chat session
+        if self.retriever_mode == "hybrid":
+            self.retriever = HybridRetriever(
+                vector_store=self.vector_store,
+                sparse_index=self.sparse_index,
+                k=self.k,
+                dense_k=self.dense_k,
+                sparse_k=self.k,
+                prefilter=self.recipe_index.prefilter if self.recipe_index is not None else None
+            )
+        elif self.recipe_index is not None:
+            # Vector search only, restricted like the hybrid retriever
+            self.retriever = HybridRetriever(
+                vector_store=self.vector_store,
+                sparse_index=self.sparse_index,
+                k=self.k,
+                dense_k=self.k,
+                sparse_k=0,
+                prefilter=self.recipe_index.prefilter
+            )
+        else:
+            self.retriever = self.vector_store.as_retriever(
+                search_kwargs={
+                    "k": self.k
+                }
+            )
+        if self.expand_parents:
+            # Small sections are retrieved; whole recipes only reach the prompt when asked for
+            self.retriever = ParentDocumentRetriever(
+                base_retriever=self.retriever,
+                load_parent=self.load_recipe
+            )
+
+    def create_qa_chain(self) -> None:
+        """
+        Create the question-answering chain.
+        """
+        self.create_retriever()
+        from langchain.chains import RetrievalQA
         self.qa_chain = RetrievalQA.from_chain_type(
             llm=self.llm,
             chain_type="stuff",
-            retriever=self.vector_store.as_retriever(
-                search_kwargs={
-                    "k": 3  # Retrieve more documents
-                }
-            ),
-            chain_type_kwargs={"prompt": self.prompt_template}
+            retriever=self.retriever,
+            chain_type_kwargs={"prompt": self.prompt_template},
+            return_source_documents=True
         )
 
+    def _direct_answer(self, question: str) -> Optional[str]:
+        """Return a canned answer for questions that do not need the LLM."""
+        if any(q in question.lower() for q in IDENTITY_QUESTIONS):
+            return IDENTITY_ANSWER
+        return None
+
+    def _prepare_question(self, question: str) -> str:
+        """Normalize the question and add recipe context to recipe requests."""
+        # Clean and normalize the question exactly like the indexed text
+        question = normalize_question(question)
+        
+        # Handle recipe queries
+        if any(word in question for word in ["recipe", "how to", "how do i", "ingredients", "cook"]):
+            # Add context to the question
+            question = f"recipe for {question}"
+        return question
+
+    def _build_prompt(self, question: str, documents: List[Document]) -> str:
+        """Stuff the retrieved documents into the prompt, as the QA chain does."""
+        context = "\n\n".join(doc.page_content for doc in documents)
+        return self.prompt_template.format(context=context, question=question)
+
+    @property
+    def _query_slots(self) -> asyncio.Semaphore:
+        """The generation slots of the running event loop."""
+        loop = asyncio.get_running_loop()
+        slots = self._loop_query_slots.get(loop)
+        if slots is None:
+            slots = self._loop_query_slots[loop] = asyncio.Semaphore(self.max_concurrent_queries)
+        return slots
+
+    async def _acquire_query_slot(self) -> bool:
+        """
+        Wait for a free generation slot.
+        
+        Returns:
+            False if the wait line is full and the question should be turned away
+        """
+        if self._query_slots.locked() and self._queued_queries >= self.max_queued_queries:
+            return False
+        
+        self._queued_queries += 1
+        try:
+            await self._query_slots.acquire()
+        finally:
+            self._queued_queries -= 1
+        return True
+
+    def _count_context(self, trace: QueryTrace, documents: List[Document], prompt: str) -> None:
+        trace.count("retrieved_chunks", len(documents))
+        trace.count("prompt_chars", len(prompt))
+
+    def _generation_text(self, trace: QueryTrace, result: LLMResult) -> str:
+        """Return the generated text, counting the tokens the model reported."""
+        generation = result.generations[0][0]
+        info = generation.generation_info or {}
+        # Ollama reports the token counts along with the final response
+        if "prompt_eval_count" in info:
+            trace.count("prompt_tokens", info["prompt_eval_count"])
+        if "eval_count" in info:
+            trace.count("completion_tokens", info["eval_count"])
+        return generation.text
+
+    def _route(self, trace: QueryTrace, question: str) -> Optional[Tuple[str, List[Document]]]:
+        """Answer a recipe lookup through the fast path, if enabled."""
+        if self.router is None:
+            return None
+        with trace.stage("fast_path"):
+            routed = self.router.route(question)
+        if routed:
+            trace.outcome = "fast_path"
+        return routed
+
     def query(self, question: str) -> Tuple[str, List[Dict[str, Any]]]:
         """
         Query the RAG system with a question.
@@ -101,46 +815,235 @@ class FoodRAGSystem:
         Returns:
             Tuple containing the answer and source documents
         """
-        if not self.qa_chain:
-            self.create_qa_chain()
+        with self.metrics.trace(question) as trace:
+            try:
+                # Handle identity questions directly
+                answer = self._direct_answer(question)
+                if answer:
+                    trace.outcome = "direct"
+                    return answer, []
+                
+                if self.qa_chain is None:
+                    with trace.stage("startup"):
+                        self.ensure_ready()
+                
+                routed = self._route(trace, question)
+                if routed:
+                    return routed
+                
+                # Reuse the answer to a question asked before
+                question = self._prepare_question(question)
+                cache = self.answer_cache
+                if cache is not None:
+                    with trace.stage("answer_cache"):
+                        cached = cache.get(question)
+                    if cached:
+                        trace.outcome = "cached"
+                        return cached
+                    generation = cache.generation
+                
+                # Handle regular food-related questions
+                with trace.stage("retrieval"):
+                    sources = self.retriever.invoke(question)
+                with trace.stage("prompt"):
+                    prompt = self._build_prompt(question, sources)
+                self._count_context(trace, sources, prompt)
+                with trace.stage("generation"):
+                    result = self.llm.generate([prompt])
+                answer = self._generation_text(trace, result)
+                if cache is not None:
+                    cache.put(question, answer, sources, generation)
+                return answer, sources
+            except Exception as e:
+                trace.outcome = "error"
+                return f"Sorry, there was an error answering your question: {str(e)}", []
+
+    async def aquery(self, question: str) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Query the RAG system without blocking the event loop.
+        
+        At most ``max_concurrent_queries`` generations run at once; further
+        questions wait in line, and once ``max_queued_queries`` are waiting new
+        ones get a busy answer instead of piling up.
+        
+        Args:
+            question: The question to answer
             
+        Returns:
+            Tuple containing the answer and source documents
+        """
+        with self.metrics.trace(question) as trace:
+            try:
+                # Handle identity questions directly
+                answer = self._direct_answer(question)
+                if answer:
+                    trace.outcome = "direct"
+                    return answer, []
+                
+                if self.qa_chain is None:
+                    with trace.stage("startup"):
+                        await self.aensure_ready()
+                
+                # Lookups and cache hits do not need a generation slot
+                routed = self._route(trace, question)
+                if routed:
+                    return routed
+                question = self._prepare_question(question)
+                cache = self.answer_cache
+                if cache is not None:
+                    with trace.stage("answer_cache"):
+                        cached = await cache.aget(question)
+                    if cached:
+                        trace.outcome = "cached"
+                        return cached
+                    generation = cache.generation
+                
+                with trace.stage("queue"):
+                    admitted = await self._acquire_query_slot()
+                if not admitted:
+                    trace.outcome = "busy"
+                    return BUSY_ANSWER, []
+                try:
+                    with trace.stage("retrieval"):
+                        sources = await self.retriever.ainvoke(question)
+                    with trace.stage("prompt"):
+                        prompt = self._build_prompt(question, sources)
+                    self._count_context(trace, sources, prompt)
+                    with trace.stage("generation"):
+                        result = await self.llm.agenerate([prompt])
+                finally:
+                    self._query_slots.release()
+                answer = self._generation_text(trace, result)
+                if cache is not None:
+                    await cache.aput(question, answer, sources, generation)
+                return answer, sources
+            except Exception as e:
+                trace.outcome = "error"
+                return f"Sorry, there was an error answering your question: {str(e)}", []
+
+    async def astream(self, question: str) -> AsyncIterator[Union[List[Document], str]]:
+        """
+        Stream the answer to a question token by token.
+        
+        The first item yielded is the list of retrieved source documents, so
+        callers can show them before generation starts; every following item
+        is a chunk of answer text. Generation shares the concurrency limit of
+        ``aquery``; a caller that stops reading early must ``aclose()`` the
+        stream (e.g. with ``contextlib.aclosing``) to free its slot at once.
+        
+        Args:
+            question: The question to answer
+            
+        Yields:
+            The source documents, then the answer text as it is generated
+        """
+        # The trace is only made current around awaits, never across a yield
+        trace = QueryTrace(question)
         try:
             # Handle identity questions directly
-            identity_questions = ["what's your name", "who are you", "what is your name", "who are you?", "what's your name?"]
-            if any(q in question.lower() for q in identity_questions):
-                return "I am Chef Kamyar, your personal culinary expert! I'm passionate about cooking and love sharing my knowledge about food, recipes, and cooking techniques. How can I assist you with your culinary questions today?", []
+            answer = self._direct_answer(question)
+            if answer:
+                trace.outcome = "direct"
+                yield []
+                yield answer
+                return
             
-            # Clean and normalize the question
-            question = question.strip().lower()
+            try:
+                if self.qa_chain is None:
+                    with activate(trace), trace.stage("startup"):
+                        await self.aensure_ready()
+            except Exception as e:
+                trace.outcome = "error"
+                yield []
+                yield f"Sorry, there was an error answering your question: {str(e)}"
+                return
             
-            # Handle recipe queries
-            if any(word in question for word in ["recipe", "how to", "how do i", "ingredients", "cook"]):
-                # Add context to the question
-                question = f"recipe for {question}"
+            # Answer lookups and replay cached answers without a generation slot
+            try:
+                with activate(trace):
+                    routed = self._route(trace, question)
+            except Exception:
+                routed = None
+            if routed:
+                yield routed[1]
+                yield routed[0]
+                return
+            question = self._prepare_question(question)
+            cache = self.answer_cache
+            if cache is not None:
+                try:
+                    with activate(trace), trace.stage("answer_cache"):
+                        cached = await cache.aget(question)
+                except Exception:
+                    cached = None
+                if cached:
+                    trace.outcome = "cached"
+                    yield cached[1]
+                    yield cached[0]
+                    return
+                generation = cache.generation
+            
+            with trace.stage("queue"):
+                admitted = await self._acquire_query_slot()
+            if not admitted:
+                trace.outcome = "busy"
+                yield []
+                yield BUSY_ANSWER
+                return
+            
+            sources_sent = False
+            try:
+                with activate(trace), trace.stage("retrieval"):
+                    documents = await self.retriever.ainvoke(question)
+                yield documents
+                sources_sent = True
                 
-            # Handle regular food-related questions
-            result = self.qa_chain.invoke({"query": question})
-            return result["result"], result.get("source_documents", [])
-        except Exception as e:
-            return f"Sorry, there was an error answering your question: {str(e)}", []
-
-def load_knowledge() -> List[Document]:
-    """Load knowledge base from JSON file."""
-    import json
-    from pathlib import Path
-    
-    # Load JSON file
-    json_path = Path(__file__).parent.parent / "data" / "food_knowledge.json"
-    with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+                with trace.stage("prompt"):
+                    prompt = self._build_prompt(question, documents)
+                self._count_context(trace, documents, prompt)
+                tokens = []
+                started = time.perf_counter()
+                async for token in self.llm.astream(prompt):
+                    if not tokens:
+                        trace.add("first_token", time.perf_counter() - started)
+                    tokens.append(token)
+                    yield token
+                trace.add("generation", time.perf_counter() - started)
+                # Ollama streams one token per chunk
+                trace.count("completion_tokens", len(tokens))
+                if cache is not None:
+                    with activate(trace):
+                        await cache.aput(question, "".join(tokens), documents, generation)
+            except Exception as e:
+                trace.outcome = "error"
+                if not sources_sent:
+                    yield []
+                yield f"Sorry, there was an error answering your question: {str(e)}"
+            finally:
+                self._query_slots.release()
+        finally:
+            self.metrics.record(trace)
+
+_shared_system: Optional[FoodRAGSystem] = None
+_shared_lock = threading.Lock()
+
+def get_rag_system() -> FoodRAGSystem:
+    """
+    Return the engine shared by every entry point in this process.
     
-    # Convert JSON data to Document objects
-    documents = []
-    for item in data:
-        doc = Document(
-            page_content=item["page_content"],
-            metadata=item["metadata"]
-        )
-        documents.append(doc)
+    Created from RAGConfig.from_env() on the first call; the index is opened
+    lazily by the first question (or an explicit ensure_ready()).
+    """
+    global _shared_system
+    with _shared_lock:
+        if _shared_system is None:
+            _shared_system = FoodRAGSystem()
+        return _shared_system
+
+def load_knowledge(json_path: Path = KNOWLEDGE_FILE) -> List[Document]:
+    """
+    Load the whole knowledge base (JSON array or JSON Lines) into memory.
     
-    return documents 
\ No newline at end of file
+    Prefer rag_system.knowledge_file.iter_documents for large files.
+    """
+    return list(iter_documents(json_path))
@@ -0,0 +1,390 @@
+"""
+Structured recipe fields and a columnar index to filter recipes by them.
+
+Recipes are free text with ingredient, instruction and nutrition blocks, in
+Persian ("مواد لازم / دستور پخت / ارزش غذایی") or in the English layout of the
+admin panel ("Ingredients / Instructions / Nutritional Information").
+parse_recipe() extracts the title, ingredient names, steps and the numeric
+nutrition values, and RecipeTable keeps them column by column (sorted nutrient
+columns plus ingredient and category postings), so a constraint such as
+"main dishes under 300 kcal with chicken" selects the matching recipe IDs in
+well under a millisecond. FoodRAGSystem uses the selection to restrict
+retrieval to those recipes instead of asking the LLM to scan the text.
+
+Try the parser on a knowledge file with:
+    python -m rag_system.recipe_index "main dishes under 300 kcal with chicken"
+"""
+from typing import Any, Callable, Collection, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from langchain_core.documents import Document
+from rag_system.hybrid_retrieval import STOPWORDS, tokenize
+from rag_system.metrics import timed
+from rag_system.recipe_splitter import RecipeTextSplitter, join_sections
+from rag_system.text_normalization import normalize_question, normalize_text
+import argparse
+import logging
+import math
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+NUTRIENTS = ("calories", "protein", "carbs", "fat")
+NUTRIENT_LABELS = {
+    "calories": ["calories", "calorie", "kcal", "کالری", "انرژی"],
+    "protein": ["protein", "پروتئین"],
+    "carbs": ["carbohydrates", "carbohydrate", "carbs", "carb", "کربوهیدرات"],
+    "fat": ["fat", "چربی"],
+}
+# Categories of the admin panel, by the words questions use for them
+CATEGORY_KEYWORDS = {
+    "Main Dish": ["main dish", "main course", "غذای اصلی", "غذا اصلی"],
+    "Soup": ["soup", "سوپ"],
+    "Appetizer": ["appetizer", "starter", "پیش غذا"],
+    "Side Dish": ["side dish", "دورچین"],
+    "Dessert": ["dessert", "دسر"],
+}
+UPPER_BOUND_KEYWORDS = ["under", "below", "less than", "at most", "زیر", "کمتر از", "حداکثر"]
+LOWER_BOUND_KEYWORDS = ["over", "above", "more than", "at least", "بالای", "بیشتر از", "حداقل"]
+INGREDIENT_KEYWORDS = ["with", "containing", "including", "با", "دارای", "حاوی"]
+
+_NUMBER = r"\d+(?:[.,٫]\d+)?"
+_LIST_MARKER = re.compile(r"^(?:[-*•]|\d+[.)])\s*")
+_NUTRIENT_LINE = re.compile(
+    r"^(?:[-*•]\s*)?(?P<label>" + "|".join(
+        re.escape(label) for labels in NUTRIENT_LABELS.values() for label in labels
+    ) + r")\b[^:\d]*:?\s*(?P<value>" + _NUMBER + ")",
+    re.IGNORECASE
+)
+_NUTRIENT_NAMES = {label: name for name, labels in NUTRIENT_LABELS.items() for label in labels}
+_SPLITTER = RecipeTextSplitter()
+
+def _alternation(words: Iterable[str]) -> str:
+    return "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+# "under 300 kcal", "protein over 20 g", "زیر 300 کالری", "پروتئین بیشتر از 20 گرم"
+_BOUND = re.compile(
+    r"(?:(?<!\w)(?P<before>" + _alternation(_NUTRIENT_NAMES) + r")\s+)?"
+    r"(?<!\w)(?P<comparator>" + _alternation(UPPER_BOUND_KEYWORDS + LOWER_BOUND_KEYWORDS) + r")\s*"
+    r"(?P<value>" + _NUMBER + r")\s*(?:g\b|grams?\b|گرم)?\s*"
+    r"(?P<after>" + _alternation(_NUTRIENT_NAMES) + r")?"
+)
+_INGREDIENTS = re.compile(r"(?<!\w)(?:" + _alternation(INGREDIENT_KEYWORDS) + r")\s+(?P<phrase>[^?؟!.,،]+)")
+_PHRASE_END = set(tokenize(" ".join(UPPER_BOUND_KEYWORDS + LOWER_BOUND_KEYWORDS))) | set(_NUTRIENT_NAMES)
+
+def _number(text: str) -> float:
+    return float(text.replace(",", ".").replace("٫", "."))
+
+@dataclass
+class ParsedRecipe:
+    """
+    Fields extracted from a recipe's text.
+
+    Attributes:
+        id: Recipe ID from the metadata
+        title: First line of the recipe
+        category: Category from the metadata, if any
+        ingredients: Ingredient names without quantities
+        steps: Instruction steps without their numbering
+        nutrition: Numeric values by name in NUTRIENTS (per 100 g); missing
+            values are left out
+    """
+
+    id: Optional[str]
+    title: str
+    category: Optional[str] = None
+    ingredients: List[str] = field(default_factory=list)
+    steps: List[str] = field(default_factory=list)
+    nutrition: Dict[str, float] = field(default_factory=dict)
+
+def parse_recipe(text: str, metadata: Optional[Mapping[str, Any]] = None) -> ParsedRecipe:
+    """
+    Extract the fields of a recipe.
+
+    Args:
+        text: Recipe text; Persian digits are folded to ASCII
+        metadata: Recipe metadata with "id" and "category"
+
+    Returns:
+        The parsed recipe; sections the text does not have stay empty
+    """
+    metadata = metadata or {}
+    title, sections = _SPLITTER.split_sections(normalize_text(text))
+    recipe = ParsedRecipe(id=metadata.get("id"), title=title, category=metadata.get("category"))
+    for name, body in sections:
+        # The first line of a section is its header
+        lines = [line.strip() for line in body.split("\n")[1:] if line.strip()]
+        if name == "ingredients":
+            for line in lines:
+                ingredient = _LIST_MARKER.sub("", line).split(":", 1)[0].strip()
+                if ingredient:
+                    recipe.ingredients.append(ingredient)
+        elif name == "instructions":
+            recipe.steps.extend(step for step in (_LIST_MARKER.sub("", line) for line in lines) if step)
+        elif name == "nutrition":
+            for line in lines:
+                match = _NUTRIENT_LINE.match(line)
+                if match:
+                    nutrient = _NUTRIENT_NAMES[match.group("label").lower()]
+                    recipe.nutrition.setdefault(nutrient, _number(match.group("value")))
+    return recipe
+
+@dataclass
+class RecipeFilter:
+    """
+    Constraints on recipe fields; empty constraints match every recipe.
+
+    Attributes:
+        category: Required category (compared case-insensitively)
+        ingredients: Terms that must each occur in an ingredient name
+        bounds: Inclusive (low, high) range per nutrient in NUTRIENTS
+    """
+
+    category: Optional[str] = None
+    ingredients: List[str] = field(default_factory=list)
+    bounds: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(self.category or self.ingredients or self.bounds)
+
+def parse_filter(question: str, ingredient_terms: Optional[Collection[str]] = None) -> RecipeFilter:
+    """
+    Read recipe constraints from a question.
+
+    "main dishes under 300 kcal with chicken" gives the Main Dish category,
+    calories up to 300 and the ingredient term "chicken". Bounds need a
+    nutrient name ("under 30 minutes" is no constraint), and ingredient terms
+    are the words after "with"/"با" up to the next bound, without connectors
+    such as "و"/"and".
+
+    Args:
+        question: The user's question
+        ingredient_terms: Known ingredient terms; other words after "with"
+            are ignored, so "با چه سرو کنم" is no constraint
+
+    Returns:
+        The constraints found, possibly none
+    """
+    question = normalize_question(question)
+    constraints = RecipeFilter()
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        if re.search(r"(?<!\w)(?:" + _alternation(keywords) + ")", question):
+            constraints.category = category
+            break
+
+    for match in _BOUND.finditer(question):
+        label = match.group("after") or match.group("before")
+        if not label:
+            continue
+        nutrient = _NUTRIENT_NAMES[label]
+        low, high = constraints.bounds.get(nutrient, (-math.inf, math.inf))
+        value = _number(match.group("value"))
+        if match.group("comparator") in UPPER_BOUND_KEYWORDS:
+            high = min(high, value)
+        else:
+            low = max(low, value)
+        constraints.bounds[nutrient] = (low, high)
+
+    for match in _INGREDIENTS.finditer(question):
+        for term in tokenize(match.group("phrase")):
+            if term in _PHRASE_END or term[0].isdigit():
+                break
+            if term in STOPWORDS:
+                continue
+            if ingredient_terms is None or term in ingredient_terms:
+                constraints.ingredients.append(term)
+    return constraints
+
+class RecipeTable:
+    """
+    Columnar, read-only index of parsed recipes.
+
+    Nutrient columns are kept sorted so a range is two binary searches, and
+    ingredient terms and categories map to row sets; a selection intersects
+    the candidate rows of every constraint.
+    """
+
+    def __init__(self, recipes: Iterable[ParsedRecipe], others: Sequence[str] = ()):
+        """
+        Build the index.
+
+        Args:
+            recipes: Parsed recipes; recipes without an ID are skipped
+            others: IDs of indexed documents that are not recipes (tips,
+                techniques), which no constraint applies to
+        """
+        self.others = list(others)
+        self.ids: List[str] = []
+        self.titles: List[str] = []
+        self._categories: Dict[str, Set[int]] = defaultdict(set)
+        self._ingredients: Dict[str, Set[int]] = defaultdict(set)
+        columns: Dict[str, List[Tuple[float, int]]] = {nutrient: [] for nutrient in NUTRIENTS}
+
+        for recipe in recipes:
+            if recipe.id is None:
+                continue
+            row = len(self.ids)
+            self.ids.append(recipe.id)
+            self.titles.append(recipe.title)
+            if recipe.category:
+                self._categories[recipe.category.lower()].add(row)
+            # "نمک و فلفل" and "گوشت چرخ کرده" add no "و" or "کرده" terms
+            for term in tokenize(" ".join(recipe.ingredients)):
+                if term not in STOPWORDS:
+                    self._ingredients[term].add(row)
+            for nutrient, value in recipe.nutrition.items():
+                columns[nutrient].append((value, row))
+
+        # Parallel sorted values and rows per nutrient; recipes missing a value are absent
+        self._columns: Dict[str, Tuple[List[float], List[int]]] = {}
+        for nutrient, pairs in columns.items():
+            pairs.sort()
+            self._columns[nutrient] = ([value for value, _ in pairs], [row for _, row in pairs])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def ingredient_terms(self) -> Collection[str]:
+        """Every term of an indexed ingredient name."""
+        return self._ingredients.keys()
+
+    @classmethod
+    def from_chunks(cls, chunks: Mapping[str, Document]) -> "RecipeTable":
+        """
+        Index the recipes of section chunks, keyed by chunk ID ("<recipe id>:<n>").
+
+        Args:
+            chunks: Chunks from recipe chunking, with "id" and "section" metadata
+
+        Returns:
+            The index; documents without recipe sections are its others
+        """
+        recipes: Dict[str, List[Tuple[int, Document]]] = defaultdict(list)
+        documents: Set[str] = set()
+        for chunk_id, doc in list(chunks.items()):
+            recipe_id, _, number = chunk_id.rpartition(":")
+            recipe_id = doc.metadata.get("id", recipe_id)
+            documents.add(recipe_id)
+            if doc.metadata.get("section") in ("ingredients", "instructions", "nutrition"):
+                recipes[recipe_id].append((int(number) if number.isdigit() else 0, doc))
+        return cls(
+            (parse_recipe(join_sections([doc for _, doc in sorted(parts, key=lambda part: part[0])]),
+                          parts[0][1].metadata)
+             for parts in recipes.values()),
+            sorted(documents.difference(recipes))
+        )
+
+    def _range(self, nutrient: str, low: float, high: float) -> Set[int]:
+        values, rows = self._columns[nutrient]
+        return set(rows[bisect_left(values, low):bisect_right(values, high)])
+
+    def select(self, constraints: RecipeFilter) -> List[str]:
+        """
+        Find the recipes meeting every constraint.
+
+        Args:
+            constraints: The constraints
+
+        Returns:
+            IDs of the matching recipes, in index order
+        """
+        candidates: List[Set[int]] = []
+        if constraints.category:
+            candidates.append(self._categories.get(constraints.category.lower(), set()))
+        candidates += [self._ingredients.get(term, set()) for term in constraints.ingredients]
+        for nutrient, (low, high) in constraints.bounds.items():
+            candidates.append(self._range(nutrient, low, high))
+        if not candidates:
+            return list(self.ids)
+
+        candidates.sort(key=len)
+        rows = set(candidates[0])
+        for other in candidates[1:]:
+            rows &= other
+        return [self.ids[row] for row in sorted(rows)]
+
+class RecipeIndex:
+    """
+    RecipeTable over the indexed chunks, rebuilt lazily after the index changed.
+    """
+
+    def __init__(self, chunks: Callable[[], Mapping[str, Document]]):
+        """
+        Initialize the index.
+
+        Args:
+            chunks: Returns the indexed chunks by chunk ID, from recipe chunking
+        """
+        self.chunks = chunks
+        self._table: Optional[RecipeTable] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        """Forget the table after the index changed; it is rebuilt on next use."""
+        with self._lock:
+            self._table = None
+
+    @property
+    def table(self) -> RecipeTable:
+        with self._lock:
+            if self._table is None:
+                self._table = RecipeTable.from_chunks(self.chunks())
+            return self._table
+
+    def prefilter(self, question: str) -> Optional[Set[str]]:
+        """
+        Recipe IDs retrieval should be restricted to for a question.
+
+        Returns:
+            The IDs of the recipes meeting the question's constraints plus the
+            documents that are not recipes, or None if the question has no
+            constraints or no recipe meets them
+        """
+        with timed("prefilter"):
+            # Most questions have no constraints and never need the table
+            if not parse_filter(question):
+                return None
+            table = self.table
+            constraints = parse_filter(question, table.ingredient_terms)
+            if not constraints:
+                return None
+            selected = table.select(constraints)
+            if not selected:
+                logger.info("No recipe meets %s; retrieving without the filter", constraints)
+                return None
+            return set(selected).union(table.others)
+
+def main():
+    from rag_system.knowledge_changes import document_id
+    from rag_system.knowledge_file import KNOWLEDGE_FILE, iter_items
+
+    parser = argparse.ArgumentParser(description='Filter recipes by the constraints of a question.')
+    parser.add_argument('question')
+    parser.add_argument('--knowledge', default=KNOWLEDGE_FILE, help='Knowledge file to index')
+    args = parser.parse_args()
+
+    if not Path(args.knowledge).exists():
+        parser.error(f"{args.knowledge} does not exist; pass --knowledge or start the chat service once to seed it")
+    start = time.perf_counter()
+    table = RecipeTable(
+        parse_recipe(item["page_content"], {**item.get("metadata", {}), "id": document_id(item)})
+        for item in iter_items(args.knowledge)
+    )
+    print(f"Indexed {len(table)} recipes in {time.perf_counter() - start:.2f} s")
+
+    constraints = parse_filter(args.question, table.ingredient_terms)
+    start = time.perf_counter()
+    ids = table.select(constraints)
+    elapsed = time.perf_counter() - start
+    print(f"{constraints}\n{len(ids)} matching recipes in {elapsed * 1000:.3f} ms")
+    titles = dict(zip(table.ids, table.titles))
+    for recipe_id in ids[:20]:
+        print(f"- {titles[recipe_id]} ({recipe_id})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+"""
+Recipe-structure-aware chunking for the RAG system.
+
+Recipes are split at their section headers (ingredients, instructions,
+nutrition) instead of at arbitrary character offsets. Every chunk repeats the
+dish title and records its section in the metadata, and a retriever wrapper
+can swap retrieved sections for the full recipe when a question needs it.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+)
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_text_splitters import RecursiveCharacterTextSplitter, TextSplitter
+import asyncio
+import re
+
+# Bump when section detection changes, so persisted indexes are rebuilt
+SPLITTER_VERSION = 2
+
+# Section headers in the bundled Persian recipes and in admin panel recipes
+SECTION_HEADERS = {
+    "ingredients": ["مواد لازم", "ingredients"],
+    "instructions": ["دستور پخت", "طرز تهیه", "instructions"],
+    "nutrition": ["ارزش غذایی", "nutritional information", "nutrition"],
+}
+# A header is a line of its own: "مواد لازم:", "Nutritional Information (per 100g):";
+# body lines that merely start with a header word ("Ingredients are ...") are not
+_HEADER = re.compile(
+    r"^(?P<header>" + "|".join(
+        re.escape(header) for headers in SECTION_HEADERS.values() for header in headers
+    ) + r")\s*(?:\([^()\n]*\))?\s*:?\s*$",
+    re.IGNORECASE
+)
+_SECTION_NAMES = {
+    header: name for name, headers in SECTION_HEADERS.items() for header in headers
+}
+
+# Questions that ask for a whole recipe rather than one part of it
+FULL_RECIPE_KEYWORDS = [
+    "recipe", "how to", "how do i", "how can i",
+    "طرز تهیه", "دستور", "چطور", "چگونه", "درست کنم", "بپزم",
+]
+# Questions about a single section are answered from that section alone
+SECTION_KEYWORDS = [
+    "ingredient", "nutrition", "calorie", "protein", "fat", "carb",
+    "مواد لازم", "ارزش غذایی", "کالری", "پروتئین", "چربی", "کربوهیدرات",
+]
+
+class RecipeTextSplitter(TextSplitter):
+    """
+    Split recipes into one chunk per logical section, each prefixed with the title.
+
+    Text without section headers (tips, techniques) is split into paragraphs
+    that are merged up to ``chunk_size``. A section longer than ``chunk_size``
+    falls back to character splitting within that section only.
+    """
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 100, **kwargs: Any):
+        """
+        Initialize the splitter.
+
+        Args:
+            chunk_size: Maximum characters per chunk
+            chunk_overlap: Overlap used only when an oversized section is split
+        """
+        super().__init__(chunk_size=chunk_size, chunk_overlap=chunk_overlap, **kwargs)
+        self._fallback = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            separators=["\n\n", "\n", " ", ""]
+        )
+
+    def split_sections(self, text: str) -> Tuple[str, List[Tuple[str, str]]]:
+        """
+        Find the title and the logical sections of a recipe.
+
+        Args:
+            text: Normalized recipe text
+
+        Returns:
+            Tuple of the title and a list of (section name, section text)
+        """
+        lines = text.strip().split("\n")
+        title = lines[0].strip() if lines else ""
+
+        sections: List[Tuple[str, List[str]]] = [("overview", [])]
+        for line in lines[1:]:
+            match = _HEADER.match(line.strip())
+            if match:
+                sections.append((_SECTION_NAMES[match.group("header").lower()], [line]))
+            else:
+                sections[-1][1].append(line)
+
+        result = [(name, "\n".join(body).strip()) for name, body in sections]
+        result = [(name, body) for name, body in result if body]
+        if len(result) == 1 and result[0][0] == "overview":
+            result = [("text", body) for body in self._merge_paragraphs(result[0][1], len(title))]
+        return title, result
+
+    def _merge_paragraphs(self, text: str, title_length: int) -> List[str]:
+        """Greedily merge blank-line separated paragraphs up to the chunk size."""
+        merged: List[str] = []
+        for paragraph in text.split("\n\n"):
+            if merged and len(merged[-1]) + len(paragraph) + title_length + 4 <= self._chunk_size:
+                merged[-1] += "\n\n" + paragraph
+            else:
+                merged.append(paragraph)
+        return merged
+
+    def _chunks(self, text: str) -> List[Tuple[str, str, str]]:
+        """Return (title, section name, chunk text) for every chunk of a text."""
+        title, sections = self.split_sections(text)
+        chunks = []
+        for name, body in sections:
+            budget = max(self._chunk_size - len(title) - 2, 1)
+            pieces = [body] if len(body) <= budget else self._fallback.split_text(body)
+            for piece in pieces:
+                chunks.append((title, name, f"{title}\n\n{piece}" if title else piece))
+        if not chunks and title:
+            chunks.append((title, "overview", title))
+        return chunks
+
+    def split_text(self, text: str) -> List[str]:
+        """Split text into section chunks."""
+        return [chunk for _, _, chunk in self._chunks(text)]
+
+    def split_documents(self, documents: List[Document]) -> List[Document]:
+        """
+        Split documents into section chunks, adding "title" and "section" metadata.
+
+        Args:
+            documents: Recipes to split
+
+        Returns:
+            One Document per section chunk
+        """
+        chunks = []
+        for doc in documents:
+            for title, name, text in self._chunks(doc.page_content):
+                chunks.append(Document(
+                    page_content=text,
+                    metadata={**doc.metadata, "title": title, "section": name}
+                ))
+        return chunks
+
+def _strip_overlap(previous: str, text: str, overlap: int) -> str:
+    """Drop the start of ``text`` that repeats the end of ``previous``, at most ``overlap`` characters."""
+    for size in range(min(overlap, len(previous), len(text)), 0, -1):
+        # The repeated part is made of whole words (or lines) on both sides
+        if (previous.endswith(text[:size])
+                and (size == len(text) or text[size].isspace())
+                and (size == len(previous) or previous[-size - 1].isspace())):
+            return text[size:].lstrip()
+    return text
+
+def join_sections(chunks: List[Document], overlap: int = 0) -> str:
+    """
+    Rebuild a recipe's text from its section chunks (in chunk order).
+
+    Args:
+        chunks: Section chunks of one recipe
+        overlap: Chunk overlap of the splitter; text repeated between the
+            pieces of an oversized section is kept once
+
+    Returns:
+        The title followed by every section once
+    """
+    title = chunks[0].metadata.get("title", "") if chunks else ""
+    bodies: List[str] = []
+    previous: Optional[Document] = None
+    for chunk in chunks:
+        text = chunk.page_content
+        if title and text.startswith(title):
+            text = text[len(title):].lstrip("\n")
+        section = chunk.metadata.get("section")
+        # Pieces of an oversized section overlap; merged paragraphs ("text") do not
+        if overlap and bodies and section != "text" and previous.metadata.get("section") == section:
+            # The next piece of the same section: continue it instead of starting a paragraph
+            text = _strip_overlap(bodies[-1], text, overlap)
+            bodies[-1] += "\n" + text if text else ""
+        else:
+            bodies.append(text)
+        previous = chunk
+    return "\n\n".join([title, *bodies] if title else bodies)
+
+def needs_full_recipe(question: str) -> bool:
+    """Whether a question asks for a whole recipe rather than one section of it."""
+    question = question.lower()
+    if any(keyword in question for keyword in SECTION_KEYWORDS):
+        return False
+    return any(keyword in question for keyword in FULL_RECIPE_KEYWORDS)
+
+class ParentDocumentRetriever(BaseRetriever):
+    """
+    Retrieve small section chunks, expanding to the full recipe only when needed.
+
+    When ``should_expand`` accepts the question, the sections of the best
+    ``max_parents`` recipes are replaced by the whole recipe (each recipe
+    once); other results are returned unchanged.
+    """
+
+    base_retriever: BaseRetriever
+    load_parent: Callable[[str], Optional[Document]]
+    should_expand: Callable[[str], bool] = needs_full_recipe
+    max_parents: int = 1
+
+    def _expand(self, query: str, documents: List[Document]) -> List[Document]:
+        if not self.should_expand(query):
+            return documents
+
+        expanded: List[Document] = []
+        parents: Dict[str, Document] = {}
+        for doc in documents:
+            parent_id = doc.metadata.get("id")
+            if parent_id in parents:
+                continue
+            if parent_id is not None and len(parents) < self.max_parents:
+                parent = self.load_parent(parent_id)
+                if parent is not None:
+                    parents[parent_id] = parent
+                    expanded.append(parent)
+                    continue
+            expanded.append(doc)
+        return expanded
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        documents = self.base_retriever.invoke(query, config={"callbacks": run_manager.get_child()})
+        return self._expand(query, documents)
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        documents = await self.base_retriever.ainvoke(query, config={"callbacks": run_manager.get_child()})
+        if not self.should_expand(query):
+            return documents
+        # Loading a parent is a blocking vector store read
+        return await asyncio.get_running_loop().run_in_executor(None, self._expand, query, documents)
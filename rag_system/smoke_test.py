@@ -0,0 +1,58 @@
+"""
+Smoke test of the RAG system on the bundled recipes.
+
+Runs against a live Ollama by default; pass --offline to use the stand-in
+server from rag_system.fake_ollama instead. Run from the repository root with:
+    python -m rag_system.smoke_test [--offline]
+"""
+from rag_system.rag import FoodRAGSystem
+from rag_system.food_knowledge import FOOD_KNOWLEDGE
+from rag_system.fake_ollama import FakeOllamaServer
+import argparse
+import os
+import tempfile
+
+def test_rag_system(persist_directory=None):
+    # Initialize the RAG system
+    print("Initializing RAG system...")
+    rag = FoodRAGSystem(**({"persist_directory": persist_directory} if persist_directory else {}))
+
+    # Create vector store
+    print("\nCreating vector store...")
+    rag.create_vector_store(FOOD_KNOWLEDGE)
+
+    # Create QA chain
+    print("Creating QA chain...")
+    rag.create_qa_chain()
+
+    # Test questions
+    test_questions = [
+        "What are the nutritional facts for pizza?",
+        "How many calories are in a hamburger?",
+        "What are some healthy eating tips?",
+        "What are the different cooking methods?",
+        "What are the recommended daily nutritional guidelines?"
+    ]
+
+    # Run tests
+    print("\nRunning test questions...")
+    for question in test_questions:
+        print(f"\nQuestion: {question}")
+        answer, sources = rag.query(question)
+        print(f"Answer: {answer}")
+        print("\nSources:")
+        for doc in sources:
+            print(f"- {doc.page_content[:200]}...")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Smoke test the RAG system.')
+    parser.add_argument('--offline', action='store_true', help='Use a fake Ollama server and a temporary index')
+    args = parser.parse_args()
+
+    if args.offline:
+        with FakeOllamaServer() as server, tempfile.TemporaryDirectory() as persist_directory:
+            os.environ["OLLAMA_HOST"] = server.base_url
+            os.environ["RAG_EMBEDDING_CACHE_PATH"] = os.path.join(persist_directory, "embedding_cache.sqlite3")
+            test_rag_system(persist_directory)
+    else:
+        test_rag_system()
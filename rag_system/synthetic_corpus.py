@@ -0,0 +1,135 @@
+"""
+Synthetic Persian/English recipe corpus for benchmarks.
+
+Recipes follow the layout of the bundled ones (title, ingredients,
+instructions, nutrition), half in Persian and half in English, so they go
+through the same normalization and section chunking as real data. The corpus
+is fully determined by its size and seed. Write one with:
+    python -m rag_system.synthetic_corpus data/synthetic.jsonl --recipes 10000
+"""
+from typing import Any, Dict, Iterator
+from pathlib import Path
+from rag_system.knowledge_file import write_items
+import argparse
+import random
+
+PERSIAN_DISHES = [
+    "قورمه سبزی", "قیمه", "فسنجان", "کباب کوبیده", "جوجه کباب", "زرشک پلو",
+    "ته چین", "آش رشته", "کشک بادمجان", "میرزا قاسمی", "عدس پلو", "باقالی پلو",
+    "کوکو سبزی", "دلمه برگ مو", "خورش بادمجان", "آبگوشت", "شیرین پلو", "کله جوش",
+]
+PERSIAN_STYLES = ["مجلسی", "خانگی", "شیرازی", "تبریزی", "گیلانی", "یزدی", "اصفهانی", "کرمانی"]
+PERSIAN_INGREDIENTS = [
+    "گوشت گوسفندی", "مرغ", "برنج", "پیاز", "سیر", "زعفران", "زردچوبه", "لیمو عمانی",
+    "لوبیا قرمز", "لپه", "بادمجان", "گوجه فرنگی", "رب انار", "گردو", "کشک", "سبزی معطر",
+    "زرشک", "باقالی", "عدس", "کره", "روغن", "نمک و فلفل",
+]
+PERSIAN_STEPS = [
+    "پیاز را خلال کنید و تفت دهید", "گوشت را اضافه کنید و سرخ کنید", "ادویه ها را اضافه کنید",
+    "آب اضافه کنید و بگذارید بجوشد", "روی حرارت ملایم بپزید تا جا بیفتد", "برنج را خیس کنید",
+    "زعفران را دم کنید", "سبزی را سرخ کنید", "مواد را مخلوط کنید", "در ظرف سرو بکشید",
+]
+ENGLISH_DISHES = [
+    "Margherita Pizza", "Pasta Carbonara", "Beef Stroganoff", "Chicken Curry", "Caesar Salad",
+    "Lasagna", "Ratatouille", "Paella", "Shepherd's Pie", "Pad Thai", "Falafel", "Risotto",
+    "Goulash", "Moussaka", "Tacos", "Ramen", "Fish and Chips", "Minestrone",
+]
+ENGLISH_STYLES = ["Classic", "Spicy", "Rustic", "Homestyle", "Festive", "Light", "Smoky", "Creamy"]
+ENGLISH_INGREDIENTS = [
+    "chicken breast", "ground beef", "rice", "onion", "garlic", "olive oil", "butter",
+    "tomatoes", "mushrooms", "bell pepper", "potatoes", "carrots", "parmesan", "cream",
+    "eggs", "flour", "lemon", "basil", "paprika", "cumin", "salt and pepper", "pasta",
+]
+ENGLISH_STEPS = [
+    "Chop the onion and garlic", "Brown the meat in a hot pan", "Add the spices and stir",
+    "Pour in the stock and bring to a boil", "Simmer over low heat until tender",
+    "Cook the pasta in salted water", "Whisk the eggs with the cheese",
+    "Combine everything and season to taste", "Bake until golden", "Serve hot",
+]
+CATEGORIES = ["Main Dish", "Soup", "Appetizer", "Side Dish", "Dessert"]
+
+PERSIAN_DIGITS = str.maketrans("0123456789", "۰۱۲۳۴۵۶۷۸۹")
+
+def _persian_recipe(rng: random.Random, title: str) -> str:
+    ingredients = rng.sample(PERSIAN_INGREDIENTS, rng.randint(5, 9))
+    steps = rng.sample(PERSIAN_STEPS, rng.randint(4, 7))
+    lines = [title, "", "مواد لازم:"]
+    lines += [f"- {name}: {rng.randint(1, 5) * 100} گرم".translate(PERSIAN_DIGITS) for name in ingredients]
+    lines += ["", "دستور پخت:"]
+    lines += [f"{i}. {step}".translate(PERSIAN_DIGITS) for i, step in enumerate(steps, 1)]
+    lines += [
+        "", "ارزش غذایی (در هر ۱۰۰ گرم):",
+        f"- کالری: {rng.randint(80, 600)}".translate(PERSIAN_DIGITS),
+        f"- پروتئین: {rng.randint(2, 40)} گرم".translate(PERSIAN_DIGITS),
+        f"- کربوهیدرات: {rng.randint(5, 80)} گرم".translate(PERSIAN_DIGITS),
+        f"- چربی: {rng.randint(1, 35)} گرم".translate(PERSIAN_DIGITS),
+    ]
+    return "\n".join(lines)
+
+def _english_recipe(rng: random.Random, title: str) -> str:
+    ingredients = rng.sample(ENGLISH_INGREDIENTS, rng.randint(5, 9))
+    steps = rng.sample(ENGLISH_STEPS, rng.randint(4, 7))
+    lines = [title, "", "Ingredients:"]
+    lines += [f"- {name}: {rng.randint(1, 5) * 100} g" for name in ingredients]
+    lines += ["", "Instructions:"]
+    lines += [f"{i}. {step}" for i, step in enumerate(steps, 1)]
+    lines += [
+        "", "Nutritional information (per 100g):",
+        f"- Calories: {rng.randint(80, 600)}",
+        f"- Protein: {rng.randint(2, 40)} g",
+        f"- Carbohydrates: {rng.randint(5, 80)} g",
+        f"- Fat: {rng.randint(1, 35)} g",
+    ]
+    return "\n".join(lines)
+
+def synthetic_recipes(count: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Generate knowledge items for a synthetic corpus.
+
+    Args:
+        count: Number of recipes; even positions are Persian, odd ones English
+        seed: Random seed; the same count and seed give the same corpus
+
+    Returns:
+        Iterator of dictionaries with "page_content" and "metadata", each
+        with a unique title and a stable ``metadata["id"]``
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        if i % 2 == 0:
+            title = f"{rng.choice(PERSIAN_DISHES)} {rng.choice(PERSIAN_STYLES)} {i}"
+            content, source = _persian_recipe(rng, title), "دستورات ایرانی"
+        else:
+            title = f"{rng.choice(ENGLISH_STYLES)} {rng.choice(ENGLISH_DISHES)} {i}"
+            content, source = _english_recipe(rng, title), "دستورات بین‌المللی"
+        yield {
+            "page_content": content,
+            "metadata": {"id": f"synthetic-{i:06d}", "source": source, "category": rng.choice(CATEGORIES)},
+        }
+
+def write_corpus(path: Path, count: int, seed: int = 0) -> int:
+    """
+    Write a synthetic corpus as a knowledge file (JSON array or JSON Lines).
+
+    Args:
+        path: Knowledge file to write
+        count: Number of recipes
+        seed: Random seed
+
+    Returns:
+        Number of recipes written
+    """
+    return write_items(path, synthetic_recipes(count, seed))
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a synthetic Persian/English recipe corpus.')
+    parser.add_argument('destination', help='Knowledge file to write (.json or .jsonl)')
+    parser.add_argument('--recipes', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    count = write_corpus(args.destination, args.recipes, args.seed)
+    print(f"Wrote {count} recipes to {args.destination}.")
+
+if __name__ == '__main__':
+    main()
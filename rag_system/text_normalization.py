@@ -0,0 +1,70 @@
+"""
+Persian/Arabic text normalization shared by indexing and querying.
+
+The same function runs over recipe text before chunking and over questions
+before retrieval, so both sides see identical character forms.
+"""
+import re
+
+# Bump when normalization changes, so persisted indexes are rebuilt
+NORMALIZATION_VERSION = 1
+
+# Arabic code points that have a distinct Persian form, and Persian/Arabic digits
+_CHAR_MAP = str.maketrans({
+    "ي": "ی", "ى": "ی", "ك": "ک", "ة": "ه", "ۀ": "ه",
+    "\u200d": "\u200c",  # zero width joiner -> ZWNJ
+    "\u00a0": " ",  # no-break space
+    **{chr(0x06F0 + i): str(i) for i in range(10)},
+    **{chr(0x0660 + i): str(i) for i in range(10)},
+})
+# Arabic diacritics (harakat), superscript alef and tatweel
+_DIACRITICS = re.compile("[\u064B-\u065F\u0670\u0640]")
+# ZWNJ is only meaningful between two letters
+_ZWNJ_RUNS = re.compile("\u200c{2,}")
+_ZWNJ_EDGES = re.compile(r"\u200c(?=[\s\W])|(?<=[\s\W])\u200c|^\u200c|\u200c$", re.MULTILINE)
+_SPACES = re.compile(r"[ \t\f\v]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+def normalize_characters(text: str) -> str:
+    """
+    Unify letter forms, fold digits to ASCII and drop diacritics and stray ZWNJs.
+
+    Args:
+        text: Persian, English or mixed text
+
+    Returns:
+        The text with normalized characters; whitespace is left as is
+    """
+    text = _DIACRITICS.sub("", text.translate(_CHAR_MAP))
+    text = _ZWNJ_RUNS.sub("\u200c", text)
+    return _ZWNJ_EDGES.sub("", text)
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize document text before chunking.
+
+    Besides the character normalization, strips the indentation of the
+    triple-quoted recipe literals, collapses runs of spaces and keeps at most
+    one blank line between paragraphs so the splitter still sees them.
+
+    Args:
+        text: Document text
+
+    Returns:
+        Normalized text
+    """
+    text = normalize_characters(text).replace("\r\n", "\n")
+    lines = [_SPACES.sub(" ", line).strip() for line in text.split("\n")]
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+def normalize_question(question: str) -> str:
+    """
+    Normalize a question the same way as documents, lowercased and on one line.
+
+    Args:
+        question: The user's question
+
+    Returns:
+        Normalized question
+    """
+    return " ".join(normalize_characters(question).lower().split())
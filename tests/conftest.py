@@ -0,0 +1,16 @@
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from rag_system.rag import FoodRAGSystem
+import pytest
+
+
+@pytest.fixture
+def rag(tmp_path):
+    """Engine over an empty temporary index with deterministic fake embeddings."""
+    rag = FoodRAGSystem(
+        persist_directory=str(tmp_path / "index"),
+        knowledge_file=tmp_path / "knowledge.json",
+        embedding_cache_path=str(tmp_path / "embedding_cache.sqlite3")
+    )
+    rag.change_log_path = tmp_path / "changes.jsonl"
+    rag.embeddings.embeddings = DeterministicFakeEmbedding(size=16)
+    return rag
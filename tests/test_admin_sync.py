@@ -0,0 +1,46 @@
+from admin_panel.document_store import open_store
+from langchain_core.documents import Document
+from rag_system.knowledge_changes import UPSERT, append_change
+from rag_system.knowledge_file import write_items
+from rag_system.rag import FoodRAGSystem
+
+ORIGINAL = {"page_content": "آش رشته\n\nمواد لازم:\n- رشته: 200 گرم", "metadata": {"id": "ash", "source": "s"}}
+EDITED = {"page_content": "آش رشته\n\nمواد لازم:\n- رشته: 300 گرم\n- کشک: 1 پیمانه", "metadata": {"id": "ash", "source": "s"}}
+
+
+def test_rebuild_keeps_edits_made_after_the_import(rag, tmp_path):
+    write_items(rag.knowledge_file, [ORIGINAL])
+    append_change(UPSERT, "old", {"page_content": "x", "metadata": {}}, rag.change_log_path)
+
+    # The admin panel imports the knowledge file, then edits a recipe without exporting
+    store = open_store(tmp_path / "store.sqlite3", rag.knowledge_file, rag.change_log_path)
+    store.upsert(Document(page_content=EDITED["page_content"], metadata=EDITED["metadata"]))
+    append_change(UPSERT, "ash", EDITED, rag.change_log_path)
+    store.close()
+
+    # The chat service rebuilds from the stale knowledge file and replays the log since the import
+    rag.build_vector_store(resume=False)
+    assert rag.sync_changes() == {"upserted": 1, "deleted": 0}
+    assert "کشک" in rag.load_recipe("ash").page_content
+    assert rag.load_recipe("old") is None
+
+
+def test_restart_after_a_sync_rebuilds_from_a_changed_knowledge_file(rag):
+    write_items(rag.knowledge_file, [ORIGINAL])
+    assert rag.load_or_create_vector_store() is True
+
+    # The knowledge file is replaced while the service runs, then an admin edit is synced
+    kashk = {"page_content": "کشک بادمجان\n\nمواد لازم:\n- بادمجان: 3 عدد", "metadata": {"id": "kashk"}}
+    write_items(rag.knowledge_file, [ORIGINAL, kashk])
+    append_change(UPSERT, "ash", EDITED, rag.change_log_path)
+    assert rag.sync_changes() == {"upserted": 1, "deleted": 0}
+
+    restarted = FoodRAGSystem(
+        persist_directory=rag.persist_directory,
+        knowledge_file=rag.knowledge_file,
+        embedding_cache_path=rag.embeddings.cache_path
+    )
+    restarted.change_log_path = rag.change_log_path
+    restarted.embeddings.embeddings = rag.embeddings.embeddings
+    assert restarted.load_or_create_vector_store() is True
+    assert restarted.load_recipe("kashk") is not None
@@ -0,0 +1,46 @@
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from rag_system.answer_cache import AnswerCache, cache_key
+
+
+def test_cache_key_ignores_case_spacing_and_trailing_punctuation():
+    assert cache_key("  What is  Kabab?! ") == cache_key("what is kabab") == "what is kabab"
+    assert cache_key("کباب چیست؟") == "کباب چیست"
+
+
+def test_exact_hit_and_miss_counters():
+    cache = AnswerCache()
+    assert cache.get("question") is None
+    cache.put("question", "answer", ["source"])
+    assert cache.get("Question?") == ("answer", ["source"])
+    assert cache.stats() == {"exact_hits": 1, "semantic_hits": 0, "misses": 1, "entries": 1}
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = AnswerCache(max_entries=2)
+    cache.put("a", "1", [])
+    cache.put("b", "2", [])
+    cache.get("a")
+    cache.put("c", "3", [])
+    assert cache.get("b") is None
+    assert cache.get("a") == ("1", [])
+
+
+def test_entries_expire_after_the_ttl():
+    cache = AnswerCache(ttl_seconds=0)
+    cache.put("a", "1", [])
+    assert cache.get("a") is None
+
+
+def test_answers_computed_before_a_clear_are_not_stored():
+    cache = AnswerCache()
+    generation = cache.generation
+    cache.clear()
+    cache.put("a", "stale", [], generation)
+    assert cache.get("a") is None
+
+
+def test_semantic_tier_reuses_identical_embeddings_only():
+    cache = AnswerCache(embeddings=DeterministicFakeEmbedding(size=16), similarity_threshold=0.99)
+    cache.put("first question", "answer", [])
+    assert cache.get("first question?") == ("answer", [])
+    assert cache.get("something else entirely") is None
@@ -0,0 +1,38 @@
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from rag_system.embedding_cache import CachedEmbeddings
+
+
+def _cache(tmp_path, max_entries=10):
+    return CachedEmbeddings(DeterministicFakeEmbedding(size=4), "fake", str(tmp_path / "cache.sqlite3"), max_entries)
+
+
+def test_repeated_texts_are_served_from_the_cache(tmp_path):
+    cache = _cache(tmp_path)
+    cache.embed_documents(["a", "b", "a"])
+    stored = cache.embed_documents(["b", "a"])
+    assert cache.embed_documents(["a"]) == [stored[1]]
+    # Queries are cached apart from documents
+    cache.embed_query("a")
+    assert (cache.hits, cache.misses) == (4, 3)
+
+
+def test_overflow_evicts_the_least_recently_used_in_a_batch(tmp_path):
+    cache = _cache(tmp_path)
+    cache.embed_documents([f"text {i}" for i in range(10)])
+    cache.embed_documents(["text 0"])
+    cache.embed_query("question")
+    # 11 entries: evicted down to 90% of the limit, oldest first
+    assert cache.stats()["entries"] == 9
+    cache.embed_query("another question")
+    assert cache.stats()["entries"] == 10
+
+    cache.reset_stats()
+    cache.embed_documents(["text 0", "text 1", "text 2"])
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_the_entry_count_survives_a_restart(tmp_path):
+    _cache(tmp_path).embed_documents([f"text {i}" for i in range(10)])
+    cache = _cache(tmp_path)
+    cache.embed_query("question")
+    assert cache.stats()["entries"] == 9
@@ -0,0 +1,75 @@
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.vectorstores import InMemoryVectorStore
+from rag_system.hybrid_retrieval import BM25Index, HybridRetriever, reciprocal_rank_fusion, tokenize
+import asyncio
+import threading
+
+
+def _index():
+    index = BM25Index()
+    index.add(
+        [
+            Document(page_content="خورش قورمه سبزی با لوبیا قرمز", metadata={"id": "a"}),
+            Document(page_content="چلو کباب کوبیده", metadata={"id": "b"}),
+            Document(page_content="Pasta carbonara with eggs", metadata={"id": "c"}),
+        ],
+        ["a:0", "b:0", "c:0"]
+    )
+    return index
+
+
+def test_tokenize_splits_zwnj_and_folds_letters():
+    assert tokenize("كباب‌ها Pasta") == ["کباب", "ها", "pasta"]
+
+
+def test_search_ranks_matching_chunks_only():
+    results = _index().search("قورمه سبزی", k=3)
+    assert [doc.metadata["id"] for doc, _ in results] == ["a"]
+
+
+def test_search_can_be_restricted_to_recipe_ids():
+    index = _index()
+    assert index.search("کباب", k=3, ids={"a"}) == []
+    assert [doc.metadata["id"] for doc, _ in index.search("کباب", k=3, ids={"b"})] == ["b"]
+
+
+def test_replacing_and_removing_chunks():
+    index = _index()
+    index.add([Document(page_content="آش رشته", metadata={"id": "a"})], ["a:0"])
+    assert len(index) == 3
+    assert index.search("قورمه", k=3) == []
+    index.remove_where("id", ["a", "b"])
+    assert len(index) == 1
+    assert index.search("آش", k=3) == []
+
+
+def test_reciprocal_rank_fusion_merges_duplicates():
+    a, b, c = (Document(page_content=text, metadata={"id": text}) for text in "abc")
+    fused = reciprocal_rank_fusion([[a, b], [b, c]])
+    assert [doc.page_content for doc in fused] == ["b", "a", "c"]
+
+
+def test_empty_prefilter_selection_retrieves_unfiltered():
+    def retriever(allowed):
+        return HybridRetriever(
+            vector_store=InMemoryVectorStore(DeterministicFakeEmbedding(size=8)),
+            sparse_index=_index(), dense_k=0, prefilter=lambda query: allowed
+        )
+    assert retriever({"a"}).invoke("کباب") == []
+    assert [doc.metadata["id"] for doc in retriever(set()).invoke("کباب")] == ["b"]
+
+
+def test_async_retrieval_runs_the_prefilter_off_the_event_loop():
+    threads = []
+
+    def prefilter(query):
+        threads.append(threading.current_thread())
+        return None
+
+    retriever = HybridRetriever(
+        vector_store=InMemoryVectorStore(DeterministicFakeEmbedding(size=8)),
+        sparse_index=_index(), dense_k=0, prefilter=prefilter
+    )
+    assert [doc.metadata["id"] for doc in asyncio.run(retriever.ainvoke("کباب"))] == ["b"]
+    assert threads and threads[0] is not threading.main_thread()
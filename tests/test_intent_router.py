@@ -0,0 +1,59 @@
+from langchain_core.documents import Document
+from rag_system.intent_router import IntentRouter
+from rag_system.recipe_splitter import RecipeTextSplitter
+
+KABAB = (
+    "کباب کوبیده\n\n"
+    "مواد لازم:\n- گوشت چرخ کرده: 500 گرم\n- پیاز: 1 عدد\n\n"
+    "دستور پخت:\n1. گوشت و پیاز را ورز دهید\n2. به سیخ بکشید و کباب کنید\n\n"
+    "ارزش غذایی (در هر 100 گرم):\n- کالری: 250"
+)
+PIZZA = (
+    "Pizza Margherita\n\nIngredients:\n- dough\n- tomato\n\nInstructions:\n1. Bake\n\n"
+    "Nutritional Information (per 100g):\n- Calories: 270"
+)
+
+
+def make_router():
+    documents = [Document(page_content=KABAB, metadata={"id": "kabab"}),
+                 Document(page_content=PIZZA, metadata={"id": "pizza"})]
+    chunks = RecipeTextSplitter().split_documents(documents)
+    by_id = {f"{chunk.metadata['id']}:{n}": chunk for n, chunk in enumerate(chunks)}
+    return IntentRouter(lambda: by_id)
+
+
+def test_section_lookups_are_answered_from_the_recipe():
+    router = make_router()
+    answer, sources = router.route("مواد لازم کباب کوبیده")
+    assert answer.startswith("کباب کوبیده\n\nمواد لازم:")
+    assert [doc.metadata["section"] for doc in sources] == ["ingredients"]
+
+    _, sources = router.route("کالری کباب کوبیده چقدر است؟")
+    assert [doc.metadata["section"] for doc in sources] == ["nutrition"]
+    _, sources = router.route("How many calories does pizza margherita have?")
+    assert [doc.metadata["section"] for doc in sources] == ["nutrition"]
+
+
+def test_explicit_recipe_requests_get_the_whole_recipe():
+    router = make_router()
+    for question in ("طرز تهیه کباب کوبیده", "دستور پخت کباب کوبیده", "How to make pizza margherita"):
+        _, sources = router.route(question)
+        assert [doc.metadata["section"] for doc in sources] == ["ingredients", "instructions"]
+
+
+def test_questions_that_only_name_a_dish_go_to_the_llm():
+    router = make_router()
+    for question in (
+        "کباب کوبیده را چطور گرم کنم؟",
+        "چطور کباب کوبیده از هم نپاشد؟",
+        "طرز تهیه کباب کوبیده در فر",
+        "How do I reheat pizza margherita?",
+        "Ingredients of pizza margherita for 4 people",
+    ):
+        assert router.route(question) is None, question
+
+
+def test_open_ended_and_unknown_dishes_go_to_the_llm():
+    router = make_router()
+    assert router.route("مواد لازم کباب کوبیده بدون پیاز") is None
+    assert router.route("مواد لازم قورمه سبزی") is None
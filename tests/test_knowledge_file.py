@@ -0,0 +1,44 @@
+import json
+import pytest
+from rag_system.knowledge_changes import document_id
+from rag_system.knowledge_file import convert, iter_documents, iter_items, write_items
+
+ITEMS = [
+    {"page_content": "کباب\n" + "x" * 70000, "metadata": {"id": "a", "source": "s"}},
+    {"page_content": "legacy recipe, no id", "metadata": {"category": "Tips"}},
+]
+
+
+@pytest.mark.parametrize("name", ["knowledge.json", "knowledge.jsonl"])
+def test_items_round_trip(tmp_path, name):
+    path = tmp_path / name
+    assert write_items(path, iter(ITEMS)) == 2
+    assert list(iter_items(path)) == ITEMS
+
+
+def test_array_files_stay_plain_json(tmp_path):
+    path = tmp_path / "knowledge.json"
+    write_items(path, ITEMS)
+    assert json.loads(path.read_text(encoding="utf-8")) == ITEMS
+    write_items(path, [])
+    assert json.loads(path.read_text(encoding="utf-8")) == []
+
+
+def test_documents_get_stable_ids(tmp_path):
+    path = tmp_path / "knowledge.jsonl"
+    write_items(path, ITEMS)
+    ids = [doc.metadata["id"] for doc in iter_documents(path)]
+    assert ids == ["a", document_id(ITEMS[1])]
+
+
+def test_convert_between_formats(tmp_path):
+    write_items(tmp_path / "a.json", ITEMS)
+    assert convert(tmp_path / "a.json", tmp_path / "b.jsonl") == 2
+    assert list(iter_items(tmp_path / "b.jsonl")) == ITEMS
+
+
+def test_truncated_array_is_an_error(tmp_path):
+    path = tmp_path / "knowledge.json"
+    path.write_text('[{"page_content": "a", "metadata": {}}', encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_items(path))
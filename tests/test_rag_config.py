@@ -0,0 +1,29 @@
+from rag_system.config import RAGConfig
+from rag_system.rag import FoodRAGSystem
+import pytest
+
+
+def test_positional_model_name_is_still_accepted(tmp_path):
+    rag = FoodRAGSystem("mistral", persist_directory=str(tmp_path))
+    assert rag.model_name == "mistral"
+    assert rag.embedding_id == "ollama:mistral"
+
+
+def test_settings_override_the_config():
+    rag = FoodRAGSystem(RAGConfig(k=2), k=5)
+    assert rag.k == 5
+
+
+def test_environment_overrides(monkeypatch):
+    monkeypatch.setenv("RAG_K", "7")
+    monkeypatch.setenv("RAG_FAST_PATH", "0")
+    monkeypatch.setenv("RAG_CHUNK_OVERLAP", "")
+    config = RAGConfig.from_env(model_name="x")
+    assert (config.k, config.fast_path, config.chunk_overlap, config.model_name) == (7, False, None, "x")
+
+
+def test_invalid_settings_are_rejected():
+    with pytest.raises(ValueError):
+        RAGConfig(retriever_mode="sparse")
+    with pytest.raises(ValueError):
+        RAGConfig(chunk_size=100, chunk_overlap=100)
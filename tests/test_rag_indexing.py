@@ -0,0 +1,18 @@
+from langchain_core.documents import Document
+from rag_system.knowledge_file import write_items
+
+RECIPE = "آش رشته\n\nمواد لازم:\n- رشته: 200 گرم\n\nدستور پخت:\n1. بجوشانید"
+
+
+def test_identical_legacy_recipes_are_indexed_once(rag, caplog):
+    documents = [Document(page_content=RECIPE, metadata={"source": "s"}) for _ in range(2)]
+    chunks, ids = rag._split_documents(documents)
+    assert len(ids) == len(set(ids)) == 2
+    assert "Skipping duplicate recipe" in caplog.text
+
+
+def test_build_skips_duplicates_across_batches(rag):
+    write_items(rag.knowledge_file, [{"page_content": RECIPE, "metadata": {}}] * 3)
+    stats = rag.build_vector_store(batch_size=1, workers=1, resume=False)
+    assert stats["chunks"] == 2
+    assert len(rag.sparse_index) == 2
@@ -0,0 +1,51 @@
+from contextlib import aclosing
+from langchain_core.documents import Document
+from langchain_core.language_models.fake import FakeStreamingListLLM
+import asyncio
+
+QUESTION = "what are some healthy eating tips?"
+
+
+def _ready(rag, max_concurrent_queries=1):
+    rag.create_vector_store([Document(page_content="Healthy eating tips\n\nEat vegetables.", metadata={})])
+    rag.llm = FakeStreamingListLLM(responses=["a long streamed answer"])
+    rag.create_qa_chain()
+    rag.max_concurrent_queries = max_concurrent_queries
+
+
+def test_stream_yields_sources_then_tokens(rag):
+    _ready(rag)
+
+    async def ask():
+        return [item async for item in rag.astream(QUESTION)]
+
+    items = asyncio.run(ask())
+    assert isinstance(items[0], list) and items[0]
+    assert "".join(items[1:]) == "a long streamed answer"
+
+
+def test_closing_an_abandoned_stream_frees_its_slot(rag):
+    _ready(rag)
+
+    async def abandon():
+        async with aclosing(rag.astream(QUESTION)) as stream:
+            await stream.__anext__()
+            await stream.__anext__()
+            assert rag._query_slots.locked()
+        return rag._query_slots.locked()
+
+    assert asyncio.run(abandon()) is False
+    assert rag.metrics.summary()["outcomes"] == {"answered": 1}
+
+
+def test_a_shared_engine_serves_several_event_loops(rag):
+    _ready(rag)
+    rag.answer_cache = None
+
+    async def ask_twice():
+        # The second question waits for the only slot
+        return await asyncio.gather(rag.aquery(QUESTION), rag.aquery(QUESTION))
+
+    for _ in range(2):
+        answers = asyncio.run(ask_twice())
+        assert [answer for answer, _ in answers] == ["a long streamed answer"] * 2
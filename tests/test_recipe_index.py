@@ -0,0 +1,99 @@
+from langchain_core.documents import Document
+from rag_system.recipe_index import RecipeIndex, RecipeTable, parse_filter, parse_recipe
+from rag_system.rag import FoodRAGSystem
+from rag_system.recipe_splitter import RecipeTextSplitter
+
+KABAB = (
+    "کباب کوبیده\n\n"
+    "مواد لازم:\n- گوشت چرخ کرده: 500 گرم\n- پیاز: 1 عدد\n- نمک و فلفل: به مقدار لازم\n\n"
+    "دستور پخت:\n1. گوشت و پیاز را ورز دهید\n2. کباب کنید\n\n"
+    "ارزش غذایی (در هر 100 گرم):\n- کالری: ۲۵۰\n- پروتئین: 18 گرم"
+)
+CHICKEN = (
+    "Grilled Chicken\n\nIngredients:\n- chicken breast: 2\n- salt and pepper\n\n"
+    "Instructions:\n1. Grill\n\nNutritional Information (per 100g):\n- Calories: 165\n- Protein: 31g"
+)
+POLO = (
+    "Chicken Rice\n\nIngredients:\n- chicken: 1\n- rice: 2 cups\n\n"
+    "Instructions:\n1. Cook\n\nNutritional Information (per 100g):\n- Calories: 320"
+)
+
+
+def make_table():
+    return RecipeTable([
+        parse_recipe(KABAB, {"id": "kabab", "category": "Main Dish"}),
+        parse_recipe(CHICKEN, {"id": "chicken", "category": "Main Dish"}),
+        parse_recipe(POLO, {"id": "polo"}),
+    ])
+
+
+def test_parse_recipe_reads_persian_and_admin_layouts():
+    recipe = parse_recipe(KABAB, {"id": "kabab", "category": "Main Dish"})
+    assert (recipe.id, recipe.title, recipe.category) == ("kabab", "کباب کوبیده", "Main Dish")
+    assert recipe.ingredients == ["گوشت چرخ کرده", "پیاز", "نمک و فلفل"]
+    assert recipe.steps == ["گوشت و پیاز را ورز دهید", "کباب کنید"]
+    assert recipe.nutrition == {"calories": 250.0, "protein": 18.0}
+
+    recipe = parse_recipe(CHICKEN)
+    assert recipe.ingredients == ["chicken breast", "salt and pepper"]
+    assert recipe.nutrition == {"calories": 165.0, "protein": 31.0}
+
+
+def test_parse_filter_reads_category_bounds_and_ingredients():
+    constraints = parse_filter("main dishes under 300 kcal with chicken")
+    assert constraints.category == "Main Dish"
+    assert constraints.bounds == {"calories": (float("-inf"), 300.0)}
+    assert constraints.ingredients == ["chicken"]
+
+    constraints = parse_filter("غذای اصلی با مرغ زیر ۳۰۰ کالری")
+    assert (constraints.category, constraints.ingredients) == ("Main Dish", ["مرغ"])
+    assert not parse_filter("a dish ready in under 30 minutes")
+
+
+def test_connectors_are_not_ingredient_terms():
+    assert parse_filter("یک غذا با گوشت و برنج").ingredients == ["گوشت", "برنج"]
+    assert parse_filter("something with chicken and rice").ingredients == ["chicken", "rice"]
+    terms = make_table().ingredient_terms
+    assert "گوشت" in terms and "salt" in terms
+    assert not {"و", "کرده", "and"} & set(terms)
+
+
+def test_select_intersects_every_constraint():
+    table = make_table()
+    assert table.select(parse_filter("main dishes under 300 kcal")) == ["kabab", "chicken"]
+    assert table.select(parse_filter("recipes with chicken and rice")) == ["polo"]
+    assert table.select(parse_filter("غذا با گوشت و پیاز")) == ["kabab"]
+    assert table.select(parse_filter("protein over 20 g")) == ["chicken"]
+    assert table.select(parse_filter("soup with chicken")) == []
+
+
+def test_prefilter_keeps_other_documents_and_falls_back_when_nothing_matches():
+    documents = [
+        Document(page_content=KABAB, metadata={"id": "kabab", "category": "Main Dish"}),
+        Document(page_content=CHICKEN, metadata={"id": "chicken", "category": "Main Dish"}),
+        Document(page_content="Grilling tips\n\nRest the meat before serving.", metadata={"id": "tips"}),
+    ]
+    chunks = RecipeTextSplitter().split_documents(documents)
+    index = RecipeIndex(lambda: {f"{chunk.metadata['id']}:{n}": chunk for n, chunk in enumerate(chunks)})
+    assert index.table.others == ["tips"]
+    assert index.prefilter("main dishes with chicken") == {"chicken", "tips"}
+    assert index.prefilter("dessert ideas") is None
+    assert index.prefilter("how long should meat rest?") is None
+
+
+def test_dense_retrieval_applies_the_filters_too(rag, tmp_path):
+    dense = FoodRAGSystem(
+        persist_directory=str(tmp_path / "dense"),
+        knowledge_file=rag.knowledge_file,
+        embedding_cache_path=rag.embeddings.cache_path,
+        retriever_mode="dense",
+        expand_parents=False
+    )
+    dense.embeddings.embeddings = rag.embeddings.embeddings
+    dense.create_vector_store([
+        Document(page_content=KABAB, metadata={"id": "kabab"}),
+        Document(page_content=POLO, metadata={"id": "polo"}),
+    ])
+    dense.create_retriever()
+    documents = dense.retriever.invoke("dinner with rice")
+    assert documents and {doc.metadata["id"] for doc in documents} == {"polo"}
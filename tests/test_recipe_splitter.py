@@ -0,0 +1,77 @@
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from rag_system.recipe_splitter import ParentDocumentRetriever, RecipeTextSplitter, join_sections, needs_full_recipe
+import asyncio
+import threading
+
+RECIPE = (
+    "خورش قورمه سبزی\n\n"
+    "مواد لازم:\n- گوشت گوسفندی: 500 گرم\n- پیاز: 2 عدد\n\n"
+    "دستور پخت:\n1. گوشت را با پیاز تفت دهید\n\n"
+    "ارزش غذایی (در هر 100 گرم):\n- کالری: 280"
+)
+ADMIN_RECIPE = (
+    "Kuku\n\nIngredients:\n- eggs\n\nInstructions:\n1. Fry\n\n"
+    "Nutritional Information (per 100g):\n- Calories: 210"
+)
+
+
+def test_sections_of_persian_and_admin_recipes():
+    splitter = RecipeTextSplitter()
+    for text in (RECIPE, ADMIN_RECIPE):
+        _, sections = splitter.split_sections(text)
+        assert [name for name, _ in sections] == ["ingredients", "instructions", "nutrition"]
+
+
+def test_body_lines_starting_with_a_header_word_stay_in_their_section():
+    text = "Tips\n\nIngredients are best fresh.\nInstructions: see below\n\nدستور پخت:\nدستور قدیمی را دنبال کنید"
+    _, sections = RecipeTextSplitter().split_sections(text)
+    assert [name for name, _ in sections] == ["overview", "instructions"]
+    assert sections[1][1].endswith("دستور قدیمی را دنبال کنید")
+
+
+def test_chunks_repeat_the_title_and_record_their_section():
+    chunks = RecipeTextSplitter().split_documents([Document(page_content=RECIPE, metadata={"id": "a"})])
+    assert [chunk.metadata["section"] for chunk in chunks] == ["ingredients", "instructions", "nutrition"]
+    assert all(chunk.page_content.startswith("خورش قورمه سبزی\n\n") for chunk in chunks)
+    assert join_sections(chunks) == RECIPE
+
+
+def test_text_without_sections_is_merged_by_paragraph():
+    text = "Cooking tips\n\n" + "\n\n".join(f"Tip {i}: " + "x" * 40 for i in range(6))
+    chunks = RecipeTextSplitter(chunk_size=120).split_text(text)
+    assert len(chunks) == 3
+    assert all(chunk.startswith("Cooking tips\n\n") for chunk in chunks)
+
+
+def test_oversized_section_is_joined_without_its_overlap():
+    ingredients = "\n".join(f"- ingredient number {i}: {i * 10} g" for i in range(40))
+    text = f"Big stew\n\nIngredients:\n{ingredients}\n\nInstructions:\n1. Cook"
+    splitter = RecipeTextSplitter(chunk_size=300, chunk_overlap=60)
+    chunks = splitter.split_documents([Document(page_content=text, metadata={"id": "a"})])
+    assert len(chunks) > 3
+    assert join_sections(chunks, overlap=60) == text
+
+
+def test_needs_full_recipe():
+    assert needs_full_recipe("طرز تهیه قورمه سبزی")
+    assert not needs_full_recipe("کالری قورمه سبزی")
+    assert not needs_full_recipe("what is saffron")
+
+
+class _Sections(BaseRetriever):
+    def _get_relevant_documents(self, query, *, run_manager):
+        return RecipeTextSplitter().split_documents([Document(page_content=RECIPE, metadata={"id": "a"})])
+
+
+def test_async_expansion_loads_parents_off_the_event_loop():
+    threads = []
+
+    def load_parent(parent_id):
+        threads.append(threading.current_thread())
+        return Document(page_content=RECIPE, metadata={"id": parent_id})
+
+    retriever = ParentDocumentRetriever(base_retriever=_Sections(), load_parent=load_parent)
+    documents = asyncio.run(retriever.ainvoke("طرز تهیه قورمه سبزی"))
+    assert [doc.page_content for doc in documents] == [RECIPE]
+    assert threads and threads[0] is not threading.main_thread()
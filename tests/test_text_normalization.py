@@ -0,0 +1,19 @@
+from rag_system.text_normalization import normalize_characters, normalize_question, normalize_text
+
+
+def test_arabic_letters_and_digits_are_folded():
+    assert normalize_characters("كباب يك ۱۲۳ ٤٥") == "کباب یک 123 45"
+
+
+def test_diacritics_and_stray_zwnj_are_dropped():
+    assert normalize_characters("مَرغ") == "مرغ"
+    assert normalize_characters("می‌‌خواهم ‌سلام") == "می‌خواهم سلام"
+
+
+def test_text_keeps_one_blank_line_between_paragraphs():
+    text = "\n        خورش قورمه سبزی\n        \n\n\n        مواد لازم:\r\n        - پیاز:  ۲ عدد\n"
+    assert normalize_text(text) == "خورش قورمه سبزی\n\nمواد لازم:\n- پیاز: 2 عدد"
+
+
+def test_question_is_lowercased_on_one_line():
+    assert normalize_question("  How to cook\n  كباب ? ") == "how to cook کباب ?"